@@ -0,0 +1,73 @@
+import json
+
+import anyio
+import pytest
+from app.middleware.partitioning import PartitionMiddleware
+from app.services.hash_ring import HashRing
+
+NODES = ["http://node-a", "http://node-b"]
+RING = HashRing(NODES, 64)
+LOCAL = next(user for user in map("user{}".format, range(100)) if RING.owner(user) == NODES[0])
+REMOTE = next(user for user in map("user{}".format, range(100)) if RING.owner(user) == NODES[1])
+
+async def local_app(scope, receive, send):
+    body = b""
+    while True:
+        message = await receive()
+        body += message.get("body", b"")
+        if not message.get("more_body"):
+            break
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+def call(path, method="GET", body=b"", headers=(), chunk=64, max_body_bytes=None):
+    middleware = PartitionMiddleware(local_app, RING, NODES[0], max_body_bytes=max_body_bytes)
+    chunks = [body[start:start + chunk] for start in range(0, len(body), chunk)] or [b""]
+    messages = [{"type": "http.request", "body": part, "more_body": index < len(chunks) - 1} for index, part in enumerate(chunks)]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {"type": "http", "path": path, "method": method, "headers": list(headers), "query_string": b""}
+    anyio.run(middleware, scope, receive, send)
+    headers = dict(sent[0].get("headers", []))
+    return sent[0]["status"], headers, sent[1]["body"]
+
+def create(user_name, headers=()):
+    return call("/tasks", "POST", json.dumps({"user_name": user_name}).encode(), headers)
+
+def test_requests_are_served_or_redirected_by_owner():
+    assert create(LOCAL)[0] == 200
+    status, headers, _ = create(REMOTE)
+    assert status == 307
+    assert headers[b"location"] == f"{NODES[1]}/tasks".encode()
+    assert call(f"/users/{REMOTE}/tasks")[0] == 307
+
+@pytest.mark.parametrize("value", [b"http://node-b", b"anything"])
+def test_forwarded_header_does_not_bypass_routing(value):
+    forwarded = [(b"x-partition-forwarded", value)]
+    assert create(LOCAL, forwarded)[0] == 200
+    status, _, body = create(REMOTE, forwarded)
+    assert status == 421
+    assert "does not own" in json.loads(body)["detail"]
+    assert call(f"/users/{REMOTE}/tasks", headers=forwarded)[0] == 421
+
+def test_bulk_bodies_are_capped():
+    payload = json.dumps([{"user_name": LOCAL}] * 20).encode()
+    status, _, body = call("/jobs/import", "POST", payload, max_body_bytes=lambda: len(payload))
+    assert (status, body) == (200, payload)
+    assert call("/jobs/import", "POST", payload, max_body_bytes=lambda: len(payload) - 1)[0] == 413
+    declared = [(b"content-length", str(len(payload)).encode())]
+    assert call("/tasks/bulk", "POST", payload, declared, max_body_bytes=lambda: 10)[0] == 413
+
+def test_bulk_request_spanning_partitions_is_rejected():
+    payload = json.dumps([{"user_name": LOCAL}, {"user_name": REMOTE}]).encode()
+    assert call("/tasks/bulk", "POST", payload)[0] == 400
+
+def test_local_requests_not_routed_by_body_are_streamed_uncapped():
+    payload = b"x" * 1000
+    assert call("/tasks", "GET", payload, max_body_bytes=lambda: 10) == (200, {}, payload)
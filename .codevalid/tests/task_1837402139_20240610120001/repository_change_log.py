@@ -0,0 +1,147 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+import os
+from datetime import date
+
+import pytest
+from app.domain.models.task import TaskCreate, TaskUpdate
+from app.repositories import change_log as change_log_module
+from app.repositories.change_log import ChangeLog
+from app.repositories.task_repository import TaskRepository
+from app.services.write_coalescer import WriteCoalescer
+
+@pytest.fixture(autouse=True)
+def small_index(monkeypatch):
+    # A sparse index entry every few lines, so reads have to seek and skip.
+    monkeypatch.setattr(change_log_module, "INDEX_INTERVAL", 3)
+
+def make_task(number):
+    return TaskCreate(
+        title=f"Task {number}",
+        description=f"Description {number}",
+        priority=1 + number % 5,
+        due_date=date(2030, 1, 1),
+        user_name="alice",
+    )
+
+def logged_repository(directory, **options):
+    change_log = ChangeLog(str(directory), fsync=False, **options)
+    repo = TaskRepository()
+    repo.add_listener(change_log, replay=False)
+    return repo, change_log
+
+def decode(lines):
+    return [json.loads(line) for line in lines]
+
+def test_read_resumes_by_offset_across_segments(tmp_path):
+    repo, change_log = logged_repository(tmp_path, segment_records=4)
+    tasks = [repo.add_task(make_task(number)) for number in range(6)]
+    repo.update_task(tasks[0].id, TaskUpdate(title="Renamed"))
+    repo.delete_task(tasks[1].id)
+    assert len([name for name in os.listdir(tmp_path) if name.endswith(".log")]) == 2
+
+    changes, since = [], 0
+    while True:
+        lines, since = change_log.read(since, 3)
+        if not lines:
+            break
+        changes.extend(decode(lines))
+    assert [change["offset"] for change in changes] == list(range(8))
+    assert [change["op"] for change in changes] == ["create"] * 6 + ["update", "delete"]
+    assert changes[6]["task"]["title"] == "Renamed"
+    assert since == 8
+
+    lines, next_offset = change_log.read(5, 2)
+    assert [change["offset"] for change in decode(lines)] == [5, 6]
+    assert next_offset == 7
+    change_log.close()
+
+    reopened = ChangeLog(str(tmp_path), segment_records=4, fsync=False)
+    assert [change["offset"] for change in decode(reopened.read(2, 100)[0])] == list(range(2, 8))
+    repo = TaskRepository()
+    repo.add_listener(reopened, replay=False)
+    repo.add_task(make_task(6))
+    assert decode(reopened.read(8, 10)[0])[0]["offset"] == 8
+    reopened.close()
+
+def test_torn_last_line_is_truncated_on_startup(tmp_path):
+    repo, change_log = logged_repository(tmp_path)
+    for number in range(3):
+        repo.add_task(make_task(number))
+    change_log.close()
+    (path,) = [tmp_path / name for name in os.listdir(tmp_path)]
+    size = path.stat().st_size
+    with open(path, "ab") as f:
+        f.write(b'{"offset":3,"op":"cre')
+
+    reopened = ChangeLog(str(tmp_path), fsync=False)
+    assert path.stat().st_size == size
+    assert [change["offset"] for change in decode(reopened.read(0, 10)[0])] == [0, 1, 2]
+    repo = TaskRepository()
+    repo.add_listener(reopened, replay=False)
+    repo.add_task(make_task(3))
+    assert [change["offset"] for change in decode(reopened.read(0, 10)[0])] == [0, 1, 2, 3]
+    reopened.close()
+
+def fail_writes(monkeypatch, change_log, failures):
+    """Make the next ``failures`` flushes of the log fail, after the lines were written."""
+    opened = change_log._open
+    remaining = [failures]
+
+    def flaky_open(base, new=False):
+        opened(base, new)
+        file = change_log._file
+
+        class FailingFile:
+            def __getattr__(self, name):
+                return getattr(file, name)
+
+            def flush(self):
+                file.flush()
+                if remaining[0]:
+                    remaining[0] -= 1
+                    raise OSError("disk full")
+
+        change_log._file = FailingFile()
+
+    monkeypatch.setattr(change_log, "_open", flaky_open)
+
+def test_failed_write_rolls_back_and_requeues(tmp_path, monkeypatch):
+    repo, change_log = logged_repository(tmp_path, segment_records=4)
+    for number in range(3):
+        repo.add_task(make_task(number))
+    change_log.close()
+    size = sum(entry.stat().st_size for entry in tmp_path.iterdir())
+
+    fail_writes(monkeypatch, change_log, 1)
+    # Spans into a new segment, which the rollback must remove again.
+    tasks = repo.add_tasks([make_task(number) for number in range(3, 6)])
+    assert [task.id for task in tasks] == [4, 5, 6]
+    assert repo.get_task(6) is not None
+    assert sum(entry.stat().st_size for entry in tmp_path.iterdir()) == size
+    assert len(list(tmp_path.iterdir())) == 1
+    assert change_log.read(0, 100)[1] == 3
+
+    # The next write flushes the requeued changes first, in order.
+    repo.add_task(make_task(6))
+    changes = decode(change_log.read(0, 100)[0])
+    assert [change["offset"] for change in changes] == list(range(7))
+    assert [change["task_id"] for change in changes] == list(range(1, 8))
+    change_log.close()
+    reopened = ChangeLog(str(tmp_path), segment_records=4, fsync=False)
+    assert decode(reopened.read(0, 100)[0]) == changes
+    reopened.close()
+
+def test_failed_write_does_not_fail_the_coalesced_batch(tmp_path, monkeypatch):
+    repo, change_log = logged_repository(tmp_path)
+    change_log.close()
+    fail_writes(monkeypatch, change_log, 1)
+    coalescer = WriteCoalescer(repo, max_batch=8, max_delay=0.5)
+    with ThreadPoolExecutor(4) as executor:
+        tasks = list(executor.map(coalescer.submit, [make_task(number) for number in range(4)]))
+    assert coalescer.close(5)
+    assert sorted(task.id for task in tasks) == [1, 2, 3, 4]
+    assert change_log.read(0, 10)[0] == []
+    repo.delete_task(1)
+    assert [change["op"] for change in decode(change_log.read(0, 10)[0])] == ["create"] * 4 + ["delete"]
+    change_log.close()
@@ -0,0 +1,131 @@
+import random
+import threading
+from datetime import date, timedelta
+
+import pytest
+from app.domain.models.task import TaskCreate, TaskUpdate
+from app.repositories import task_repository
+from app.repositories.description_codec import DescriptionCodec
+from app.repositories.task_repository import TaskRepository
+from app.services.write_coalescer import WriteCoalescer
+
+WRITERS = 4
+OPERATIONS = 400
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Small chunks put chunk boundaries, copies and tail replays in play
+    # with only a few hundred tasks.
+    monkeypatch.setattr(task_repository, "CHUNK_SIZE", 8)
+
+@pytest.fixture(params=["plain", "compressed"])
+def repo(request):
+    codec = DescriptionCodec(sample_size=20) if request.param == "compressed" else None
+    return TaskRepository(description_codec=codec)
+
+def make_task(writer, number):
+    return TaskCreate(
+        title=f"task {writer}-{number}",
+        description=f"Pick up the groceries and the dry cleaning, then call {writer} about item {number}",
+        priority=1 + number % 5,
+        due_date=date(2030, 1, 1) + timedelta(days=number % 30),
+        user_name=f"user{writer}",
+    )
+
+def fields(task):
+    return (task.title, task.description, task.priority, task.due_date, task.user_name)
+
+def test_snapshot_is_unchanged_by_later_writes(repo):
+    """A snapshot keeps its contents while tasks are updated, deleted and added."""
+    created = repo.add_tasks([make_task(0, number) for number in range(50)])
+    snapshot = repo.list_tasks()
+    before = [fields(task) for task in snapshot]
+    repo.update_task(created[3].id, TaskUpdate(title="changed"))
+    repo.delete_task(created[10].id)
+    repo.add_task(make_task(0, 50))
+    assert repo.compact() == 1
+    repo.update_task(created[20].id, TaskUpdate(description="rewritten"))
+    assert [fields(task) for task in snapshot] == before
+    assert len(snapshot) == 50
+    assert len(repo.list_tasks()) == 50
+
+def test_compact_during_writes_keeps_every_change(repo, monkeypatch):
+    """Concurrent writers, a compactor and the coalescer never lose or resurrect a task."""
+    coalescer = WriteCoalescer(repo, max_batch=16, max_delay=0.0005)
+    expected = {}
+    expected_lock = threading.Lock()
+    stop = threading.Event()
+    errors = []
+
+    # Widen the window between compact()'s copy and its swap.
+    copy = task_repository.TaskSnapshot.hot
+
+    def slow_hot(snapshot):
+        for task in copy(snapshot):
+            yield task
+        stop.wait(0.002)
+
+    monkeypatch.setattr(task_repository.TaskSnapshot, "hot", slow_hot)
+
+    def writer(index):
+        rng = random.Random(index)
+        mine = {}
+        try:
+            for number in range(OPERATIONS):
+                action = rng.random()
+                if action < 0.5 or not mine:
+                    submit = coalescer.submit if number % 2 else repo.add_task
+                    task = submit(make_task(index, number))
+                    mine[task.id] = fields(task)
+                elif action < 0.75:
+                    task_id = rng.choice(list(mine))
+                    task = repo.update_task(task_id, TaskUpdate(title=f"updated {number}", description=f"new text {number}"))
+                    mine[task_id] = fields(task)
+                else:
+                    task_id = rng.choice(list(mine))
+                    assert repo.delete_task(task_id)
+                    del mine[task_id]
+        except Exception as e:
+            errors.append(e)
+        with expected_lock:
+            expected.update(mine)
+
+    def compactor():
+        while not stop.is_set():
+            repo.compact()
+
+    def reader():
+        while not stop.is_set():
+            snapshot = repo.list_tasks()
+            tasks = list(snapshot)
+            ids = [task.id for task in tasks]
+            if len(ids) != len(set(ids)) or len(ids) != len(snapshot):
+                errors.append(AssertionError(f"inconsistent snapshot: {len(ids)} tasks, {len(set(ids))} ids, len {len(snapshot)}"))
+                return
+            if [task.id for task in snapshot] != ids:
+                errors.append(AssertionError("snapshot changed between iterations"))
+                return
+
+    writers = [threading.Thread(target=writer, args=(index,)) for index in range(WRITERS)]
+    background = [threading.Thread(target=compactor), threading.Thread(target=reader)]
+    for thread in writers + background:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in background:
+        thread.join()
+    assert coalescer.close(5)
+    assert not errors, errors
+
+    repo.compact()
+    assert repo.tombstone_ratio() == 0.0
+    tasks = {task.id: fields(task) for task in repo.list_tasks()}
+    assert tasks == expected
+    for task_id, expected_fields in expected.items():
+        assert fields(repo.get_task(task_id)) == expected_fields
+    for index in range(WRITERS):
+        user_name = f"user{index}"
+        owned = sorted(task_id for task_id, task in expected.items() if task[4] == user_name)
+        assert repo.count_for_user(user_name) == len(owned)
+        assert sorted(task.id for task in repo.top_tasks(user_name, OPERATIONS)) == owned
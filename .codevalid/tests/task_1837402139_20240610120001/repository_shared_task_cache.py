@@ -0,0 +1,172 @@
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+from app.repositories.shared_task_cache import WAYS, SharedTaskCache
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "task-cache")
+
+@pytest.fixture
+def cache(path):
+    cache = SharedTaskCache(path, slots=WAYS * 4, slot_bytes=64)
+    yield cache
+    cache.close()
+
+def fill(cache, task_id, body):
+    return cache.put(task_id, body, cache.version(task_id))
+
+def test_fill_and_get(cache):
+    assert cache.get(1) is None
+    assert fill(cache, 1, b'{"id":1}')
+    assert fill(cache, 2, b'{"id":2}')
+    assert cache.get(1) == b'{"id":1}'
+    assert cache.get(2) == b'{"id":2}'
+    # Refilling an id replaces its entry.
+    assert fill(cache, 1, b'{"id":1,"v":2}')
+    assert cache.get(1) == b'{"id":1,"v":2}'
+    assert not fill(cache, 3, b"x" * 65)
+    assert cache.get(3) is None
+
+def test_invalidate_drops_the_entry(cache):
+    fill(cache, 1, b"old")
+    cache.invalidate(1)
+    assert cache.get(1) is None
+
+def test_fill_racing_an_invalidation_is_dropped(cache):
+    # The reader takes the version, then fetches the task; a write commits
+    # and invalidates before the fill arrives.
+    version = cache.version(5)
+    cache.invalidate(5)
+    assert not cache.put(5, b"stale", version)
+    assert cache.get(5) is None
+    # A fill that started after the write goes in.
+    assert fill(cache, 5, b"fresh")
+    assert cache.get(5) == b"fresh"
+
+def test_entries_expire_after_ttl(path):
+    cache = SharedTaskCache(path, slots=WAYS, slot_bytes=64, ttl=0.05)
+    try:
+        fill(cache, 1, b"short-lived")
+        assert cache.get(1) == b"short-lived"
+        time.sleep(0.1)
+        assert cache.get(1) is None
+        # An expired slot is reused before any live one is evicted.
+        for task_id in range(2, WAYS + 1):
+            fill(cache, task_id, b"live")
+        fill(cache, WAYS + 1, b"new")
+        assert [cache.get(task_id) for task_id in range(2, WAYS + 2)] == [b"live"] * (WAYS - 1) + [b"new"]
+    finally:
+        cache.close()
+
+def test_least_recently_used_slot_is_evicted_within_a_set(path):
+    cache = SharedTaskCache(path, slots=WAYS, slot_bytes=64)
+    try:
+        assert cache.sets == 1
+        for task_id in range(1, WAYS + 1):
+            fill(cache, task_id, str(task_id).encode())
+        # Touch the oldest entry, so the second oldest is now the LRU one.
+        assert cache.get(1) == b"1"
+        fill(cache, WAYS + 1, b"new")
+        assert cache.get(2) is None
+        assert cache.get(1) == b"1"
+        assert all(cache.get(task_id) is not None for task_id in range(3, WAYS + 2))
+    finally:
+        cache.close()
+
+def test_file_with_the_wrong_shape_is_replaced(path, cache):
+    fill(cache, 1, b"kept")
+    inode = os.stat(path).st_ino
+    other = SharedTaskCache(path, slots=WAYS * 2, slot_bytes=128)
+    try:
+        assert os.stat(path).st_ino != inode
+        assert os.path.getsize(path) == os.fstat(other._fd).st_size
+        assert other.get(1) is None
+        # The old file is replaced, not truncated: its mapping stays usable.
+        assert cache.get(1) == b"kept"
+        fill(other, 1, b"new")
+        assert other.get(1) == b"new"
+        assert cache.get(1) == b"kept"
+    finally:
+        other.close()
+
+def test_garbage_file_is_replaced(path):
+    with open(path, "wb") as f:
+        f.write(b"not a cache")
+    cache = SharedTaskCache(path, slots=WAYS, slot_bytes=64)
+    try:
+        assert fill(cache, 1, b"ok")
+        assert cache.get(1) == b"ok"
+    finally:
+        cache.close()
+
+def test_matching_file_is_shared(path, cache):
+    inode = os.stat(path).st_ino
+    other = SharedTaskCache(path, slots=WAYS * 4, slot_bytes=64)
+    try:
+        assert os.stat(path).st_ino == inode
+        fill(cache, 7, b"shared")
+        assert other.get(7) == b"shared"
+        version = other.version(7)
+        cache.invalidate(7)
+        assert other.get(7) is None
+        assert not other.put(7, b"stale", version)
+    finally:
+        other.close()
+
+def _worker(path, task_id, body, results):
+    # Like a server worker: the header names the parent that forked it.
+    cache = SharedTaskCache(path, slots=WAYS * 4, slot_bytes=64)
+    if body is not None:
+        fill(cache, task_id, body)
+        fill(cache, task_id + 1, body)
+        cache.invalidate(task_id + 1)
+    results.put((cache.get(task_id), cache.get(task_id + 1)))
+    cache.close()
+
+def test_worker_processes_share_fills_and_invalidations(path):
+    context = multiprocessing.get_context("fork")
+    results = context.Queue()
+    for body in (b"theirs", None):
+        worker = context.Process(target=_worker, args=(path, 8, body, results))
+        worker.start()
+        worker.join(10)
+        assert worker.exitcode == 0
+    assert results.get(timeout=5) == (b"theirs", None)
+    assert results.get(timeout=5) == (b"theirs", None)
+
+def test_readers_never_see_a_torn_entry(path):
+    cache = SharedTaskCache(path, slots=WAYS, slot_bytes=256)
+    stop = threading.Event()
+    errors = []
+
+    def writer(seed):
+        value = seed
+        while not stop.is_set():
+            value = (value + 7) % 251
+            task_id = 1 + value % 3
+            fill(cache, task_id, bytes([value]) * (1 + value))
+            if value % 5 == 0:
+                cache.invalidate(task_id)
+
+    def reader():
+        while not stop.is_set():
+            for task_id in (1, 2, 3):
+                body = cache.get(task_id)
+                if body is not None and (len(set(body)) != 1 or len(body) != body[0] + 1):
+                    errors.append(body)
+                    return
+
+    threads = [threading.Thread(target=writer, args=(seed,)) for seed in range(2)]
+    threads += [threading.Thread(target=reader) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    cache.close()
+    assert not errors
@@ -0,0 +1,160 @@
+import os
+import tempfile
+from datetime import date
+
+import pytest
+
+asyncpg = pytest.importorskip("asyncpg")
+
+from app.domain.models.task import Recurrence, TaskCreate, TaskUpdate
+from app.repositories.sql_task_repository import SCHEMA, AsyncSqlTaskRepository, SqlTaskRepository
+
+@pytest.fixture(scope="module")
+def dsn():
+    """TEST_DB_URL if set, else a throwaway local server from pgserver; skipped when neither is available."""
+    url = os.getenv("TEST_DB_URL")
+    if url:
+        yield url
+        return
+    pgserver = pytest.importorskip("pgserver")
+    try:
+        server = pgserver.get_server(tempfile.mkdtemp())
+    except Exception as e:
+        pytest.skip(f"No local PostgreSQL server available: {e}")
+    yield server.get_uri()
+    server.cleanup()
+
+@pytest.fixture
+def repo(dsn):
+    repository = SqlTaskRepository(AsyncSqlTaskRepository(dsn, copy_threshold=50))
+    try:
+        repository.connect()
+    except (OSError, asyncpg.PostgresError) as e:
+        pytest.skip(f"Cannot connect to {dsn}: {e}")
+    repository._run(_truncate(repository.repository))
+    yield repository
+    repository.close()
+
+async def _truncate(repository):
+    async with repository._acquire() as connection:
+        await connection.execute("TRUNCATE tasks, task_user_counts RESTART IDENTITY")
+
+@pytest.fixture
+def bulk_calls(monkeypatch):
+    """Count which bulk write path each add_tasks call took."""
+    calls = []
+    connection = asyncpg.connection.Connection
+    executemany, copy_records = connection.executemany, connection.copy_records_to_table
+
+    async def spy_executemany(self, *args, **kwargs):
+        calls.append("executemany")
+        return await executemany(self, *args, **kwargs)
+
+    async def spy_copy_records(self, *args, **kwargs):
+        calls.append("copy")
+        return await copy_records(self, *args, **kwargs)
+
+    monkeypatch.setattr(connection, "executemany", spy_executemany)
+    monkeypatch.setattr(connection, "copy_records_to_table", spy_copy_records)
+    return calls
+
+def make_task(number, user_name="alice", **fields):
+    return TaskCreate(
+        title=f"Task {number}",
+        description=f"Description {number}",
+        priority=1 + number % 5,
+        due_date=date(2030, 1, 1 + number % 28),
+        user_name=user_name,
+        **fields,
+    )
+
+def test_add_task_stores_all_fields(repo):
+    task = repo.add_task(make_task(1, recurrence=Recurrence.WEEKLY, recurrence_until=date(2030, 6, 1)))
+    assert task.id == 1
+    stored = repo.get_task(task.id)
+    assert stored.dict() == task.dict()
+    assert repo.count_for_user("alice") == 1
+
+def test_add_tasks_below_copy_threshold_uses_executemany(repo, bulk_calls):
+    tasks = repo.add_tasks([make_task(number) for number in range(10)])
+    assert bulk_calls == ["executemany"]
+    assert [task.id for task in tasks] == list(range(1, 11))
+    assert [task.dict() for task in repo.list_tasks()] == [task.dict() for task in tasks]
+    assert repo.count_for_user("alice") == 10
+
+def test_add_tasks_at_copy_threshold_uses_copy(repo, bulk_calls):
+    tasks = repo.add_tasks([make_task(number, user_name=f"user{number % 3}") for number in range(50)])
+    assert bulk_calls == ["copy"]
+    assert len({task.id for task in tasks}) == 50
+    assert [task.dict() for task in repo.list_tasks()] == [task.dict() for task in tasks]
+    assert [repo.count_for_user(f"user{index}") for index in range(3)] == [17, 17, 16]
+    # Ids reserved for the copy don't collide with later single inserts.
+    assert repo.add_task(make_task(50)).id == 51
+
+def test_update_task_changes_only_given_fields(repo):
+    task = repo.add_task(make_task(1))
+    updated = repo.update_task(task.id, TaskUpdate(title="Renamed", user_name="bob"))
+    assert updated.title == "Renamed"
+    assert updated.description == task.description
+    assert repo.get_task(task.id).dict() == updated.dict()
+    assert repo.count_for_user("alice") == 0
+    assert repo.count_for_user("bob") == 1
+    assert repo.update_task(task.id + 1, TaskUpdate(title="Missing")) is None
+
+def test_delete_task(repo):
+    task = repo.add_task(make_task(1))
+    assert repo.delete_task(task.id)
+    assert repo.get_task(task.id) is None
+    assert not repo.delete_task(task.id)
+    assert repo.count_for_user("alice") == 0
+
+def test_top_tasks_orders_by_priority_due_date_and_id(repo):
+    repo.add_tasks([make_task(number) for number in range(20)] + [make_task(0, user_name="bob")])
+    top = repo.top_tasks("alice", 5)
+    assert [(task.priority, task.due_date, task.id) for task in top] == sorted(
+        (task.priority, task.due_date, task.id) for task in repo.list_tasks() if task.user_name == "alice"
+    )[:5]
+    assert all(task.user_name == "alice" for task in top)
+
+def test_update_task_can_clear_recurrence(repo):
+    task = repo.add_task(make_task(1, recurrence=Recurrence.DAILY, recurrence_until=date(2030, 2, 1)))
+    updated = repo.update_task(task.id, TaskUpdate(recurrence=None))
+    assert updated.recurrence is None
+    assert updated.recurrence_until is None
+    assert updated.title == task.title
+
+def test_update_task_rejects_invalid_recurrence(repo):
+    one_off = repo.add_task(make_task(1))
+    recurring = repo.add_task(make_task(2, recurrence=Recurrence.WEEKLY, recurrence_until=date(2030, 6, 1)))
+    with pytest.raises(ValueError, match="requires recurrence"):
+        repo.update_task(one_off.id, TaskUpdate(recurrence_until=date(2030, 6, 1)))
+    with pytest.raises(ValueError, match="before due_date"):
+        repo.update_task(recurring.id, TaskUpdate(due_date=date(2030, 7, 1)))
+    assert repo.get_task(one_off.id).dict() == one_off.dict()
+    assert repo.get_task(recurring.id).dict() == recurring.dict()
+    assert repo.update_task(recurring.id + 1, TaskUpdate(due_date=date(2030, 7, 1))) is None
+
+def test_connect_adds_missing_columns_without_locking_an_up_to_date_table(dsn, repo):
+    async def schema_locks(repository):
+        async with repository._acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(SCHEMA)
+                return await connection.fetchval(
+                    "SELECT count(*) FROM pg_locks WHERE relation = 'tasks'::regclass "
+                    "AND mode = 'AccessExclusiveLock' AND pid = pg_backend_pid()"
+                )
+
+    assert repo._run(schema_locks(repo.repository)) == 0
+
+    async def drop_columns(repository):
+        async with repository._acquire() as connection:
+            await connection.execute("ALTER TABLE tasks DROP COLUMN recurrence, DROP COLUMN recurrence_until")
+
+    repo._run(drop_columns(repo.repository))
+    upgraded = SqlTaskRepository(AsyncSqlTaskRepository(dsn))
+    upgraded.connect()
+    try:
+        task = upgraded.add_task(make_task(1, recurrence=Recurrence.DAILY, recurrence_until=date(2030, 2, 1)))
+        assert upgraded.get_task(task.id).recurrence == Recurrence.DAILY
+    finally:
+        upgraded.close()
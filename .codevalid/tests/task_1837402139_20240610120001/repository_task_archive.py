@@ -0,0 +1,67 @@
+from datetime import date
+
+import pytest
+from app.domain.models.task import Recurrence, TaskCreate
+from app.repositories import description_codec
+from app.repositories.description_codec import DescriptionCodec
+from app.repositories.task_archive import TaskArchive
+from app.repositories.task_indexes import FingerprintIndex, task_fingerprint
+from app.repositories.task_repository import TaskRepository
+
+def make_task(number, **fields):
+    values = dict(
+        title=f"Task {number}",
+        description=f"Renew the parking permit and the library card, reminder number {number}",
+        priority=1 + number % 5,
+        due_date=date(2020, 1, 1 + number % 28),
+        user_name=f"user{number % 2}",
+    )
+    values.update(fields)
+    return TaskCreate(**values)
+
+@pytest.fixture
+def archived(tmp_path):
+    """An archive directory holding compressed tasks, plus the tasks as created."""
+    repo = TaskRepository(archive=TaskArchive(str(tmp_path)), description_codec=DescriptionCodec(sample_size=5))
+    tasks = repo.add_tasks([make_task(number) for number in range(20)])
+    tasks.append(repo.add_task(make_task(20, recurrence=Recurrence.WEEKLY, recurrence_until=date(2020, 6, 1))))
+    assert repo.archive_aged_tasks(date(2021, 1, 1)) == 21
+    repo.delete_task(tasks[3].id)
+    return tmp_path, [task for task in tasks if task.id != tasks[3].id]
+
+@pytest.fixture
+def decompressed(monkeypatch):
+    """Count the descriptions decompressed from the archive."""
+    calls = []
+    decompress = description_codec.decompress
+
+    def counting(data, dictionary):
+        calls.append(data)
+        return decompress(data, dictionary)
+
+    monkeypatch.setattr("app.repositories.task_archive.decompress", counting)
+    return calls
+
+def test_startup_indexes_the_archive_without_decompressing(archived, decompressed):
+    directory, tasks = archived
+    repo = TaskRepository(archive=TaskArchive(str(directory)))
+    fingerprints = FingerprintIndex()
+    repo.add_listener(fingerprints)
+    assert decompressed == []
+
+    for user_name in ("user0", "user1"):
+        owned = sorted((task.priority, task.due_date, task.id) for task in tasks if task.user_name == user_name)
+        top = repo.top_tasks(user_name, 100)
+        assert [(task.priority, task.due_date, task.id) for task in top] == owned
+        assert repo.count_for_user(user_name) == len(owned)
+    assert [task.id for task in repo.recurring_tasks("user0")] == [tasks[-1].id]
+    assert fingerprints.find(task_fingerprint(tasks[0])) == tasks[0].id
+    # Reads that return tasks still get the full description.
+    assert repo.get_task(tasks[0].id).dict() == tasks[0].dict()
+
+def test_reindex_skips_archived_descriptions(archived, decompressed):
+    directory, tasks = archived
+    repo = TaskRepository(archive=TaskArchive(str(directory)))
+    assert repo.reindex() == len(tasks)
+    assert decompressed == []
+    assert [task.dict() for task in repo.list_tasks()] == [task.dict() for task in sorted(tasks, key=lambda task: task.id)]
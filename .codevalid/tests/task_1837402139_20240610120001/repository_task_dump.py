@@ -0,0 +1,130 @@
+from datetime import date, timedelta
+
+import pytest
+from app.domain.codecs import task_json
+from app.domain.models.task import Recurrence, TaskCreate
+from app.repositories import task_dump
+from app.repositories.task_archive import TaskArchive
+from app.repositories.task_dump import dump_repository, load_dump, restore_repository, write_dump
+from app.repositories.task_repository import TaskRepository
+
+TASKS = 60
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    # Chunks are cut in this process; workers only parse the ranges they get.
+    monkeypatch.setattr(task_dump, "CHUNK_RECORDS", 7)
+    monkeypatch.setattr(task_dump, "CHUNK_BYTES", 1500)
+
+def make_task(number, **fields):
+    values = dict(
+        title=f"Task {number}",
+        description=f"Description {number} with ünïcode",
+        priority=1 + number % 5,
+        due_date=date(2030, 1, 1) + timedelta(days=number),
+        user_name=f"user{number % 3}",
+    )
+    if number % 10 == 0:
+        values.update(recurrence=Recurrence.MONTHLY, recurrence_until=date(2031, 1, 1))
+    values.update(fields)
+    return TaskCreate(**values)
+
+def source_repository(**options):
+    repo = TaskRepository(**options)
+    tasks = repo.add_tasks([make_task(number) for number in range(TASKS)])
+    for task in tasks[::4]:
+        repo.delete_task(task.id)
+    return repo
+
+def write_ndjson(path, tasks):
+    with open(path, "wb") as f:
+        for chunk in task_json.iter_ndjson(tasks):
+            f.write(chunk)
+
+def dicts(tasks):
+    return [task.dict() for task in tasks]
+
+@pytest.mark.parametrize("workers", [1, 3])
+@pytest.mark.parametrize("binary", [True, False])
+def test_restore_keeps_ids_and_fields(tmp_path, binary, workers):
+    source = source_repository()
+    expected = dicts(source.list_tasks())
+    path = str(tmp_path / "tasks.dump")
+    if binary:
+        assert dump_repository(source, path) == len(expected)
+    else:
+        write_ndjson(path, list(source.list_tasks()))
+
+    repo = TaskRepository()
+    assert restore_repository(repo, path, workers=workers, set_aside=True) == len(expected)
+    assert dicts(repo.list_tasks()) == expected
+    assert not (tmp_path / "tasks.dump").exists()
+    assert (tmp_path / "tasks.dump.restored").exists()
+    assert [task.id for task in repo.top_tasks("user1", 100)] == [
+        task["id"] for task in sorted(expected, key=lambda task: (task["priority"], task["due_date"], task["id"])) if task["user_name"] == "user1"
+    ]
+    # New ids continue after the highest restored one.
+    assert repo.add_task(make_task(TASKS)).id == TASKS + 1
+
+@pytest.mark.parametrize("binary", [True, False])
+def test_duplicate_ids_are_rejected(tmp_path, binary):
+    tasks = list(source_repository().list_tasks())
+    tasks.append(tasks[2].copy(update={"title": "Again"}))
+    path = str(tmp_path / "tasks.dump")
+    write_dump(path, tasks) if binary else write_ndjson(path, tasks)
+    repo = TaskRepository()
+    with pytest.raises(ValueError, match=f"task {tasks[2].id} more than once"):
+        restore_repository(repo, path, workers=2)
+    assert len(repo.list_tasks()) == 0
+
+def test_invalid_records_are_rejected(tmp_path):
+    path = tmp_path / "tasks.ndjson"
+    path.write_text('{"id": 1, "title": "ok", "description": "d", "priority": 9, "due_date": "2030-01-01", "user_name": "u"}\n')
+    with pytest.raises(ValueError):
+        load_dump(str(path), workers=1)
+    path.write_bytes(b"TSK2\x05\x00\x00\x00")
+    with pytest.raises(ValueError, match="truncated"):
+        load_dump(str(path), workers=1)
+
+def test_restore_skips_tasks_already_archived(tmp_path):
+    archive_dir = str(tmp_path / "archive")
+    source = TaskRepository(archive=TaskArchive(archive_dir))
+    aged = [make_task(number, due_date=date(2020, 1, 1) + timedelta(days=number), recurrence=None, recurrence_until=None) for number in range(10)]
+    tasks = source.add_tasks(aged)
+    tasks += source.add_tasks([make_task(number) for number in range(10, 20)])
+    assert source.archive_aged_tasks(date(2021, 1, 1)) == 10
+    path = str(tmp_path / "export.ndjson")
+    # Exports include the archived tasks as well as the hot ones.
+    write_ndjson(path, list(source.list_tasks()))
+
+    repo = TaskRepository(archive=TaskArchive(archive_dir))
+    assert restore_repository(repo, path, workers=1) == 10
+    assert sorted(task.id for task in repo.list_tasks()) == [task.id for task in tasks]
+    assert repo.count_for_user("user0") == sum(task.user_name == "user0" for task in tasks)
+    assert repo.add_task(make_task(20)).id == 21
+
+def test_restore_rejects_ids_outside_the_sequence(tmp_path):
+    source = TaskRepository()
+    tasks = source.add_tasks([make_task(number) for number in range(6)])
+    path = str(tmp_path / "tasks.dump")
+    dump_repository(source, path)
+
+    # A node owning ids 2, 5, 8, ... can't take ids 1, 3, 4 or 6.
+    repo = TaskRepository(id_start=2, id_step=3)
+    with pytest.raises(ValueError, match="Task 1 is not in this node's id sequence"):
+        restore_repository(repo, path, workers=1)
+    assert len(repo.list_tasks()) == 0
+
+    own = [task for task in tasks if (task.id - 2) % 3 == 0]
+    write_dump(path, own)
+    assert restore_repository(repo, path, workers=1) == len(own)
+    assert repo.add_task(make_task(6)).id == 8
+
+def test_restore_needs_an_empty_repository(tmp_path):
+    source = source_repository()
+    path = str(tmp_path / "tasks.dump")
+    dump_repository(source, path)
+    repo = TaskRepository()
+    repo.add_task(make_task(0, title="Existing"))
+    with pytest.raises(RuntimeError):
+        restore_repository(repo, path, workers=1)
@@ -0,0 +1,54 @@
+from datetime import date
+
+import pytest
+from app.domain.models.task import Recurrence, TaskCreate, TaskUpdate
+from app.repositories.task_archive import TaskArchive
+from app.repositories.task_dump import dump_repository, load_dump
+from app.repositories.task_repository import TaskRepository
+
+def make_task(**fields):
+    values = dict(title="Water plants", description="Balcony and kitchen", priority=2, due_date=date(2030, 1, 1), user_name="alice")
+    values.update(fields)
+    return TaskCreate(**values)
+
+def test_update_rejects_recurrence_until_without_recurrence():
+    repo = TaskRepository()
+    task = repo.add_task(make_task())
+    with pytest.raises(ValueError, match="requires recurrence"):
+        repo.update_task(task.id, TaskUpdate(recurrence_until=date(2030, 6, 1)))
+    assert repo.get_task(task.id).dict() == task.dict()
+
+def test_update_rejects_due_date_after_recurrence_until():
+    repo = TaskRepository()
+    task = repo.add_task(make_task(recurrence=Recurrence.WEEKLY, recurrence_until=date(2030, 6, 1)))
+    with pytest.raises(ValueError, match="before due_date"):
+        repo.update_task(task.id, TaskUpdate(due_date=date(2030, 7, 1)))
+    assert repo.get_task(task.id).dict() == task.dict()
+    assert [t.id for t in repo.recurring_tasks("alice")] == [task.id]
+
+def test_update_accepts_changes_that_keep_the_task_valid():
+    repo = TaskRepository()
+    task = repo.add_task(make_task())
+    updated = repo.update_task(task.id, TaskUpdate(recurrence=Recurrence.DAILY, recurrence_until=date(2030, 2, 1)))
+    assert updated.recurrence_until == date(2030, 2, 1)
+    updated = repo.update_task(task.id, TaskUpdate(due_date=date(2030, 1, 15), recurrence_until=date(2030, 3, 1)))
+    assert (updated.due_date, updated.recurrence_until) == (date(2030, 1, 15), date(2030, 3, 1))
+
+def test_rejected_update_leaves_archived_task_in_place(tmp_path):
+    repo = TaskRepository(archive=TaskArchive(str(tmp_path)))
+    task = repo.add_task(make_task(due_date=date(2020, 1, 1)))
+    assert repo.archive_aged_tasks(date(2021, 1, 1)) == 1
+    with pytest.raises(ValueError):
+        repo.update_task(task.id, TaskUpdate(recurrence_until=date(2020, 6, 1)))
+    assert repo.get_task(task.id).dict() == task.dict()
+    assert repo.delete_task(task.id)
+
+def test_updated_tasks_survive_a_dump(tmp_path):
+    repo = TaskRepository()
+    task = repo.add_task(make_task(recurrence=Recurrence.MONTHLY, recurrence_until=date(2031, 1, 1)))
+    with pytest.raises(ValueError):
+        repo.update_task(task.id, TaskUpdate(due_date=date(2032, 1, 1)))
+    repo.update_task(task.id, TaskUpdate(recurrence=None))
+    path = str(tmp_path / "tasks.dump")
+    dump_repository(repo, path)
+    assert [t.dict() for t in load_dump(path, workers=1)] == [repo.get_task(task.id).dict()]
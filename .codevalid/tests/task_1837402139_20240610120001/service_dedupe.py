@@ -0,0 +1,64 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date
+
+import pytest
+from app.domain.models.task import TaskCreate
+from app.repositories.task_indexes import FingerprintIndex
+from app.repositories.task_repository import TaskRepository
+from app.services.exceptions import DuplicateTaskError
+from app.services.task_service import TaskService
+
+def make_service(mode, monkeypatch):
+    repository = TaskRepository()
+    fingerprints = FingerprintIndex()
+    repository.add_listener(fingerprints)
+    # Hold the first create open so the second one arrives while it is in flight.
+    started = threading.Event()
+    add_task = repository.add_task
+
+    def slow_add_task(task_data):
+        started.set()
+        time.sleep(0.2)
+        return add_task(task_data)
+
+    monkeypatch.setattr(repository, "add_task", slow_add_task)
+    return TaskService(repository, dedupe_mode=mode, fingerprints=fingerprints), started
+
+def make_task(description, priority=2):
+    return TaskCreate(title="Sync  Calendar", description=description, priority=priority, due_date=date(2030, 1, 1), user_name="alice")
+
+def test_merge_waits_for_an_in_flight_create(monkeypatch):
+    service, started = make_service("merge", monkeypatch)
+    with ThreadPoolExecutor(2) as executor:
+        first = executor.submit(service.create_or_merge_task, make_task("first", 2))
+        started.wait()
+        second = executor.submit(service.create_or_merge_task, make_task("retry", 4))
+        (created, was_created), (merged, was_merged) = first.result(), second.result()
+    assert (was_created, was_merged) == (True, False)
+    assert merged.id == created.id
+    assert (merged.description, merged.priority) == ("retry", 4)
+    assert [task.id for task in service.list_tasks()] == [created.id]
+
+def test_merge_waits_for_an_in_flight_bulk_item(monkeypatch):
+    service, started = make_service("merge", monkeypatch)
+    with ThreadPoolExecutor(2) as executor:
+        single = executor.submit(service.create_task, make_task("single"))
+        started.wait()
+        bulk = executor.submit(service.create_tasks, [make_task("bulk", 5), make_task("other").copy(update={"title": "Other"})])
+        task, (merged, other) = single.result(), bulk.result()
+    assert merged.id == task.id and merged.description == "bulk"
+    assert other.id != task.id
+    assert len(service.list_tasks()) == 2
+
+def test_reject_refuses_an_in_flight_create(monkeypatch):
+    service, started = make_service("reject", monkeypatch)
+    with ThreadPoolExecutor(2) as executor:
+        first = executor.submit(service.create_task, make_task("first"))
+        started.wait()
+        second = executor.submit(service.create_task, make_task("retry"))
+        with pytest.raises(DuplicateTaskError, match="already being created"):
+            second.result()
+        first.result()
+    assert len(service.list_tasks()) == 1
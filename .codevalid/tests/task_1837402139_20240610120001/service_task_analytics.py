@@ -0,0 +1,30 @@
+from datetime import date
+
+from app.domain.models.task import Task
+from app.services.task_analytics import TaskAnalyticsService, TaskColumns
+
+def analytics(*tasks):
+    columns = TaskColumns()
+    for task_id, (due_date, priority) in enumerate(tasks, 1):
+        columns.on_add(Task(id=task_id, title="t", description="d", priority=priority, due_date=due_date, user_name="alice"))
+    return TaskAnalyticsService(columns)
+
+def buckets(result):
+    return [(bucket.start, bucket.end, bucket.counts) for bucket in result.priority_by_due_date]
+
+def test_histogram_skips_empty_buckets():
+    service = analytics((date(2030, 1, 1), 1), (date(2030, 1, 3), 2), (date(2030, 1, 20), 2), (date(2030, 1, 21), 5))
+    assert buckets(service.analyze(bucket_days=7)) == [
+        (date(2030, 1, 1), date(2030, 1, 7), [1, 1, 0, 0, 0]),
+        (date(2030, 1, 15), date(2030, 1, 21), [0, 1, 0, 0, 1]),
+    ]
+
+def test_histogram_spanning_the_whole_calendar():
+    service = analytics((date.min, 1), (date(9999, 12, 30), 5), (date.max, 3))
+    assert buckets(service.analyze(bucket_days=1)) == [
+        (date.min, date.min, [1, 0, 0, 0, 0]),
+        (date(9999, 12, 30), date(9999, 12, 30), [0, 0, 0, 0, 1]),
+        (date.max, date.max, [0, 0, 1, 0, 0]),
+    ]
+    # The last bucket ends at date.max rather than overflowing.
+    assert buckets(service.analyze(bucket_days=7))[-1] == (date(9999, 12, 27), date.max, [0, 0, 1, 0, 1])
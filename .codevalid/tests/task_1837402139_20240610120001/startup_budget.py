@@ -0,0 +1,22 @@
+import os
+import statistics
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+from startup_benchmark import measure_once
+
+RUNS = 3
+BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+def test_startup_stays_within_budget(monkeypatch):
+    """Import plus lifespan startup in a fresh interpreter stays under the budget."""
+    # Time an empty store, not whatever the environment would load.
+    monkeypatch.delenv("SNAPSHOT_PATH", raising=False)
+    monkeypatch.delenv("RESTORE_PATH", raising=False)
+    timings = [measure_once(ROOT) for _ in range(RUNS)]
+    median = statistics.median(timings)
+    assert median <= BUDGET_MS, f"startup took {median:.0f} ms (runs: {[round(t) for t in timings]}), budget {BUDGET_MS:.0f} ms"
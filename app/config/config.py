@@ -1,15 +1,206 @@
+import logging
 import os
-from dotenv import load_dotenv
+import threading
+from dotenv import dotenv_values
+from typing import Callable, Dict, List
+
+# Settings that can change while the process runs (see Config.reload). The
+# rest shape how components are built and need a restart.
+RELOADABLE = (
+    "LOG_LEVEL",
+    "DB_POOL_MIN_SIZE",
+    "DB_POOL_MAX_SIZE",
+    "DB_POOL_TIMEOUT_SECONDS",
+    "DB_COMMAND_TIMEOUT_SECONDS",
+    "DB_COPY_THRESHOLD",
+    "WRITE_COALESCE_WINDOW_MS",
+    "WRITE_COALESCE_MAX_BATCH",
+    "COMPACTION_INTERVAL_SECONDS",
+    "COMPACTION_TOMBSTONE_RATIO",
+    "ARCHIVE_AFTER_DAYS",
+    "TASK_QUOTA_PER_USER",
+    "BULK_MAX_TASKS",
+    "JOB_IMPORT_MAX_BYTES",
+)
+
+_reload_lock = threading.Lock()
+logger = logging.getLogger("Config")
+
+# The process environment wins over .env. Names taken from .env are tracked
+# so a reload can pick up edits to the file, including removed lines.
+_PROCESS_ENVIRONMENT = frozenset(os.environ)
+_dotenv_names = set()
+
+def _load_dotenv():
+    values = {name: value for name, value in dotenv_values().items() if value is not None}
+    for name in _dotenv_names - set(values):
+        os.environ.pop(name, None)
+    _dotenv_names.clear()
+    for name, value in values.items():
+        if name not in _PROCESS_ENVIRONMENT:
+            os.environ[name] = value
+            _dotenv_names.add(name)
 
 class Config:
     def __init__(self):
-        load_dotenv()
+        _load_dotenv()
+        self._subscribers: List[Callable[["Config"], None]] = []
         self.DB_URL = os.getenv("DB_URL")
         self.LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+        self.STORAGE_BACKEND = os.getenv("STORAGE_BACKEND", "memory").lower()
+        self.DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+        self.DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "10"))
+        self.DB_POOL_TIMEOUT_SECONDS = float(os.getenv("DB_POOL_TIMEOUT_SECONDS", "5"))
+        self.DB_COMMAND_TIMEOUT_SECONDS = float(os.getenv("DB_COMMAND_TIMEOUT_SECONDS", "30"))
+        self.DB_COPY_THRESHOLD = int(os.getenv("DB_COPY_THRESHOLD", "500"))
+        self.WRITE_COALESCING = os.getenv("WRITE_COALESCING", "false").lower() == "true"
+        self.WRITE_COALESCE_WINDOW_MS = float(os.getenv("WRITE_COALESCE_WINDOW_MS", "1"))
+        self.WRITE_COALESCE_MAX_BATCH = int(os.getenv("WRITE_COALESCE_MAX_BATCH", "64"))
+        self.COMPACTION_INTERVAL_SECONDS = float(os.getenv("COMPACTION_INTERVAL_SECONDS", "30"))
+        self.COMPACTION_TOMBSTONE_RATIO = float(os.getenv("COMPACTION_TOMBSTONE_RATIO", "0.2"))
+        self.ARCHIVE_DIR = os.getenv("ARCHIVE_DIR")
+        self.ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "90"))
+        self.TASK_QUOTA_PER_USER = int(os.getenv("TASK_QUOTA_PER_USER", "0"))
+        self.DEDUPE_MODE = os.getenv("DEDUPE_MODE", "off").lower()
+        self.DEDUPE_BLOOM_CAPACITY = int(os.getenv("DEDUPE_BLOOM_CAPACITY", "0"))
+        self.BULK_MAX_TASKS = int(os.getenv("BULK_MAX_TASKS", "10000"))
+        self.ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+        self.PROFILE_ALL_REQUESTS = os.getenv("PROFILE_ALL_REQUESTS", "false").lower() == "true"
+        self.PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+        self.PROFILE_RETENTION = int(os.getenv("PROFILE_RETENTION", "100"))
+        self.PARTITION_NODES = [node.strip().rstrip("/") for node in os.getenv("PARTITION_NODES", "").split(",") if node.strip()]
+        self.PARTITION_SELF = os.getenv("PARTITION_SELF", "").rstrip("/")
+        self.PARTITION_MODE = os.getenv("PARTITION_MODE", "redirect").lower()
+        self.PARTITION_VNODES = int(os.getenv("PARTITION_VNODES", "64"))
+        self.CHANGELOG_DIR = os.getenv("CHANGELOG_DIR")
+        self.CHANGELOG_SEGMENT_RECORDS = int(os.getenv("CHANGELOG_SEGMENT_RECORDS", "100000"))
+        self.CHANGELOG_FSYNC = os.getenv("CHANGELOG_FSYNC", "true").lower() == "true"
+        self.ANALYTICS_ENABLED = os.getenv("ANALYTICS_ENABLED", "false").lower() == "true"
+        self.DESCRIPTION_COMPRESSION = os.getenv("DESCRIPTION_COMPRESSION", "false").lower() == "true"
+        self.DESCRIPTION_DICTIONARY_SAMPLES = int(os.getenv("DESCRIPTION_DICTIONARY_SAMPLES", "1000"))
+        self.TASK_CACHE_SLOTS = int(os.getenv("TASK_CACHE_SLOTS", "0"))
+        self.TASK_CACHE_SLOT_BYTES = int(os.getenv("TASK_CACHE_SLOT_BYTES", "1024"))
+        self.TASK_CACHE_TTL_SECONDS = float(os.getenv("TASK_CACHE_TTL_SECONDS", "30"))
+        self.TASK_CACHE_PATH = os.getenv("TASK_CACHE_PATH", "/dev/shm/task-cache")
+        self.SHUTDOWN_DEADLINE_SECONDS = float(os.getenv("SHUTDOWN_DEADLINE_SECONDS", "25"))
+        self.SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH")
+        self.RESTORE_PATH = os.getenv("RESTORE_PATH")
+        self.RESTORE_WORKERS = int(os.getenv("RESTORE_WORKERS", "0"))
+        self.JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+        self.JOB_QUEUE_SIZE = int(os.getenv("JOB_QUEUE_SIZE", "100"))
+        self.JOB_RETENTION = int(os.getenv("JOB_RETENTION", "1000"))
+        self.JOB_ARTIFACT_RETENTION = int(os.getenv("JOB_ARTIFACT_RETENTION", "10"))
+        self.JOB_DIR = os.getenv("JOB_DIR", "jobs")
+        self.JOB_IMPORT_MAX_BYTES = int(os.getenv("JOB_IMPORT_MAX_BYTES", str(256 * 1024 * 1024)))
 
     def validate(self):
         if not self.DB_URL:
             raise ValueError("DB_URL is required in environment variables.")
+        if not isinstance(logging.getLevelName(self.LOG_LEVEL), int):
+            raise ValueError("LOG_LEVEL must be a logging level name such as 'INFO'.")
+        if self.STORAGE_BACKEND not in ("memory", "postgres"):
+            raise ValueError("STORAGE_BACKEND must be 'memory' or 'postgres'.")
+        if self.STORAGE_BACKEND == "postgres" and (
+            self.ANALYTICS_ENABLED
+            or self.ARCHIVE_DIR
+            or self.CHANGELOG_DIR
+            or self.DEDUPE_MODE != "off"
+            or self.DESCRIPTION_COMPRESSION
+            or self.SNAPSHOT_PATH
+            or self.RESTORE_PATH
+        ):
+            raise ValueError(
+                "ANALYTICS_ENABLED, ARCHIVE_DIR, CHANGELOG_DIR, DEDUPE_MODE, DESCRIPTION_COMPRESSION, "
+                "SNAPSHOT_PATH and RESTORE_PATH require the memory storage backend."
+            )
+        if self.CHANGELOG_SEGMENT_RECORDS < 1:
+            raise ValueError("CHANGELOG_SEGMENT_RECORDS must be at least 1.")
+        if self.PARTITION_NODES:
+            if self.PARTITION_SELF not in self.PARTITION_NODES:
+                raise ValueError("PARTITION_SELF must be one of PARTITION_NODES.")
+            if self.PARTITION_MODE not in ("redirect", "forward"):
+                raise ValueError("PARTITION_MODE must be 'redirect' or 'forward'.")
+            if self.STORAGE_BACKEND != "memory":
+                raise ValueError("PARTITION_NODES requires the memory storage backend.")
+        if self.DEDUPE_MODE not in ("off", "reject", "merge"):
+            raise ValueError("DEDUPE_MODE must be 'off', 'reject' or 'merge'.")
+        if not 1 <= self.DB_POOL_MIN_SIZE <= self.DB_POOL_MAX_SIZE:
+            raise ValueError("DB_POOL_MIN_SIZE must be at least 1 and at most DB_POOL_MAX_SIZE.")
+        if self.WRITE_COALESCE_WINDOW_MS < 0:
+            raise ValueError("WRITE_COALESCE_WINDOW_MS must not be negative.")
+        if self.WRITE_COALESCE_MAX_BATCH < 1:
+            raise ValueError("WRITE_COALESCE_MAX_BATCH must be at least 1.")
+        if self.TASK_QUOTA_PER_USER < 0:
+            raise ValueError("TASK_QUOTA_PER_USER must not be negative.")
+        if self.ARCHIVE_AFTER_DAYS < 0:
+            raise ValueError("ARCHIVE_AFTER_DAYS must not be negative.")
+        if self.COMPACTION_INTERVAL_SECONDS <= 0:
+            raise ValueError("COMPACTION_INTERVAL_SECONDS must be positive.")
+        if self.TASK_CACHE_SLOTS < 0:
+            raise ValueError("TASK_CACHE_SLOTS must not be negative.")
+        if self.TASK_CACHE_SLOT_BYTES < 1:
+            raise ValueError("TASK_CACHE_SLOT_BYTES must be at least 1.")
+        if self.TASK_CACHE_TTL_SECONDS <= 0:
+            raise ValueError("TASK_CACHE_TTL_SECONDS must be positive.")
+        if self.TASK_CACHE_SLOTS and self.STORAGE_BACKEND != "postgres":
+            # Memory-backend workers each hold their own tasks under the same
+            # ids, so they must not share cached records.
+            raise ValueError("TASK_CACHE_SLOTS requires the postgres storage backend.")
+        if self.DESCRIPTION_DICTIONARY_SAMPLES < 1:
+            raise ValueError("DESCRIPTION_DICTIONARY_SAMPLES must be at least 1.")
+        if self.BULK_MAX_TASKS < 1:
+            raise ValueError("BULK_MAX_TASKS must be at least 1.")
+        if self.SHUTDOWN_DEADLINE_SECONDS <= 0:
+            raise ValueError("SHUTDOWN_DEADLINE_SECONDS must be positive.")
+        if self.RESTORE_WORKERS < 0:
+            raise ValueError("RESTORE_WORKERS must not be negative.")
+        if self.JOB_WORKERS < 0:
+            raise ValueError("JOB_WORKERS must not be negative.")
+        if self.JOB_QUEUE_SIZE < 1:
+            raise ValueError("JOB_QUEUE_SIZE must be at least 1.")
+        if self.JOB_RETENTION < 1:
+            raise ValueError("JOB_RETENTION must be at least 1.")
+        if self.JOB_ARTIFACT_RETENTION < 1:
+            raise ValueError("JOB_ARTIFACT_RETENTION must be at least 1.")
+        if self.JOB_IMPORT_MAX_BYTES < 1:
+            raise ValueError("JOB_IMPORT_MAX_BYTES must be at least 1.")
+        if self.PROFILE_RETENTION < 1:
+            raise ValueError("PROFILE_RETENTION must be at least 1.")
+
+    def subscribe(self, callback: Callable[["Config"], None]):
+        """Call ``callback(config)`` after every reload that changes a setting."""
+        self._subscribers.append(callback)
+
+    def reload(self) -> Dict[str, object]:
+        """Re-read the environment and .env and apply the RELOADABLE settings.
+
+        The new settings are validated as a whole first, so an invalid file
+        changes nothing. They are then swapped in with a single dict update
+        and subscribers are called one at a time under the reload lock, so
+        concurrent reloads can't interleave. Returns the changed settings.
+        """
+        with _reload_lock:
+            fresh = Config()
+            fresh.validate()
+            changes = {
+                name: getattr(fresh, name) for name in RELOADABLE if getattr(fresh, name) != getattr(self, name)
+            }
+            restart_only = sorted(
+                name for name, value in vars(fresh).items()
+                if not name.startswith("_") and name not in RELOADABLE and value != getattr(self, name)
+            )
+            if restart_only:
+                logger.warning(f"Changes to {', '.join(restart_only)} take effect after a restart")
+            if not changes:
+                return {}
+            self.__dict__.update(changes)
+            logger.warning(f"Config reloaded: {changes}")
+            for callback in self._subscribers:
+                try:
+                    callback(self)
+                except Exception as e:
+                    logger.error(f"Applying reloaded config failed: {e}")
+            return changes
 
 config = Config()
 config.validate()
\ No newline at end of file
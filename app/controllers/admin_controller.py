@@ -0,0 +1,27 @@
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.responses import FileResponse
+from app.config.config import config
+from app.dependencies import get_request_profiler
+from app.services.request_profiler import RequestProfiler, is_admin
+from typing import Any, Dict
+
+def require_admin(request: Request):
+    if not is_admin(request, config.ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+router = APIRouter(prefix="/admin", dependencies=[Depends(require_admin)])
+
+@router.get("/profiles/{name}")
+def download_profile(name: str, request_profiler: RequestProfiler = Depends(get_request_profiler)):
+    path = request_profiler.artifact_path(name)
+    if path is None:
+        raise HTTPException(status_code=404, detail=f"Profile {name} not found")
+    return FileResponse(path, media_type="application/octet-stream", filename=name)
+
+@router.post("/config/reload")
+def reload_config() -> Dict[str, Any]:
+    try:
+        changed = config.reload()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"changed": changed}
\ No newline at end of file
@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends, Query
+from app.dependencies import get_task_analytics_service
+from app.domain.models.analytics import TaskAnalytics
+from app.services.task_analytics import TaskAnalyticsService
+from datetime import date
+from typing import Optional
+
+router = APIRouter()
+
+@router.get("/tasks/analytics", response_model=TaskAnalytics)
+def task_analytics(
+    bucket_days: int = Query(7, ge=1, le=366),
+    start: Optional[date] = Query(None, alias="from"),
+    end: Optional[date] = Query(None, alias="to"),
+    top_users: int = Query(10, ge=1, le=100),
+    analytics_service: TaskAnalyticsService = Depends(get_task_analytics_service),
+):
+    return analytics_service.analyze(bucket_days=bucket_days, start=start, end=end, top_users=top_users)
\ No newline at end of file
@@ -0,0 +1,16 @@
+from fastapi import APIRouter, Depends, Query, Response
+from app.dependencies import get_change_log
+from app.repositories.change_log import ChangeLog
+
+router = APIRouter()
+
+@router.get("/tasks/changes")
+def list_changes(
+    since: int = Query(0, ge=0),
+    limit: int = Query(1000, ge=1, le=10000),
+    change_log: ChangeLog = Depends(get_change_log),
+):
+    # Changes are stored as JSON lines; splice them in instead of re-encoding.
+    lines, next_offset = change_log.read(since, limit)
+    body = b'{"changes":[' + b",".join(lines) + b'],"next_offset":' + str(next_offset).encode() + b"}"
+    return Response(content=body, media_type="application/json")
\ No newline at end of file
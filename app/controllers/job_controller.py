@@ -0,0 +1,124 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import FileResponse
+from app.config.config import config
+from app.controllers.admin_controller import require_admin
+from app.dependencies import get_job_queue, get_task_compactor, get_task_service
+from app.domain.codecs import task_binary, task_json
+from app.domain.models.job import ExportFormat, JobState, JobStatus
+from app.services import task_jobs
+from app.services.exceptions import JobQueueFullError
+from app.services.job_queue import Job, JobQueue
+from app.services.task_service import TaskService
+from functools import partial
+from typing import Callable, Optional
+import anyio
+import os
+import tempfile
+
+router = APIRouter(prefix="/jobs")
+
+def submit(job_queue: JobQueue, kind: str, function: Callable[[Job], dict], response: Response, spool: Optional[str] = None) -> JobStatus:
+    try:
+        job = job_queue.submit(kind, function, spool)
+    except JobQueueFullError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": "1"})
+    response.headers["Location"] = f"/jobs/{job.id}"
+    return job.status()
+
+async def spool_limited(request: Request, max_bytes: int, directory: str) -> str:
+    """Stream the request body into a new file in ``directory`` and return its path.
+
+    Queued imports wait on disk rather than in memory. Raises 413, leaving
+    no file behind, once the body exceeds ``max_bytes``.
+    """
+    too_large = HTTPException(status_code=413, detail=f"Import payloads are limited to {max_bytes} bytes")
+    length = request.headers.get("content-length")
+    if length is not None and length.isdigit() and int(length) > max_bytes:
+        raise too_large
+    os.makedirs(directory, exist_ok=True)
+    fd, path = tempfile.mkstemp(prefix="import-", suffix=".upload", dir=directory)
+    try:
+        size = 0
+        async with await anyio.open_file(fd, "wb") as f:
+            async for chunk in request.stream():
+                size += len(chunk)
+                if size > max_bytes:
+                    raise too_large
+                await f.write(chunk)
+    except BaseException:
+        os.remove(path)
+        raise
+    return path
+
+@router.post("/import", response_model=JobStatus, status_code=202)
+async def import_tasks(
+    request: Request,
+    response: Response,
+    task_service: TaskService = Depends(get_task_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    # Same payload as POST /tasks/bulk, without its task limit; parsing
+    # happens in the job.
+    binary = request.headers.get("content-type", "").startswith(task_binary.MEDIA_TYPE)
+    path = await spool_limited(request, config.JOB_IMPORT_MAX_BYTES, config.JOB_DIR)
+    function = partial(task_jobs.import_tasks, task_service=task_service, path=path, binary=binary)
+    try:
+        return submit(job_queue, "import", function, response, spool=path)
+    except Exception:
+        os.remove(path)
+        raise
+
+@router.post("/export", response_model=JobStatus, status_code=202)
+def export_tasks(
+    response: Response,
+    format: ExportFormat = Query(ExportFormat.NDJSON),
+    task_service: TaskService = Depends(get_task_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    binary = format == ExportFormat.BINARY
+
+    def export(job: Job) -> dict:
+        path = os.path.join(config.JOB_DIR, f"export-{job.id}.{'bin' if binary else 'ndjson'}")
+        return task_jobs.export_tasks(job, task_service, path, binary)
+
+    return submit(job_queue, "export", export, response)
+
+@router.post("/reindex", response_model=JobStatus, status_code=202, dependencies=[Depends(require_admin)])
+def reindex(
+    response: Response,
+    task_service: TaskService = Depends(get_task_service),
+    job_queue: JobQueue = Depends(get_job_queue),
+):
+    return submit(job_queue, "reindex", partial(task_jobs.reindex, task_service=task_service), response)
+
+@router.post("/compaction", response_model=JobStatus, status_code=202, dependencies=[Depends(require_admin)])
+def compact(response: Response, job_queue: JobQueue = Depends(get_job_queue)):
+    if config.STORAGE_BACKEND != "memory":
+        raise HTTPException(status_code=400, detail="Compaction applies to the memory storage backend only")
+    return submit(job_queue, "compaction", partial(task_jobs.compact, task_compactor=get_task_compactor()), response)
+
+def find_job(job_id: int, job_queue: JobQueue = Depends(get_job_queue)) -> Job:
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job
+
+@router.get("/{job_id}", response_model=JobStatus)
+def get_job(job: Job = Depends(find_job)):
+    return job.status()
+
+@router.get("/{job_id}/result")
+def download_result(job: Job = Depends(find_job)):
+    if job.artifact is None:
+        if job.state in (JobState.QUEUED, JobState.RUNNING):
+            raise HTTPException(status_code=409, detail=f"Job {job.id} has not finished")
+        raise HTTPException(status_code=404, detail=f"Job {job.id} has no downloadable result")
+    media_type = task_binary.MEDIA_TYPE if job.artifact.endswith(".bin") else task_json.NDJSON_MEDIA_TYPE
+    return FileResponse(job.artifact, media_type=media_type, filename=os.path.basename(job.artifact))
+
+@router.delete("/{job_id}", response_model=JobStatus)
+def cancel_job(job_id: int, job_queue: JobQueue = Depends(get_job_queue)):
+    job = job_queue.cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job {job_id} not found")
+    return job.status()
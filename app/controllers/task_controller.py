@@ -1,16 +1,175 @@
-from fastapi import APIRouter, HTTPException
-from app.domain.models.task import TaskCreate, Task
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from app.config.config import config
+from app.dependencies import get_request_profiler, get_task_service
+from app.domain.codecs import task_binary, task_json
+from app.domain.models.task import CalendarDay, TaskCreate, TaskOccurrence, TaskUpdate, Task
+from app.domain.projection import parse_fields
+from app.services.exceptions import DuplicateTaskError, QuotaExceededError
+from app.services.request_profiler import RequestProfiler
 from app.services.task_service import TaskService
+from datetime import date
+from typing import List, Optional, Tuple
 
 router = APIRouter()
 
-# Dependency injection (for demo, instantiate here)
-from app.repositories.task_repository import TaskRepository
-task_service = TaskService(TaskRepository())
-
 @router.post("/tasks", response_model=Task, status_code=201)
-def create_task(task: TaskCreate):
+def create_task(
+    task: TaskCreate,
+    request: Request,
+    response: Response,
+    task_service: TaskService = Depends(get_task_service),
+    request_profiler: RequestProfiler = Depends(get_request_profiler),
+):
     try:
-        return task_service.create_task(task)
+        with request_profiler.profile(request) as profiling:
+            # A profiled create skips the write coalescer so the repository
+            # work runs on this thread, where the profiler can see it.
+            saved, created = task_service.create_or_merge_task(task, coalesce=not profiling)
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except DuplicateTaskError as e:
+        raise HTTPException(status_code=409, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+    if not created:
+        # Merged into an existing task (DEDUPE_MODE=merge).
+        response.status_code = 200
+    return saved
+
+def requested_fields(
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return, e.g. id,title,due_date"),
+) -> Optional[Tuple[str, ...]]:
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+def json_response(body: bytes) -> Response:
+    return Response(content=body, media_type="application/json")
+
+@router.get("/tasks", response_model=List[Task])
+def list_tasks(
+    fields: Optional[Tuple[str, ...]] = Depends(requested_fields),
+    task_service: TaskService = Depends(get_task_service),
+):
+    if fields is not None:
+        return json_response(task_service.project_tasks(fields))
+    return list(task_service.list_tasks())
+
+def accepts_binary(request: Request) -> bool:
+    return task_binary.MEDIA_TYPE in request.headers.get("accept", "")
+
+@router.post("/tasks/bulk", response_model=List[Task], status_code=201)
+async def create_tasks(request: Request, task_service: TaskService = Depends(get_task_service)):
+    body = await request.body()
+    try:
+        if request.headers.get("content-type", "").startswith(task_binary.MEDIA_TYPE):
+            tasks_data = task_binary.decode_task_creates(body)
+        else:
+            tasks_data = task_json.decode_task_creates(body)
+    except (ValueError, TypeError) as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    max_tasks = config.BULK_MAX_TASKS
+    if len(tasks_data) > max_tasks:
+        raise HTTPException(status_code=413, detail=f"At most {max_tasks} tasks per request")
+    try:
+        tasks = await run_in_threadpool(task_service.create_tasks, tasks_data)
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except DuplicateTaskError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    if accepts_binary(request):
+        return Response(content=task_binary.encode_tasks(tasks), media_type=task_binary.MEDIA_TYPE, status_code=201)
+    return tasks
+
+@router.get("/tasks/export", response_model=List[Task])
+def export_tasks(
+    request: Request,
+    fields: Optional[Tuple[str, ...]] = Depends(requested_fields),
+    task_service: TaskService = Depends(get_task_service),
+):
+    if fields is not None:
+        if accepts_binary(request):
+            raise HTTPException(status_code=400, detail="'fields' is not supported by the binary format")
+        return json_response(task_service.project_tasks(fields))
+    snapshot = task_service.list_tasks()
+    if accepts_binary(request):
+        return StreamingResponse(
+            task_binary.iter_encoded_tasks(snapshot, len(snapshot)), media_type=task_binary.MEDIA_TYPE
+        )
+    return list(snapshot)
+
+@router.get("/tasks/{task_id}", response_model=Task)
+def get_task(
+    task_id: int,
+    fields: Optional[Tuple[str, ...]] = Depends(requested_fields),
+    task_service: TaskService = Depends(get_task_service),
+):
+    if fields is not None:
+        body = task_service.project_task(task_id, fields)
+        if body is None:
+            raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+        return json_response(body)
+    body = task_service.get_task_json(task_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return json_response(body)
+
+@router.patch("/tasks/{task_id}", response_model=Task)
+def update_task(task_id: int, task_update: TaskUpdate, task_service: TaskService = Depends(get_task_service)):
+    try:
+        task = task_service.update_task(task_id, task_update)
+    except QuotaExceededError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if task is None:
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+    return task
+
+@router.delete("/tasks/{task_id}", status_code=204)
+def delete_task(task_id: int, task_service: TaskService = Depends(get_task_service)):
+    if not task_service.delete_task(task_id):
+        raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
+
+@router.get("/users/{user_name}/tasks", response_model=List[Task])
+def top_tasks(
+    user_name: str,
+    limit: int = Query(20, ge=1, le=1000),
+    fields: Optional[Tuple[str, ...]] = Depends(requested_fields),
+    task_service: TaskService = Depends(get_task_service),
+):
+    if fields is not None:
+        return json_response(task_service.project_top_tasks(user_name, limit, fields))
+    return task_service.top_tasks(user_name, limit)
+
+# Bounds the work of expanding daily tasks for one request.
+MAX_OCCURRENCE_WINDOW_DAYS = 366
+
+@router.get("/users/{user_name}/occurrences", response_model=List[TaskOccurrence])
+def task_occurrences(
+    user_name: str,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    task_service: TaskService = Depends(get_task_service),
+):
+    check_window(start, end)
+    return task_service.occurrences(user_name, start, end)
+
+@router.get("/users/{user_name}/calendar", response_model=List[CalendarDay])
+def task_calendar(
+    user_name: str,
+    start: date = Query(..., alias="from"),
+    end: date = Query(..., alias="to"),
+    task_service: TaskService = Depends(get_task_service),
+):
+    check_window(start, end)
+    return task_service.calendar(user_name, start, end)
+
+def check_window(start: date, end: date):
+    if end < start:
+        raise HTTPException(status_code=400, detail="'to' must not be before 'from'")
+    if (end - start).days >= MAX_OCCURRENCE_WINDOW_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window is limited to {MAX_OCCURRENCE_WINDOW_DAYS} days")
\ No newline at end of file
@@ -0,0 +1,144 @@
+from app.config.config import config
+from app.repositories.change_log import ChangeLog
+from app.repositories.description_codec import DescriptionCodec
+from app.repositories.shared_task_cache import SharedTaskCache
+from app.repositories.task_archive import TaskArchive
+from app.repositories.task_compactor import TaskCompactor
+from app.repositories.task_indexes import FingerprintIndex
+from app.repositories.task_repository import TaskRepository
+from app.services.job_queue import JobQueue
+from app.services.request_profiler import RequestProfiler
+from app.services.task_service import TaskService
+from app.services.write_coalescer import WriteCoalescer
+from functools import lru_cache
+
+# Dependency injection: each component is built on first use rather than at
+# import time, so importing the app stays cheap and unused parts are never
+# constructed. Components with reloadable settings subscribe to the config
+# when they are built.
+
+@lru_cache()
+def get_task_repository() -> TaskRepository:
+    if config.STORAGE_BACKEND == "postgres":
+        return get_sql_task_repository()
+    archive = TaskArchive(config.ARCHIVE_DIR) if config.ARCHIVE_DIR else None
+    codec = None
+    if config.DESCRIPTION_COMPRESSION:
+        # Reuse the dictionary archived descriptions were compressed with.
+        dictionary = archive.dictionary if archive is not None else None
+        codec = DescriptionCodec(config.DESCRIPTION_DICTIONARY_SAMPLES, dictionary=dictionary)
+    if config.PARTITION_NODES:
+        return TaskRepository(
+            archive,
+            id_start=config.PARTITION_NODES.index(config.PARTITION_SELF) + 1,
+            id_step=len(config.PARTITION_NODES),
+            description_codec=codec,
+        )
+    return TaskRepository(archive, description_codec=codec)
+
+@lru_cache()
+def get_sql_task_repository():
+    # asyncpg is only needed (and imported) for the postgres backend.
+    from app.repositories.sql_task_repository import AsyncSqlTaskRepository, SqlTaskRepository
+    repository = SqlTaskRepository(AsyncSqlTaskRepository(config.DB_URL, **_pool_settings(config)))
+    config.subscribe(lambda settings: repository.configure(**_pool_settings(settings)))
+    return repository
+
+def _pool_settings(settings) -> dict:
+    return dict(
+        min_size=settings.DB_POOL_MIN_SIZE,
+        max_size=settings.DB_POOL_MAX_SIZE,
+        acquire_timeout=settings.DB_POOL_TIMEOUT_SECONDS,
+        command_timeout=settings.DB_COMMAND_TIMEOUT_SECONDS,
+        copy_threshold=settings.DB_COPY_THRESHOLD,
+    )
+
+@lru_cache()
+def get_write_coalescer() -> WriteCoalescer:
+    coalescer = WriteCoalescer(
+        get_task_repository(),
+        max_batch=config.WRITE_COALESCE_MAX_BATCH,
+        max_delay=config.WRITE_COALESCE_WINDOW_MS / 1000,
+    )
+    config.subscribe(lambda settings: coalescer.configure(
+        settings.WRITE_COALESCE_MAX_BATCH,
+        settings.WRITE_COALESCE_WINDOW_MS / 1000,
+    ))
+    return coalescer
+
+@lru_cache()
+def get_task_service() -> TaskService:
+    coalescer = get_write_coalescer() if config.WRITE_COALESCING else None
+    fingerprints = None
+    if config.DEDUPE_MODE != "off":
+        fingerprints = FingerprintIndex(config.DEDUPE_BLOOM_CAPACITY)
+        get_task_repository().add_listener(fingerprints)
+    task_service = TaskService(
+        get_task_repository(),
+        coalescer,
+        quota_per_user=config.TASK_QUOTA_PER_USER,
+        dedupe_mode=config.DEDUPE_MODE,
+        fingerprints=fingerprints,
+        cache=get_task_cache() if config.TASK_CACHE_SLOTS else None,
+    )
+    config.subscribe(lambda settings: setattr(task_service, "quota_per_user", settings.TASK_QUOTA_PER_USER))
+    return task_service
+
+@lru_cache()
+def get_task_cache() -> SharedTaskCache:
+    return SharedTaskCache(
+        config.TASK_CACHE_PATH,
+        config.TASK_CACHE_SLOTS,
+        slot_bytes=config.TASK_CACHE_SLOT_BYTES,
+        ttl=config.TASK_CACHE_TTL_SECONDS,
+    )
+
+@lru_cache()
+def get_job_queue() -> JobQueue:
+    return JobQueue(
+        config.JOB_WORKERS,
+        max_pending=config.JOB_QUEUE_SIZE,
+        retention=config.JOB_RETENTION,
+        artifact_retention=config.JOB_ARTIFACT_RETENTION,
+    )
+
+@lru_cache()
+def get_request_profiler() -> RequestProfiler:
+    return RequestProfiler(
+        config.PROFILE_DIR,
+        always=config.PROFILE_ALL_REQUESTS,
+        admin_token=config.ADMIN_TOKEN,
+        retention=config.PROFILE_RETENTION,
+    )
+
+@lru_cache()
+def get_task_compactor() -> TaskCompactor:
+    task_compactor = TaskCompactor(get_task_repository(), **_compaction_settings(config))
+    config.subscribe(lambda settings: task_compactor.configure(**_compaction_settings(settings)))
+    return task_compactor
+
+def _compaction_settings(settings) -> dict:
+    return dict(
+        interval=settings.COMPACTION_INTERVAL_SECONDS,
+        min_tombstone_ratio=settings.COMPACTION_TOMBSTONE_RATIO,
+        archive_after_days=settings.ARCHIVE_AFTER_DAYS if settings.ARCHIVE_DIR else None,
+    )
+
+@lru_cache()
+def get_task_analytics_service():
+    # numpy is only needed (and imported) when analytics are enabled.
+    from app.services.task_analytics import TaskAnalyticsService, TaskColumns
+    columns = TaskColumns()
+    get_task_repository().add_listener(columns)
+    return TaskAnalyticsService(columns)
+
+@lru_cache()
+def get_change_log() -> ChangeLog:
+    change_log = ChangeLog(
+        config.CHANGELOG_DIR,
+        segment_records=config.CHANGELOG_SEGMENT_RECORDS,
+        fsync=config.CHANGELOG_FSYNC,
+    )
+    # Only changes from now on are logged; the store itself isn't replayed.
+    get_task_repository().add_listener(change_log, replay=False)
+    return change_log
\ No newline at end of file
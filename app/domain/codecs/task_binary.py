@@ -0,0 +1,183 @@
+"""Fixed-schema, length-prefixed binary encoding of tasks.
+
+A payload is a header (magic ``TSK2`` and a u32 record count) followed by
+records. Each record is a fixed little-endian prefix - id (u64, 0 for new
+tasks), priority (u8), due date as a proleptic ordinal (i32), the byte
+lengths of title (u16), description (u16) and user_name (u8), recurrence
+(u8: 0 none, 1 daily, 2 weekly, 3 monthly) and recurrence_until as an
+ordinal (i32, 0 for none) - followed by the three UTF-8 strings. Decoding
+goes straight from the buffer to model fields without an intermediate JSON
+document.
+
+Archive segments reuse the record layout and may set COMPRESSED in the
+recurrence byte: the description is then stored deflated (as bytes) and
+decode_task hands it to a ``decompress`` function. Payloads from clients
+never carry it; decode_validated rejects it.
+"""
+from app.domain.models.task import Recurrence, Task, TaskCreate
+from datetime import date
+from typing import Callable, Iterable, Iterator, List, Optional
+import struct
+
+MEDIA_TYPE = "application/vnd.tasks+binary"
+MAGIC = b"TSK2"
+
+HEADER = struct.Struct("<4sI")
+RECORD = struct.Struct("<QBiHHBBi")
+# The string lengths within RECORD, for skipping over records.
+LENGTHS = struct.Struct("<HHB")
+LENGTHS_OFFSET = 13
+RECURRENCES = (None, Recurrence.DAILY, Recurrence.WEEKLY, Recurrence.MONTHLY)
+RECURRENCE_CODES = {recurrence: code for code, recurrence in enumerate(RECURRENCES)}
+COMPRESSED = 0x80
+
+def encode_task(buffer: bytearray, task: TaskCreate, task_id: int = 0):
+    title = task.title.encode()
+    # bytes are an already compressed description (archive segments only).
+    compressed = isinstance(task.description, bytes)
+    description = task.description if compressed else task.description.encode()
+    user_name = task.user_name.encode()
+    buffer += RECORD.pack(
+        task_id,
+        task.priority,
+        task.due_date.toordinal(),
+        len(title),
+        len(description),
+        len(user_name),
+        RECURRENCE_CODES[task.recurrence] | (COMPRESSED if compressed else 0),
+        task.recurrence_until.toordinal() if task.recurrence_until else 0,
+    )
+    buffer += title
+    buffer += description
+    buffer += user_name
+
+def encode_header(count: int) -> bytes:
+    return HEADER.pack(MAGIC, count)
+
+def encode_tasks(tasks: List[Task]) -> bytes:
+    buffer = bytearray(encode_header(len(tasks)))
+    for task in tasks:
+        encode_task(buffer, task, task.id)
+    return bytes(buffer)
+
+def iter_encoded_tasks(tasks: Iterable[Task], count: int, batch_size: int = 1000) -> Iterator[bytes]:
+    """Yield an encoded payload in chunks, for streaming responses."""
+    yield encode_header(count)
+    buffer = bytearray()
+    for written, task in enumerate(tasks, 1):
+        encode_task(buffer, task, task.id)
+        if written % batch_size == 0:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+def _text(view: memoryview, start: int, length: int, field: str, max_length: int) -> str:
+    value = str(view[start:start + length], "utf-8")
+    if not 1 <= len(value) <= max_length:
+        raise ValueError(f"'{field}' must be between 1 and {max_length} characters")
+    return value
+
+def decode_task(
+    view: memoryview,
+    offset: int,
+    decompress: Optional[Callable[[bytes], str]] = None,
+    with_description: bool = True,
+):
+    """Decode one trusted record (e.g. from our own archive) into a Task.
+
+    Returns the task and the offset of the next record. With
+    ``with_description=False`` the description is skipped and left None,
+    for callers that only index tasks.
+    """
+    fields = RECORD.unpack_from(view, offset)
+    task_id, priority, due_ordinal, title_length, description_length, user_length, recurrence, until_ordinal = fields
+    offset += RECORD.size
+    title = str(view[offset:offset + title_length], "utf-8")
+    offset += title_length
+    if not with_description:
+        recurrence &= ~COMPRESSED
+        description = None
+    elif recurrence & COMPRESSED:
+        recurrence &= ~COMPRESSED
+        description = decompress(bytes(view[offset:offset + description_length]))
+    else:
+        description = str(view[offset:offset + description_length], "utf-8")
+    offset += description_length
+    user_name = str(view[offset:offset + user_length], "utf-8")
+    offset += user_length
+    task = Task.construct(
+        id=task_id,
+        title=title,
+        description=description,
+        priority=priority,
+        due_date=date.fromordinal(due_ordinal),
+        user_name=user_name,
+        recurrence=RECURRENCES[recurrence],
+        recurrence_until=date.fromordinal(until_ordinal) if until_ordinal else None,
+    )
+    return task, offset
+
+def record_end(view: memoryview, offset: int) -> int:
+    """Return the offset just past the record at ``offset`` without decoding it."""
+    title_length, description_length, user_length = LENGTHS.unpack_from(view, offset + LENGTHS_OFFSET)
+    return offset + RECORD.size + title_length + description_length + user_length
+
+def decode_validated(view: memoryview, offset: int, end: int):
+    """Decode and validate one untrusted record ending at or before ``end``.
+
+    Returns the record's id, its TaskCreate fields and the offset of the
+    next record; raises ValueError on malformed input.
+    """
+    if offset + RECORD.size > end:
+        raise ValueError("Binary payload is truncated")
+    fields = RECORD.unpack_from(view, offset)
+    task_id, priority, due_ordinal, title_length, description_length, user_length, recurrence, until_ordinal = fields
+    offset += RECORD.size
+    if offset + title_length + description_length + user_length > end:
+        raise ValueError("Binary payload is truncated")
+    if not 1 <= priority <= 5:
+        raise ValueError("'priority' must be between 1 and 5")
+    if not 1 <= due_ordinal <= date.max.toordinal():
+        raise ValueError("'due_date' is out of range")
+    if recurrence >= len(RECURRENCES):
+        raise ValueError("'recurrence' is not a known rule")
+    if not 0 <= until_ordinal <= date.max.toordinal():
+        raise ValueError("'recurrence_until' is out of range")
+    if until_ordinal and RECURRENCES[recurrence] is None:
+        raise ValueError("'recurrence_until' requires 'recurrence'")
+    if until_ordinal and until_ordinal < due_ordinal:
+        raise ValueError("'recurrence_until' must not be before 'due_date'")
+    title = _text(view, offset, title_length, "title", 100)
+    offset += title_length
+    description = _text(view, offset, description_length, "description", 1000)
+    offset += description_length
+    user_name = _text(view, offset, user_length, "user_name", 50)
+    offset += user_length
+    return task_id, dict(
+        title=title,
+        description=description,
+        priority=priority,
+        due_date=date.fromordinal(due_ordinal),
+        user_name=user_name,
+        recurrence=RECURRENCES[recurrence],
+        recurrence_until=date.fromordinal(until_ordinal) if until_ordinal else None,
+    ), offset
+
+def decode_task_creates(payload: bytes) -> List[TaskCreate]:
+    """Decode and validate new tasks; raises ValueError on malformed input."""
+    view = memoryview(payload)
+    if len(view) < HEADER.size:
+        raise ValueError("Binary payload is truncated")
+    magic, count = HEADER.unpack_from(view, 0)
+    if magic != MAGIC:
+        raise ValueError("Binary payload has an unknown format")
+    offset = HEADER.size
+    tasks = []
+    for _ in range(count):
+        _, fields, offset = decode_validated(view, offset, len(view))
+        # Fields are validated above, so skip pydantic's validation pass.
+        tasks.append(TaskCreate.construct(**fields))
+    if offset != len(view):
+        raise ValueError("Binary payload has trailing bytes")
+    return tasks
\ No newline at end of file
@@ -0,0 +1,17 @@
+"""JSON encodings of tasks: the array accepted by bulk endpoints and newline-delimited exports."""
+from app.domain.models.task import Task, TaskCreate
+from typing import Iterable, Iterator, List
+import json
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def decode_task_creates(payload: bytes) -> List[TaskCreate]:
+    items = json.loads(payload)
+    if not isinstance(items, list):
+        raise ValueError("Expected a JSON array of tasks")
+    return [TaskCreate(**item) for item in items]
+
+def iter_ndjson(tasks: Iterable[Task]) -> Iterator[bytes]:
+    """Yield one JSON line per task."""
+    for task in tasks:
+        yield task.json().encode() + b"\n"
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List
+
+class PriorityBucket(BaseModel):
+    start: date
+    end: date
+    counts: List[int]
+
+class UserWorkload(BaseModel):
+    user_name: str
+    tasks: int
+
+class WorkloadDistribution(BaseModel):
+    users: int
+    mean: float
+    p50: float
+    p90: float
+    p99: float
+    max: int
+    top: List[UserWorkload]
+
+class TaskAnalytics(BaseModel):
+    tasks: int
+    bucket_days: int
+    priority_by_due_date: List[PriorityBucket]
+    workload: WorkloadDistribution
\ No newline at end of file
@@ -0,0 +1,27 @@
+from pydantic import BaseModel
+from datetime import datetime
+from enum import Enum
+from typing import Any, Dict, Optional
+
+class JobState(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+class ExportFormat(str, Enum):
+    NDJSON = "ndjson"
+    BINARY = "binary"
+
+class JobStatus(BaseModel):
+    id: int
+    kind: str
+    state: JobState
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    done: int = 0
+    total: Optional[int] = None
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
\ No newline at end of file
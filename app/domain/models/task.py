@@ -1,5 +1,12 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, root_validator
 from datetime import date
+from enum import Enum
+from typing import List, Optional
+
+class Recurrence(str, Enum):
+    DAILY = "daily"
+    WEEKLY = "weekly"
+    MONTHLY = "monthly"
 
 class TaskCreate(BaseModel):
     title: str = Field(..., min_length=1, max_length=100)
@@ -7,6 +14,61 @@ class TaskCreate(BaseModel):
     priority: int = Field(..., ge=1, le=5)
     due_date: date
     user_name: str = Field(..., min_length=1, max_length=50)
+    # A recurring task is stored once; due_date is its first occurrence.
+    recurrence: Optional[Recurrence] = None
+    recurrence_until: Optional[date] = None
+
+    @root_validator(skip_on_failure=True)
+    def check_recurrence_until(cls, values):
+        check_recurrence_until(values["due_date"], values.get("recurrence"), values.get("recurrence_until"))
+        return values
+
+def check_recurrence_until(due_date: date, recurrence: Optional[Recurrence], recurrence_until: Optional[date]):
+    """Raise ValueError unless recurrence_until fits the task's recurrence and due_date.
+
+    Updates run this on the task as it would be after the change.
+    """
+    if recurrence_until is not None:
+        if recurrence is None:
+            raise ValueError("recurrence_until requires recurrence")
+        if recurrence_until < due_date:
+            raise ValueError("recurrence_until must not be before due_date")
+
+# Fields a TaskUpdate can clear by sending null; for the rest null means
+# "leave unchanged".
+CLEARABLE_FIELDS = ("recurrence", "recurrence_until")
+
+class TaskUpdate(BaseModel):
+    title: Optional[str] = Field(None, min_length=1, max_length=100)
+    description: Optional[str] = Field(None, min_length=1, max_length=1000)
+    priority: Optional[int] = Field(None, ge=1, le=5)
+    due_date: Optional[date] = None
+    user_name: Optional[str] = Field(None, min_length=1, max_length=50)
+    recurrence: Optional[Recurrence] = None
+    recurrence_until: Optional[date] = None
+
+    def changes(self) -> dict:
+        """Return the fields to change, by name."""
+        changes = {
+            name: value
+            for name, value in self.dict(exclude_unset=True).items()
+            if value is not None or name in CLEARABLE_FIELDS
+        }
+        if "recurrence" in changes and changes["recurrence"] is None:
+            # A task that stops recurring has no series end either.
+            changes["recurrence_until"] = None
+        return changes
 
 class Task(TaskCreate):
-    id: int
\ No newline at end of file
+    id: int
+
+class TaskOccurrence(BaseModel):
+    task_id: int
+    date: date
+    title: str
+    priority: int
+    user_name: str
+
+class CalendarDay(BaseModel):
+    date: date
+    tasks: List[TaskOccurrence]
\ No newline at end of file
@@ -0,0 +1,42 @@
+from app.domain.models.task import Task
+from datetime import date
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+import json
+
+TASK_FIELDS = tuple(Task.__fields__)
+
+def parse_fields(value: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a ``fields=id,title,...`` parameter; None means every field."""
+    if value is None:
+        return None
+    fields = tuple(dict.fromkeys(name.strip() for name in value.split(",") if name.strip()))
+    if not fields:
+        raise ValueError("'fields' must name at least one field")
+    unknown = [name for name in fields if name not in TASK_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; expected some of {', '.join(TASK_FIELDS)}")
+    return fields
+
+def projector(fields: Sequence[str], inflate: Callable[[Task], Task]) -> Callable[[Task], Dict[str, object]]:
+    """Build a function mapping a stored task to a JSON-ready dict of ``fields``.
+
+    Values are read straight off the task; no model is built or validated.
+    Compressed descriptions are only inflated when ``description`` is asked for.
+    """
+    needs_description = "description" in fields
+
+    def project(task: Task) -> Dict[str, object]:
+        if needs_description:
+            task = inflate(task)
+        row = {}
+        for name in fields:
+            value = getattr(task, name)
+            # Recurrence is a str enum, which json encodes as its value.
+            row[name] = value.isoformat() if isinstance(value, date) else value
+        return row
+
+    return project
+
+def encode_projection(tasks: Iterable[Task], fields: Sequence[str], inflate: Callable[[Task], Task]) -> bytes:
+    project = projector(fields, inflate)
+    return json.dumps([project(task) for task in tasks], separators=(",", ":")).encode()
@@ -0,0 +1,43 @@
+from app.domain.models.task import Recurrence, Task
+from calendar import monthrange
+from datetime import date
+from typing import Iterator
+
+def _add_months(anchor: date, months: int) -> date:
+    month_index = anchor.month - 1 + months
+    year, month = anchor.year + month_index // 12, month_index % 12 + 1
+    # Clamp to the end of short months (e.g. the 31st -> 30th or 28th).
+    return date(year, month, min(anchor.day, monthrange(year, month)[1]))
+
+def occurrence_dates(task: Task, start: date, end: date) -> Iterator[date]:
+    """Yield the dates a task falls on within [start, end], in order.
+
+    A one-off task occurs on its due_date only. Recurring tasks are expanded
+    lazily from due_date, jumping straight to the window rather than walking
+    every earlier occurrence.
+    """
+    last = min(end, task.recurrence_until) if task.recurrence_until else end
+    if task.recurrence is None:
+        if start <= task.due_date <= last:
+            yield task.due_date
+        return
+    if task.recurrence == Recurrence.MONTHLY:
+        skipped = max(0, (start.year - task.due_date.year) * 12 + start.month - task.due_date.month - 1)
+        # The series can't run past date.max: stop at its last month.
+        months_left = (date.max.year - task.due_date.year) * 12 + date.max.month - task.due_date.month
+        current = _add_months(task.due_date, skipped)
+        while current <= last:
+            if current >= start:
+                yield current
+            skipped += 1
+            if skipped > months_left:
+                return
+            current = _add_months(task.due_date, skipped)
+        return
+    step = 1 if task.recurrence == Recurrence.DAILY else 7
+    # Walked as ordinals: stepping a date past date.max would overflow.
+    first = task.due_date.toordinal()
+    if first < start.toordinal():
+        first += -(-(start.toordinal() - first) // step) * step
+    for ordinal in range(first, last.toordinal() + 1, step):
+        yield date.fromordinal(ordinal)
\ No newline at end of file
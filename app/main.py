@@ -1,19 +1,236 @@
+import asyncio
+import importlib
 import logging
-from fastapi import FastAPI
+import os
+import signal
+import threading
+from concurrent.futures import Future
+from contextlib import asynccontextmanager
+from functools import partial
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from typing import Callable, List, Optional, Tuple
 from app.config.config import config
-from app.controllers.task_controller import router as task_router
+from app.dependencies import (
+    get_change_log,
+    get_job_queue,
+    get_sql_task_repository,
+    get_task_analytics_service,
+    get_task_compactor,
+    get_task_repository,
+    get_write_coalescer,
+)
+from app.middleware.draining import DrainMiddleware, RequestGate
+from app.repositories.task_dump import dump_repository, restore_repository
+from app.services.request_profiler import ARTIFACT_HEADER
 
 logging.basicConfig(level=config.LOG_LEVEL)
 logger = logging.getLogger("Main")
+config.subscribe(lambda settings: logging.getLogger().setLevel(settings.LOG_LEVEL))
+
+# SIGHUP re-reads the configuration, like POST /admin/config/reload.
+# Signal handlers can only be installed from the main thread, which is
+# where servers such as uvicorn run the event loop.
+RELOAD_SIGNAL = getattr(signal, "SIGHUP", None)
+
+def reload_config():
+    try:
+        config.reload()
+    except ValueError as e:
+        logger.error(f"Config reload rejected: {e}")
+
+# Optional subsystems as (enabled, "module:router") pairs. A module is only
+# imported when its subsystem is enabled, and optional routers are included
+# ahead of the core task routes so static paths such as /tasks/<name> are
+# matched before /tasks/{task_id}.
+OPTIONAL_ROUTERS = [
+    (bool(config.ADMIN_TOKEN), "app.controllers.admin_controller:router"),
+    (config.ANALYTICS_ENABLED, "app.controllers.analytics_controller:router"),
+    (bool(config.CHANGELOG_DIR), "app.controllers.change_controller:router"),
+    (config.JOB_WORKERS > 0, "app.controllers.job_controller:router"),
+]
+
+def include_routers(app: FastAPI):
+    for enabled, target in OPTIONAL_ROUTERS:
+        if enabled:
+            module_name, router_name = target.split(":")
+            app.include_router(getattr(importlib.import_module(module_name), router_name))
+    from app.controllers.task_controller import router as task_router
+    app.include_router(task_router)
+
+# Counts requests in flight and refuses writes once shutdown has begun.
+request_gate = RequestGate()
+
+# A shutdown step is a (name, blocking callable) pair.
+ShutdownSteps = List[Tuple[str, Callable[[], object]]]
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    loop = asyncio.get_running_loop()
+    watch_signal = RELOAD_SIGNAL is not None and threading.current_thread() is threading.main_thread()
+    if watch_signal:
+        # Reloading can block (a pool swap), so it runs off the event loop.
+        loop.add_signal_handler(RELOAD_SIGNAL, lambda: loop.run_in_executor(None, reload_config))
+    request_gate.open()
+    if config.STORAGE_BACKEND == "postgres":
+        sql_repository = get_sql_task_repository()
+        sql_repository.connect()
+        steps = [("database pool", sql_repository.close)]
+    else:
+        steps = []
+        source = restore_source()
+        if source is None:
+            steps.extend(start_memory_backend())
+        else:
+            # Only /health is served until the tasks are loaded.
+            request_gate.ready = False
+            stop_loading = threading.Event()
+            loading = asyncio.create_task(load_memory_backend(*source, steps, stop_loading))
+    if config.WRITE_COALESCING:
+        # Pending coalesced writes are committed before anything else stops.
+        steps.insert(0, ("write coalescer", get_write_coalescer().close))
+    if config.JOB_WORKERS:
+        # Running jobs are cancelled and stop at their next batch boundary.
+        steps.insert(0, ("job queue", get_job_queue().close))
+    yield
+    if watch_signal:
+        loop.remove_signal_handler(RELOAD_SIGNAL)
+    if not request_gate.ready:
+        # The loader stops after its current chunk; nothing has been
+        # started, so there is nothing to snapshot.
+        stop_loading.set()
+        loading.cancel()
+    await shut_down(steps, loop.time() + config.SHUTDOWN_DEADLINE_SECONDS)
+
+def restore_source() -> Optional[Tuple[str, bool]]:
+    """The dump to load at startup, if any, and whether to set it aside afterwards.
+
+    A snapshot left by the last shutdown is newer than the RESTORE_PATH
+    seed, so it wins.
+    """
+    if config.SNAPSHOT_PATH and os.path.exists(config.SNAPSHOT_PATH):
+        return config.SNAPSHOT_PATH, True
+    if config.RESTORE_PATH:
+        return config.RESTORE_PATH, False
+    return None
+
+async def load_memory_backend(path: str, set_aside: bool, steps: ShutdownSteps, stop: threading.Event):
+    """Restore the store from ``path`` in the background, then start the backend and open for traffic.
+
+    Listeners attached by start_memory_backend replay the restored tasks.
+    If loading fails the server stays unready.
+    """
+    loop = asyncio.get_running_loop()
+    restore = partial(restore_repository, get_task_repository(), path, config.RESTORE_WORKERS, stop, set_aside)
+    try:
+        await loop.run_in_executor(None, restore)
+    except Exception:
+        logger.exception(f"Loading tasks from {path} failed")
+        return
+    if stop.is_set():
+        return
+    steps.extend(start_memory_backend())
+    request_gate.ready = True
+
+def start_memory_backend() -> ShutdownSteps:
+    """Start the memory backend's background work and return its shutdown steps, in order."""
+    task_compactor = get_task_compactor()
+    task_compactor.start()
+    steps = [("compactor", task_compactor.stop)]
+    if config.ANALYTICS_ENABLED:
+        # Attach the column mirror before traffic arrives.
+        get_task_analytics_service()
+    if config.CHANGELOG_DIR:
+        # Every write from the first request on must reach the change log.
+        steps.append(("change log", get_change_log().close))
+    if config.SNAPSHOT_PATH:
+        # Restored by get_task_repository on the next start.
+        steps.append(("snapshot", lambda: dump_repository(get_task_repository(), config.SNAPSHOT_PATH)))
+    return steps
+
+async def shut_down(steps: ShutdownSteps, deadline: float):
+    """Drain requests, then run ``steps`` one at a time until ``deadline`` (loop time).
+
+    New writes are refused from the start. Steps run on daemon threads, so
+    one that overruns the deadline is abandoned (logged, and the remaining
+    steps skipped) instead of holding up the exit.
+    """
+    loop = asyncio.get_running_loop()
+    request_gate.close()
+    if not await request_gate.drain(deadline - loop.time()):
+        logger.warning(f"Shutting down with {request_gate.in_flight} requests still in flight")
+    for name, step in steps:
+        try:
+            await asyncio.wait_for(asyncio.wrap_future(in_daemon_thread(step)), max(deadline - loop.time(), 0))
+        except asyncio.TimeoutError:
+            logger.error(f"Shutdown deadline passed while stopping the {name}; skipping the remaining steps")
+            break
+        except Exception:
+            logger.exception(f"Failed to stop the {name}")
+    logger.info("Shutdown complete")
+    for handler in logging.getLogger().handlers:
+        handler.flush()
+
+def in_daemon_thread(step: Callable[[], object]) -> Future:
+    # Unlike the default executor, a daemon thread doesn't delay interpreter exit.
+    future = Future()
+
+    def run():
+        try:
+            future.set_result(step())
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name="shutdown-step", daemon=True).start()
+    return future
 
 app = FastAPI(
     title="Task Management API",
     description="API for creating and managing tasks",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
-app.include_router(task_router)
+include_routers(app)
+
+async def expose_profile_artifact(request: Request, call_next):
+    response = await call_next(request)
+    artifact = getattr(request.state, "profile_artifact", None)
+    if artifact is not None:
+        response.headers[ARTIFACT_HEADER] = artifact
+    return response
+
+if config.PARTITION_NODES:
+    # Imported here so single-node deployments never load it.
+    from app.middleware.partitioning import PartitionMiddleware
+    from app.services.hash_ring import HashRing
+    app.add_middleware(
+        PartitionMiddleware,
+        ring=HashRing(config.PARTITION_NODES, config.PARTITION_VNODES),
+        self_node=config.PARTITION_SELF,
+        mode=config.PARTITION_MODE,
+        # Import payloads are the largest bodies any endpoint accepts.
+        max_body_bytes=lambda: config.JOB_IMPORT_MAX_BYTES,
+    )
+
+# Only pay for the middleware when a request can actually be profiled.
+if config.ADMIN_TOKEN or config.PROFILE_ALL_REQUESTS:
+    app.middleware("http")(expose_profile_artifact)
+
+# Added last so it is outermost: requests forwarded to other partition
+# nodes are counted too.
+app.add_middleware(DrainMiddleware, gate=request_gate)
 
 @app.get("/health")
 def health_check():
-    return {"status": "ok"}
\ No newline at end of file
+    if request_gate.closed:
+        # Load balancers stop routing here while in-flight requests finish.
+        return JSONResponse({"status": "draining"}, status_code=503)
+    return {"status": "ok", "ready": request_gate.ready}
+
+@app.get("/health/ready")
+def readiness_check():
+    # Unlike /health, fails while tasks are still loading at startup.
+    if request_gate.closed or not request_gate.ready:
+        return JSONResponse({"ready": False}, status_code=503)
+    return {"ready": True}
\ No newline at end of file
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+
+class RequestGate:
+    """Tracks in-flight HTTP requests, holds them off until ready and turns writes away once closed.
+
+    Shared by DrainMiddleware, which counts requests, and the lifespan
+    code, which clears ``ready`` while tasks are loading, and at shutdown
+    closes the gate and waits for the count to reach zero. Only touched
+    from the event loop.
+    """
+
+    def __init__(self):
+        self.ready = True
+        self.closed = False
+        self.in_flight = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    def open(self):
+        self.ready = True
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+    async def drain(self, timeout: float) -> bool:
+        """Wait up to ``timeout`` seconds for in-flight requests; True if none remain."""
+        try:
+            await asyncio.wait_for(self._idle.wait(), max(timeout, 0))
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def _enter(self):
+        self.in_flight += 1
+        self._idle.clear()
+
+    def _exit(self):
+        self.in_flight -= 1
+        if not self.in_flight:
+            self._idle.set()
+
+class DrainMiddleware:
+    """Counts requests for a RequestGate and answers with 503 while it isn't serving.
+
+    Until the gate is ready only /health is served. Once it is closed,
+    writes are refused and reads still served. A client retrying a
+    refused request reaches another instance.
+    """
+
+    def __init__(self, app, gate: RequestGate):
+        self.app = app
+        self.gate = gate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        if not self.gate.ready and not scope["path"].startswith("/health"):
+            await self.refuse(send, "Server is still loading tasks", close=False)
+            return
+        if self.gate.closed and scope["method"] in WRITE_METHODS:
+            await self.refuse(send, "Server is shutting down", close=True)
+            return
+        self.gate._enter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.gate._exit()
+
+    @staticmethod
+    async def refuse(send, detail: str, close: bool):
+        body = json.dumps({"detail": detail}).encode()
+        headers = [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", b"1"),
+        ]
+        if close:
+            headers.append((b"connection", b"close"))
+        await send({"type": "http.response.start", "status": 503, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,212 @@
+from app.domain.codecs import task_binary
+from app.services.hash_ring import HashRing
+from typing import Callable, Optional
+import anyio
+import json
+import logging
+import re
+import urllib.error
+import urllib.request
+
+FORWARDED_HEADER = b"x-partition-forwarded"
+USER_PATH = re.compile(r"^/users/([^/]+)(/|$)")
+TASK_PATH = re.compile(r"^/tasks/(\d+)$")
+BULK_ROUTES = {("POST", "/tasks/bulk"), ("POST", "/jobs/import")}
+# Requests whose owner depends on their body; PATCH /tasks/{id} as well.
+BODY_ROUTES = BULK_ROUTES | {("POST", "/tasks")}
+
+class PartitionMiddleware:
+    """Routes user-scoped requests to the node that owns the user.
+
+    Users are assigned to nodes by a consistent-hash ring; a task id names
+    the node that allocated it. Requests for another node are either
+    redirected there (307, so method and body are kept) or forwarded and
+    proxied back. Bulk creates and import jobs must name users of a single
+    node. Requests that aren't user-scoped (listings, export,
+    analytics, health) are answered from the local node's data. A
+    forwarded request is routed again on arrival and answered with 421 if
+    the receiving node doesn't own it either.
+
+    Only requests routed by their body, or forwarded, are read here; with
+    ``max_body_bytes`` (called per request, so it can follow a config
+    reload) those bodies are limited to that many bytes, with 413 past
+    that. Bulk payloads are parsed on a worker thread.
+    """
+
+    def __init__(
+        self,
+        app,
+        ring: HashRing,
+        self_node: str,
+        mode: str = "redirect",
+        timeout: float = 10.0,
+        max_body_bytes: Optional[Callable[[], int]] = None,
+    ):
+        self.app = app
+        self.ring = ring
+        self.self_node = self_node
+        self.mode = mode
+        self.timeout = timeout
+        self.max_body_bytes = max_body_bytes
+        self.logger = logging.getLogger("PartitionMiddleware")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        path, method = scope["path"], scope["method"]
+        routed_by_body = (method, path) in BODY_ROUTES or (method == "PATCH" and TASK_PATH.match(path))
+        body = b""
+        if routed_by_body:
+            body = await self._read_body(scope, receive, send)
+            if body is None:
+                return
+        try:
+            if (method, path) in BULK_ROUTES:
+                owner = await anyio.to_thread.run_sync(self._owner, scope, body)
+            else:
+                owner = self._owner(scope, body)
+        except ValueError as e:
+            await self._respond_error(send, 400, str(e))
+            return
+        if owner is None or owner == self.self_node:
+            await self.app(scope, self._replay(body, receive) if routed_by_body else receive, send)
+        elif FORWARDED_HEADER in dict(scope["headers"]):
+            # Anyone can send the header, so it never makes a node serve
+            # another node's users; it only stops a second hop when nodes
+            # disagree about the ring.
+            await self._respond_error(send, 421, f"{self.self_node} does not own this request; check PARTITION_NODES")
+        elif self.mode == "forward":
+            if not routed_by_body:
+                body = await self._read_body(scope, receive, send)
+                if body is None:
+                    return
+            await self._forward(scope, body, owner, send)
+        else:
+            await self._respond(send, 307, b"", [(b"location", self._target(owner, scope).encode())])
+
+    async def _read_body(self, scope, receive, send) -> Optional[bytes]:
+        """Read the whole request body, or answer 413 and return None if it is too large."""
+        max_bytes = self.max_body_bytes() if self.max_body_bytes is not None else float("inf")
+        length = dict(scope["headers"]).get(b"content-length", b"")
+        body = bytearray()
+        too_large = length.isdigit() and int(length) > max_bytes
+        more_body = not too_large
+        while more_body:
+            message = await receive()
+            body += message.get("body", b"")
+            more_body = message.get("more_body", False)
+            if len(body) > max_bytes:
+                too_large = True
+                break
+        if too_large:
+            await self._respond_error(send, 413, f"Request bodies are limited to {max_bytes} bytes")
+            return None
+        return bytes(body)
+
+    @staticmethod
+    def _replay(body: bytes, receive):
+        replayed = False
+
+        async def replay():
+            nonlocal replayed
+            if not replayed:
+                replayed = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        return replay
+
+    def _owner(self, scope, body: bytes) -> Optional[str]:
+        path, method = scope["path"], scope["method"]
+        match = USER_PATH.match(path)
+        if match:
+            return self.ring.owner(match.group(1))
+        match = TASK_PATH.match(path)
+        if match:
+            owner = self.ring.owner_of_task(int(match.group(1)))
+            if method == "PATCH":
+                new_user = self._json_field(body, "user_name")
+                if new_user is not None and self.ring.owner(new_user) != owner:
+                    raise ValueError("Moving a task to a user on another partition is not supported")
+            return owner
+        if method == "POST" and path == "/tasks":
+            user_name = self._json_field(body, "user_name")
+            return None if user_name is None else self.ring.owner(user_name)
+        if (method, path) in BULK_ROUTES:
+            return self._bulk_owner(scope, body)
+        return None
+
+    @staticmethod
+    def _json_field(body: bytes, field: str) -> Optional[str]:
+        # Malformed bodies are left to the local endpoint to reject.
+        try:
+            value = json.loads(body).get(field)
+        except (ValueError, AttributeError):
+            return None
+        return value if isinstance(value, str) else None
+
+    def _bulk_owner(self, scope, body: bytes) -> Optional[str]:
+        content_type = dict(scope["headers"]).get(b"content-type", b"").decode()
+        try:
+            if content_type.startswith(task_binary.MEDIA_TYPE):
+                users = {task.user_name for task in task_binary.decode_task_creates(body)}
+            else:
+                users = {item.get("user_name") for item in json.loads(body)}
+        except (ValueError, TypeError, AttributeError):
+            return None
+        owners = {self.ring.owner(user) for user in users if isinstance(user, str)}
+        if len(owners) > 1:
+            raise ValueError("A bulk request must only contain users owned by one partition")
+        return owners.pop() if owners else None
+
+    @staticmethod
+    def _target(owner: str, scope) -> str:
+        query = scope.get("query_string", b"").decode()
+        return owner.rstrip("/") + scope["path"] + (f"?{query}" if query else "")
+
+    async def _forward(self, scope, body: bytes, owner: str, send):
+        headers = {
+            key.decode(): value.decode()
+            for key, value in scope["headers"]
+            if key not in (b"host", b"content-length", b"connection")
+        }
+        headers[FORWARDED_HEADER.decode()] = self.self_node
+        request = urllib.request.Request(
+            self._target(owner, scope), data=body or None, headers=headers, method=scope["method"]
+        )
+
+        def call():
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    return response.status, response.getheaders(), response.read()
+            except urllib.error.HTTPError as e:
+                return e.code, e.headers.items(), e.read()
+
+        try:
+            status, response_headers, payload = await anyio.to_thread.run_sync(call)
+        except OSError as e:
+            self.logger.error(f"Forwarding to {owner} failed: {e}")
+            await self._respond_error(send, 502, f"Partition {owner} unavailable")
+            return
+        passed = [
+            (key.lower().encode(), self._absolute(owner, value) if key.lower() == "location" else value.encode())
+            for key, value in response_headers
+            if key.lower() not in ("content-length", "transfer-encoding", "connection", "date", "server")
+        ]
+        await self._respond(send, status, payload, passed)
+
+    @staticmethod
+    def _absolute(owner: str, location: str) -> bytes:
+        # A relative Location (e.g. an import's /jobs/{id}) lives on the owner.
+        return (owner.rstrip("/") + location if location.startswith("/") else location).encode()
+
+    @staticmethod
+    async def _respond(send, status: int, body: bytes, headers):
+        headers = list(headers) + [(b"content-length", str(len(body)).encode())]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @classmethod
+    async def _respond_error(cls, send, status: int, detail: str):
+        await cls._respond(send, status, json.dumps({"detail": detail}).encode(), [(b"content-type", b"application/json")])
@@ -0,0 +1,188 @@
+from app.domain.models.task import Task
+from app.repositories.task_listeners import TaskListener
+from bisect import bisect_right
+from collections import deque
+from contextlib import suppress
+from datetime import datetime, timezone
+from typing import List, Tuple
+import json
+import logging
+import os
+import threading
+
+INDEX_INTERVAL = 128
+
+class ChangeLog(TaskListener):
+    """Ordered, append-only, segmented on-disk feed of task mutations.
+
+    Every change gets the next offset and is written as one JSON line. A
+    segment file holds ``segment_records`` changes and is named after its
+    first offset; a sparse in-memory index of byte positions lets a reader
+    seek close to any offset. Changes are buffered during a repository
+    write and queued on commit, still under the repository lock; the write
+    (and fsync) happens in ``after_commit``, once that lock is released, so
+    a coalesced batch costs a single write and other writers don't wait on
+    the disk. A failed write is logged and retried with the next one.
+    Readers only ever see flushed changes.
+    """
+
+    def __init__(self, directory: str, segment_records: int = 100000, fsync: bool = True):
+        self.directory = directory
+        self.segment_records = segment_records
+        self.fsync = fsync
+        self._buffer = []
+        # Committed changes not yet written, in offset order.
+        self._queued = deque()
+        self._file = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("ChangeLog")
+        os.makedirs(directory, exist_ok=True)
+        self._bases = []
+        self._indexes = {}
+        self._next_offset = 0
+        for name in sorted(os.listdir(directory)):
+            if name.startswith("changes-") and name.endswith(".log"):
+                self._load_segment(int(name[len("changes-"):-len(".log")]))
+        self._committed = self._next_offset
+
+    def _path(self, base: int) -> str:
+        return os.path.join(self.directory, f"changes-{base:020d}.log")
+
+    def _load_segment(self, base: int):
+        index = []
+        offset = base
+        position = 0
+        with open(self._path(base), "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    # A torn final write; drop it so the segment ends cleanly.
+                    os.truncate(self._path(base), position)
+                    break
+                if (offset - base) % INDEX_INTERVAL == 0:
+                    index.append((offset, position))
+                offset += 1
+                position += len(line)
+        self._bases.append(base)
+        self._indexes[base] = index
+        self._next_offset = offset
+
+    def _record(self, op: str, task_id: int, task=None):
+        change = {
+            "offset": self._next_offset,
+            "op": op,
+            "task_id": task_id,
+            "task": None if task is None else json.loads(task.json()),
+            "at": datetime.now(timezone.utc).isoformat(),
+        }
+        self._buffer.append((self._next_offset, (json.dumps(change, separators=(",", ":")) + "\n").encode()))
+        self._next_offset += 1
+
+    def on_add(self, task: Task):
+        self._record("create", task.id, task)
+
+    def on_update(self, old_task: Task, task: Task):
+        self._record("update", task.id, task)
+
+    def on_delete(self, task: Task):
+        self._record("delete", task.id)
+
+    def on_commit(self):
+        self._queued.extend(self._buffer)
+        self._buffer = []
+
+    def after_commit(self):
+        # Whoever takes the lock first writes every queued change, so a
+        # writer whose changes went out with an earlier flush finds the
+        # queue empty.
+        with self._lock:
+            changes = []
+            while self._queued:
+                changes.append(self._queued.popleft())
+            if not changes:
+                return
+            try:
+                self._write(changes)
+            except Exception as e:
+                # The store has already committed these changes, so failing
+                # the write call would only invite a retry that duplicates
+                # them. _write left the files as they were; retry with the
+                # next flush.
+                self._queued.extendleft(reversed(changes))
+                self.logger.error(f"Writing {len(changes)} changes failed, keeping them queued: {e}")
+                return
+            self._committed = changes[-1][0] + 1
+
+    def _write(self, changes: List[Tuple[int, bytes]]):
+        """Append ``changes`` to the segments, all or nothing."""
+        bases = len(self._bases)
+        last = self._bases[-1] if self._bases else None
+        indexed = len(self._indexes[last]) if last is not None else 0
+        size = os.path.getsize(self._path(last)) if last is not None else 0
+        try:
+            for offset, line in changes:
+                if not self._bases or offset - self._bases[-1] >= self.segment_records:
+                    self._open(offset, new=True)
+                elif self._file is None:
+                    self._open(self._bases[-1])
+                base = self._bases[-1]
+                if (offset - base) % INDEX_INTERVAL == 0:
+                    self._indexes[base].append((offset, self._file.tell()))
+                self._file.write(line)
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+        except Exception:
+            if self._file is not None:
+                with suppress(OSError):
+                    self._file.close()
+                self._file = None
+            for base in self._bases[bases:]:
+                del self._indexes[base]
+                with suppress(FileNotFoundError):
+                    os.remove(self._path(base))
+            del self._bases[bases:]
+            if last is not None:
+                del self._indexes[last][indexed:]
+                os.truncate(self._path(last), size)
+            raise
+
+    def _open(self, base: int, new: bool = False):
+        if self._file is not None:
+            self._file.close()
+        if new:
+            self._bases.append(base)
+            self._indexes[base] = []
+        self._file = open(self._path(base), "ab")
+
+    def read(self, since: int, limit: int) -> Tuple[List[bytes], int]:
+        """Return up to ``limit`` encoded changes from offset ``since`` and the next offset."""
+        with self._lock:
+            committed = self._committed
+            bases = list(self._bases)
+            indexes = {base: list(self._indexes[base]) for base in bases}
+        lines = []
+        offset = max(since, bases[0]) if bases else since
+        segment = max(bisect_right(bases, offset) - 1, 0)
+        while segment < len(bases) and offset < committed and len(lines) < limit:
+            base = bases[segment]
+            index = indexes[base]
+            segment += 1
+            if not index:
+                continue
+            current, position = index[bisect_right(index, (offset, float("inf"))) - 1]
+            with open(self._path(base), "rb") as f:
+                f.seek(position)
+                for line in f:
+                    if current >= committed or len(lines) >= limit:
+                        break
+                    if current >= offset:
+                        lines.append(line.rstrip(b"\n"))
+                        offset = current + 1
+                    current += 1
+        return lines, offset
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
\ No newline at end of file
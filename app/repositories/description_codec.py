@@ -0,0 +1,109 @@
+from app.domain.models.task import Task
+from collections import Counter
+from typing import Iterable, List, Optional, Union
+import logging
+import threading
+import zlib
+
+# zlib looks back at most 32 KiB, so a larger dictionary would be unused.
+DICTIONARY_SIZE = 32 * 1024
+
+class CompressedText(bytes):
+    """A description deflated against the codec's shared dictionary."""
+
+    __slots__ = ()
+
+def train_dictionary(samples: Iterable[str], size: int = DICTIONARY_SIZE) -> bytes:
+    """Build a zlib preset dictionary from sample descriptions.
+
+    Repeated words and short phrases are ranked by the bytes they would
+    save (occurrences x length) and the best ones are placed last, where
+    deflate finds them with the shortest back-references.
+    """
+    counts = Counter()
+    for text in samples:
+        words = text.split()
+        for n in (1, 2, 3):
+            for start in range(len(words) - n + 1):
+                counts[" ".join(words[start:start + n])] += 1
+    ranked = sorted(
+        ((count * len(phrase), phrase) for phrase, count in counts.items() if count > 1),
+        reverse=True,
+    )
+    picked: List[bytes] = []
+    total = 0
+    for _, phrase in ranked:
+        encoded = phrase.encode() + b" "
+        if total + len(encoded) > size:
+            break
+        picked.append(encoded)
+        total += len(encoded)
+    return b"".join(reversed(picked))
+
+def decompress(description: bytes, dictionary: bytes) -> str:
+    decompressor = zlib.decompressobj(-15, zdict=dictionary)
+    return (decompressor.decompress(description) + decompressor.flush()).decode()
+
+class DescriptionCodec:
+    """Compresses task descriptions with a dictionary trained on the first ones stored.
+
+    Descriptions are short, so plain deflate finds little to reuse inside a
+    single one; a dictionary shared by all of them supplies the common
+    vocabulary. The first ``sample_size`` descriptions are kept as plain
+    text and used to train it. After that a description is stored as
+    CompressedText whenever that is smaller. Readers call ``inflate`` only
+    when the description is actually returned. A ``dictionary`` saved
+    from an earlier run (see ``TaskArchive``) is used as is, without
+    sampling.
+    """
+
+    def __init__(self, sample_size: int = 1000, level: int = 6, dictionary: Optional[bytes] = None):
+        self.sample_size = sample_size
+        self.level = level
+        self._samples: List[str] = []
+        self._dictionary: Optional[bytes] = None
+        # Priming a compressor with the dictionary costs more than copying
+        # an already primed one.
+        self._compressor = None
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("DescriptionCodec")
+        if dictionary is not None:
+            self._use(dictionary)
+
+    @property
+    def dictionary(self) -> Optional[bytes]:
+        """The trained dictionary, or None while still sampling."""
+        return self._dictionary
+
+    def compress(self, text: str) -> Union[str, CompressedText]:
+        if self._compressor is None:
+            with self._lock:
+                if self._compressor is None:
+                    self._samples.append(text)
+                    if len(self._samples) >= self.sample_size:
+                        self._train()
+                    return text
+        compressor = self._compressor.copy()
+        encoded = text.encode()
+        compressed = compressor.compress(encoded) + compressor.flush()
+        return CompressedText(compressed) if len(compressed) < len(encoded) else text
+
+    def _train(self):
+        self._use(train_dictionary(self._samples))
+        self._samples = []
+        self.logger.info(f"Trained a {len(self._dictionary)} byte description dictionary")
+
+    def _use(self, dictionary: bytes):
+        self._dictionary = dictionary
+        self._compressor = zlib.compressobj(self.level, zlib.DEFLATED, -15, zdict=dictionary)
+
+    def decompress(self, description: Union[str, CompressedText]) -> str:
+        if not isinstance(description, CompressedText):
+            return description
+        return decompress(description, self._dictionary)
+
+    def inflate(self, task: Task) -> Task:
+        """Return ``task`` with a plain-text description."""
+        if not isinstance(task.description, CompressedText):
+            return task
+        return task.copy(update={"description": self.decompress(task.description)})
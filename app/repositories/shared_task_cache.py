@@ -0,0 +1,163 @@
+from contextlib import contextmanager
+from typing import Optional
+import fcntl
+import logging
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"TSC1"
+# magic, sets, ways, slot payload bytes, owner (the pid of the server process
+# that forked the workers)
+HEADER = struct.Struct("<4sIIIQ")
+HEADER_SIZE = 64
+# Per set: a version bumped by every invalidation in the set.
+SET_HEADER = struct.Struct("<Q")
+# Per slot: a seqlock counter, odd while the slot is being written, then
+# the entry: task id (0 = empty), filled and last-used times
+# (CLOCK_MONOTONIC ns, shared by all processes) and payload length. Writers
+# bump the counter before and after touching the entry, so readers see a
+# complete entry or a changed counter.
+SEQ = struct.Struct("<Q")
+ENTRY = struct.Struct("<QQQI")
+SLOT = struct.Struct("<QQQQI")
+LAST_USED = struct.Struct("<Q")
+LAST_USED_OFFSET = 24
+WAYS = 8
+LOCK_STRIPES = 64
+
+class SharedTaskCache:
+    """Set-associative LRU cache of serialized tasks in a shared memory-mapped file.
+
+    Every worker process of a server maps the same file, so a task is
+    serialized once per host. An id maps to one set of WAYS slots; a fill
+    takes the set's empty, expired or least recently used slot. Readers
+    don't lock: each slot is guarded by a seqlock counter. Writers lock the
+    set, with a byte-range lock on its header (across processes) plus a
+    striped threading lock (record locks don't exclude threads of one process).
+
+    Writes to the store call ``invalidate`` after committing. That bumps the
+    set's version. A fill passes the version it read before fetching the
+    task, and is dropped if the version has changed since, so a fetch that
+    raced with a write never caches the old task. Entries also expire after
+    ``ttl`` seconds, which bounds staleness from writes made outside the app.
+    """
+
+    def __init__(self, path: str, slots: int, slot_bytes: int = 1024, ttl: float = 30.0):
+        self.path = path
+        self.sets = max(1, slots // WAYS)
+        self.slot_bytes = slot_bytes
+        self.ttl_ns = int(ttl * 1e9)
+        self._slot_size = SLOT.size + slot_bytes
+        self._set_size = SET_HEADER.size + WAYS * self._slot_size
+        self._locks = [threading.Lock() for _ in range(LOCK_STRIPES)]
+        self.logger = logging.getLogger("SharedTaskCache")
+        size = HEADER_SIZE + self.sets * self._set_size
+        self._fd = self._open(HEADER.pack(MAGIC, self.sets, WAYS, slot_bytes, os.getppid()), size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def _open(self, header: bytes, size: int) -> int:
+        """Open the cache file, replacing it if it was made for another server or shape.
+
+        The first worker to start checks the file while holding a lock on
+        it. A leftover is never changed in place, since another live server
+        may still have it mapped: a fresh file is built under a temporary
+        name and renamed over it. Workers that waited on the old file's lock
+        notice the rename and open the new one.
+        """
+        while True:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.lockf(fd, fcntl.LOCK_EX)
+            opened, current = os.fstat(fd), os.stat(self.path)
+            if (opened.st_dev, opened.st_ino) != (current.st_dev, current.st_ino):
+                os.close(fd)
+                continue
+            if os.pread(fd, HEADER.size, 0) == header and opened.st_size == size:
+                fcntl.lockf(fd, fcntl.LOCK_UN)
+                return fd
+            temporary = f"{self.path}.{os.getpid()}.tmp"
+            fresh = os.open(temporary, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o600)
+            os.ftruncate(fresh, size)
+            os.pwrite(fresh, header, 0)
+            os.replace(temporary, self.path)
+            # Closing the old file releases its lock.
+            os.close(fd)
+            self.logger.info(f"Initialized {self.path} with {self.sets * WAYS} slots")
+            return fresh
+
+    def _set_offset(self, task_id: int) -> int:
+        return HEADER_SIZE + (task_id % self.sets) * self._set_size
+
+    def _slot_offsets(self, base: int):
+        return range(base + SET_HEADER.size, base + self._set_size, self._slot_size)
+
+    @contextmanager
+    def _locked(self, base: int):
+        with self._locks[base // self._set_size % LOCK_STRIPES]:
+            fcntl.lockf(self._fd, fcntl.LOCK_EX, SET_HEADER.size, base)
+            try:
+                yield
+            finally:
+                fcntl.lockf(self._fd, fcntl.LOCK_UN, SET_HEADER.size, base)
+
+    def get(self, task_id: int) -> Optional[bytes]:
+        base = self._set_offset(task_id)
+        now = time.monotonic_ns()
+        for offset in self._slot_offsets(base):
+            seq, slot_id, filled_at, _, length = SLOT.unpack_from(self._map, offset)
+            if slot_id != task_id or seq & 1 or now - filled_at > self.ttl_ns:
+                continue
+            start = offset + SLOT.size
+            body = self._map[start:start + length]
+            if SEQ.unpack_from(self._map, offset)[0] != seq:
+                return None  # overwritten while copying
+            LAST_USED.pack_into(self._map, offset + LAST_USED_OFFSET, now)
+            return body
+        return None
+
+    def version(self, task_id: int) -> int:
+        return SET_HEADER.unpack_from(self._map, self._set_offset(task_id))[0]
+
+    def put(self, task_id: int, body: bytes, version: int) -> bool:
+        """Cache ``body`` unless it is too large or the id was invalidated since ``version``."""
+        if len(body) > self.slot_bytes:
+            return False
+        base = self._set_offset(task_id)
+        with self._locked(base):
+            if SET_HEADER.unpack_from(self._map, base)[0] != version:
+                return False
+            now = time.monotonic_ns()
+            victim, victim_used = None, None
+            for offset in self._slot_offsets(base):
+                _, slot_id, filled_at, last_used, _ = SLOT.unpack_from(self._map, offset)
+                if slot_id == task_id:
+                    victim = offset
+                    break
+                if slot_id == 0 or now - filled_at > self.ttl_ns:
+                    last_used = -1
+                if victim is None or last_used < victim_used:
+                    victim, victim_used = offset, last_used
+            seq = SEQ.unpack_from(self._map, victim)[0]
+            SEQ.pack_into(self._map, victim, seq + 1)
+            start = victim + SLOT.size
+            self._map[start:start + len(body)] = body
+            ENTRY.pack_into(self._map, victim + SEQ.size, task_id, now, now, len(body))
+            SEQ.pack_into(self._map, victim, seq + 2)
+        return True
+
+    def invalidate(self, task_id: int):
+        base = self._set_offset(task_id)
+        with self._locked(base):
+            SET_HEADER.pack_into(self._map, base, SET_HEADER.unpack_from(self._map, base)[0] + 1)
+            for offset in self._slot_offsets(base):
+                seq, slot_id, _, _, _ = SLOT.unpack_from(self._map, offset)
+                if slot_id == task_id:
+                    SEQ.pack_into(self._map, offset, seq + 1)
+                    ENTRY.pack_into(self._map, offset + SEQ.size, 0, 0, 0, 0)
+                    SEQ.pack_into(self._map, offset, seq + 2)
+
+    def close(self):
+        self._map.close()
+        os.close(self._fd)
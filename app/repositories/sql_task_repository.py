@@ -0,0 +1,373 @@
+from app.domain.models.task import Recurrence, Task, TaskCreate, TaskUpdate, check_recurrence_until
+from app.repositories.task_snapshot import TaskSnapshot
+from datetime import date
+from typing import List, Optional
+import asyncio
+import logging
+import threading
+import asyncpg
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id BIGSERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    description TEXT NOT NULL,
+    priority SMALLINT NOT NULL,
+    due_date DATE NOT NULL,
+    user_name TEXT NOT NULL
+);
+DO $$
+BEGIN
+    -- Only when missing: ALTER TABLE locks the table against all access,
+    -- even when IF NOT EXISTS makes it a no-op.
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'tasks' AND column_name = 'recurrence'
+    ) THEN
+        ALTER TABLE tasks ADD COLUMN recurrence TEXT;
+    END IF;
+    IF NOT EXISTS (
+        SELECT 1 FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'tasks' AND column_name = 'recurrence_until'
+    ) THEN
+        ALTER TABLE tasks ADD COLUMN recurrence_until DATE;
+    END IF;
+END $$;
+CREATE INDEX IF NOT EXISTS tasks_user_order ON tasks (user_name, priority, due_date, id);
+CREATE INDEX IF NOT EXISTS tasks_user_recurring ON tasks (user_name, id) WHERE recurrence IS NOT NULL;
+CREATE INDEX IF NOT EXISTS tasks_user_due ON tasks (user_name, due_date, id) WHERE recurrence IS NULL;
+CREATE TABLE IF NOT EXISTS task_user_counts (
+    user_name TEXT PRIMARY KEY,
+    tasks BIGINT NOT NULL
+);
+CREATE OR REPLACE FUNCTION count_user_tasks() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO task_user_counts VALUES (NEW.user_name, 1)
+        ON CONFLICT (user_name) DO UPDATE SET tasks = task_user_counts.tasks + 1;
+    END IF;
+    IF TG_OP IN ('DELETE', 'UPDATE') THEN
+        UPDATE task_user_counts SET tasks = tasks - 1 WHERE user_name = OLD.user_name;
+    END IF;
+    RETURN NULL;
+END $$ LANGUAGE plpgsql;
+DO $$
+BEGIN
+    -- Only when missing: CREATE TRIGGER locks the table against all access.
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_trigger WHERE tgrelid = 'tasks'::regclass AND tgname = 'tasks_count_user_tasks'
+    ) THEN
+        CREATE TRIGGER tasks_count_user_tasks AFTER INSERT OR DELETE OR UPDATE OF user_name ON tasks
+            FOR EACH ROW EXECUTE FUNCTION count_user_tasks();
+    END IF;
+END $$;
+"""
+
+# Serializes schema setup between processes starting at the same time.
+SCHEMA_LOCK = "SELECT pg_advisory_xact_lock(7326001)"
+COUNTS_EXIST = "SELECT to_regclass('task_user_counts') IS NOT NULL"
+# Counts are kept by the trigger; this only seeds them for tasks that were
+# stored before the counts table existed.
+BACKFILL_COUNTS = "INSERT INTO task_user_counts SELECT user_name, count(*) FROM tasks GROUP BY user_name"
+
+COLUMNS = ("id", "title", "description", "priority", "due_date", "user_name", "recurrence", "recurrence_until")
+SELECT_COLUMNS = ", ".join(COLUMNS)
+
+INSERT_TASK = (
+    "INSERT INTO tasks (title, description, priority, due_date, user_name, recurrence, recurrence_until) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7) RETURNING id"
+)
+INSERT_TASK_WITH_ID = (
+    f"INSERT INTO tasks ({SELECT_COLUMNS}) "
+    "VALUES ($1, $2, $3, $4, $5, $6, $7, $8)"
+)
+RESERVE_IDS = "SELECT nextval(pg_get_serial_sequence('tasks', 'id')) FROM generate_series(1, $1)"
+SELECT_TASK = f"SELECT {SELECT_COLUMNS} FROM tasks WHERE id = $1"
+LOCK_TASK_DATES = "SELECT due_date, recurrence, recurrence_until FROM tasks WHERE id = $1 FOR UPDATE"
+SELECT_TASKS = f"SELECT {SELECT_COLUMNS} FROM tasks ORDER BY id"
+SELECT_TOP_TASKS = (
+    f"SELECT {SELECT_COLUMNS} FROM tasks WHERE user_name = $1 "
+    "ORDER BY priority, due_date, id LIMIT $2"
+)
+SELECT_RECURRING_TASKS = (
+    f"SELECT {SELECT_COLUMNS} FROM tasks WHERE user_name = $1 AND recurrence IS NOT NULL ORDER BY id"
+)
+SELECT_DUE_TASKS = (
+    f"SELECT {SELECT_COLUMNS} FROM tasks WHERE user_name = $1 AND recurrence IS NULL "
+    "AND due_date BETWEEN $2 AND $3 ORDER BY due_date, id"
+)
+DELETE_TASK = "DELETE FROM tasks WHERE id = $1"
+SELECT_USER_COUNT = "SELECT tasks FROM task_user_counts WHERE user_name = $1"
+REINDEX_TASKS = "REINDEX TABLE tasks"
+SELECT_TASK_COUNT = "SELECT coalesce(sum(tasks), 0)::bigint FROM task_user_counts"
+
+def _task(row) -> Task:
+    fields = dict(row)
+    if fields["recurrence"] is not None:
+        fields["recurrence"] = Recurrence(fields["recurrence"])
+    return Task.construct(**fields)
+
+def _recurrence(task_data) -> Optional[str]:
+    return None if task_data.recurrence is None else task_data.recurrence.value
+
+class AsyncSqlTaskRepository:
+    """Task store backed by a PostgreSQL-compatible database (asyncpg).
+
+    Connections come from a bounded pool. asyncpg prepares every statement
+    on first use and caches it per connection, so the fixed statements
+    above are parsed once per connection. Batches reserve their ids in one
+    round trip, then are written with a pipelined ``executemany`` or, at
+    ``copy_threshold`` rows and above, the binary ``COPY`` protocol.
+    """
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 10,
+        acquire_timeout: float = 5.0,
+        command_timeout: float = 30.0,
+        copy_threshold: int = 500,
+    ):
+        self.dsn = dsn
+        self.min_size = min_size
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.command_timeout = command_timeout
+        self.copy_threshold = copy_threshold
+        self._pool = None
+        self.logger = logging.getLogger("AsyncSqlTaskRepository")
+
+    async def connect(self):
+        self._pool = await self._create_pool(self.min_size, self.max_size, self.command_timeout)
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                await connection.execute(SCHEMA_LOCK)
+                counts_exist = await connection.fetchval(COUNTS_EXIST)
+                await connection.execute(SCHEMA)
+                if not counts_exist:
+                    await connection.execute(BACKFILL_COUNTS)
+        self.logger.info(f"Connected pool of {self.min_size}-{self.max_size} connections")
+
+    def _create_pool(self, min_size: int, max_size: int, command_timeout: float):
+        return asyncpg.create_pool(self.dsn, min_size=min_size, max_size=max_size, command_timeout=command_timeout)
+
+    async def configure(
+        self,
+        min_size: int,
+        max_size: int,
+        acquire_timeout: float,
+        command_timeout: float,
+        copy_threshold: int,
+    ):
+        """Apply new pool settings to a running repository.
+
+        asyncpg pools can't be resized, so a size or timeout change builds a
+        new pool and swaps it in; the old one closes once the connections
+        still checked out of it are released. If the new pool can't be
+        created the old one stays in use.
+        """
+        self.acquire_timeout = acquire_timeout
+        self.copy_threshold = copy_threshold
+        if (min_size, max_size, command_timeout) == (self.min_size, self.max_size, self.command_timeout):
+            return
+        if self._pool is not None:
+            old_pool = self._pool
+            self._pool = await self._create_pool(min_size, max_size, command_timeout)
+            await old_pool.close()
+        self.min_size, self.max_size, self.command_timeout = min_size, max_size, command_timeout
+        self.logger.info(f"Pool resized to {min_size}-{max_size} connections")
+
+    async def close(self):
+        if self._pool is not None:
+            await self._pool.close()
+            self._pool = None
+
+    def _acquire(self):
+        return self._pool.acquire(timeout=self.acquire_timeout)
+
+    async def add_task(self, task_data: TaskCreate) -> Task:
+        async with self._acquire() as connection:
+            task_id = await connection.fetchval(
+                INSERT_TASK,
+                task_data.title,
+                task_data.description,
+                task_data.priority,
+                task_data.due_date,
+                task_data.user_name,
+                _recurrence(task_data),
+                task_data.recurrence_until,
+            )
+        task = Task.construct(id=task_id, **task_data.dict())
+        self.logger.info(f"Task created: {task}")
+        return task
+
+    async def add_tasks(self, tasks_data: List[TaskCreate]) -> List[Task]:
+        if not tasks_data:
+            return []
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                ids = [row[0] for row in await connection.fetch(RESERVE_IDS, len(tasks_data))]
+                records = [
+                    (
+                        task_id,
+                        task.title,
+                        task.description,
+                        task.priority,
+                        task.due_date,
+                        task.user_name,
+                        _recurrence(task),
+                        task.recurrence_until,
+                    )
+                    for task_id, task in zip(ids, tasks_data)
+                ]
+                if len(records) >= self.copy_threshold:
+                    await connection.copy_records_to_table("tasks", records=records, columns=COLUMNS)
+                else:
+                    await connection.executemany(INSERT_TASK_WITH_ID, records)
+        tasks = [Task.construct(id=task_id, **task.dict()) for task_id, task in zip(ids, tasks_data)]
+        self.logger.info(f"{len(tasks)} tasks created in one batch")
+        return tasks
+
+    async def get_task(self, task_id: int) -> Optional[Task]:
+        async with self._acquire() as connection:
+            row = await connection.fetchrow(SELECT_TASK, task_id)
+        return None if row is None else _task(row)
+
+    async def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
+        """Apply the update and return the new version, or None if there is no such task.
+
+        Raises ValueError, leaving the row unchanged, if the updated task
+        would break the recurrence rules TaskCreate enforces.
+        """
+        changes = task_update.changes()
+        if not changes:
+            return await self.get_task(task_id)
+        # Column names come from the TaskUpdate model, never from the client.
+        assignments = ", ".join(f"{name} = ${position}" for position, name in enumerate(changes, 2))
+        values = [value.value if isinstance(value, Recurrence) else value for value in changes.values()]
+        async with self._acquire() as connection:
+            async with connection.transaction():
+                if changes.keys() & {"due_date", "recurrence", "recurrence_until"}:
+                    # Check the row as it will be, holding it so a concurrent
+                    # update can't invalidate the check.
+                    current = await connection.fetchrow(LOCK_TASK_DATES, task_id)
+                    if current is None:
+                        return None
+                    merged = {**dict(current), **changes}
+                    check_recurrence_until(merged["due_date"], merged["recurrence"], merged["recurrence_until"])
+                row = await connection.fetchrow(
+                    f"UPDATE tasks SET {assignments} WHERE id = $1 RETURNING {SELECT_COLUMNS}",
+                    task_id,
+                    *values,
+                )
+        if row is None:
+            return None
+        task = _task(row)
+        self.logger.info(f"Task updated: {task}")
+        return task
+
+    async def delete_task(self, task_id: int) -> bool:
+        async with self._acquire() as connection:
+            status = await connection.execute(DELETE_TASK, task_id)
+        deleted = status == "DELETE 1"
+        if deleted:
+            self.logger.info(f"Task deleted: {task_id}")
+        return deleted
+
+    async def top_tasks(self, user_name: str, limit: int) -> List[Task]:
+        async with self._acquire() as connection:
+            rows = await connection.fetch(SELECT_TOP_TASKS, user_name, limit)
+        return [_task(row) for row in rows]
+
+    async def recurring_tasks(self, user_name: str) -> List[Task]:
+        async with self._acquire() as connection:
+            rows = await connection.fetch(SELECT_RECURRING_TASKS, user_name)
+        return [_task(row) for row in rows]
+
+    async def due_tasks(self, user_name: str, start: date, end: date) -> List[Task]:
+        async with self._acquire() as connection:
+            rows = await connection.fetch(SELECT_DUE_TASKS, user_name, start, end)
+        return [_task(row) for row in rows]
+
+    async def count_for_user(self, user_name: str) -> int:
+        async with self._acquire() as connection:
+            return await connection.fetchval(SELECT_USER_COUNT, user_name) or 0
+
+    async def reindex(self) -> int:
+        async with self._acquire() as connection:
+            await connection.execute(REINDEX_TASKS)
+            return await connection.fetchval(SELECT_TASK_COUNT)
+
+    async def list_tasks(self) -> List[Task]:
+        # A repeatable-read transaction gives a point-in-time view.
+        async with self._acquire() as connection:
+            async with connection.transaction(isolation="repeatable_read", readonly=True):
+                rows = await connection.fetch(SELECT_TASKS)
+        return [_task(row) for row in rows]
+
+class SqlTaskRepository:
+    """Blocking facade over AsyncSqlTaskRepository for the synchronous services.
+
+    The async repository and its pool live on a private event loop thread;
+    calls from request threads (or the write coalescer) are submitted to it.
+    """
+
+    def __init__(self, repository: AsyncSqlTaskRepository):
+        self.repository = repository
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="sql-task-repository", daemon=True)
+        self._thread.start()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def connect(self):
+        self._run(self.repository.connect())
+
+    def close(self):
+        self._run(self.repository.close())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    def configure(self, *args, **kwargs):
+        self._run(self.repository.configure(*args, **kwargs))
+
+    def add_task(self, task_data: TaskCreate) -> Task:
+        return self._run(self.repository.add_task(task_data))
+
+    def add_tasks(self, tasks_data: List[TaskCreate]) -> List[Task]:
+        return self._run(self.repository.add_tasks(tasks_data))
+
+    # Descriptions are never compressed here; inflate is accepted for
+    # parity with TaskRepository.
+    def get_task(self, task_id: int, inflate: bool = True) -> Optional[Task]:
+        return self._run(self.repository.get_task(task_id))
+
+    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
+        return self._run(self.repository.update_task(task_id, task_update))
+
+    def delete_task(self, task_id: int) -> bool:
+        return self._run(self.repository.delete_task(task_id))
+
+    def top_tasks(self, user_name: str, limit: int, inflate: bool = True) -> List[Task]:
+        return self._run(self.repository.top_tasks(user_name, limit))
+
+    def inflate(self, task: Optional[Task]) -> Optional[Task]:
+        return task
+
+    def recurring_tasks(self, user_name: str) -> List[Task]:
+        return self._run(self.repository.recurring_tasks(user_name))
+
+    def due_tasks(self, user_name: str, start: date, end: date) -> List[Task]:
+        return self._run(self.repository.due_tasks(user_name, start, end))
+
+    def count_for_user(self, user_name: str) -> int:
+        return self._run(self.repository.count_for_user(user_name))
+
+    def reindex(self) -> int:
+        return self._run(self.repository.reindex())
+
+    def list_tasks(self) -> TaskSnapshot:
+        tasks = self._run(self.repository.list_tasks())
+        return TaskSnapshot((tasks,), len(tasks), len(tasks))
\ No newline at end of file
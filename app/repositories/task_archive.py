@@ -0,0 +1,263 @@
+from app.domain.codecs import task_binary
+from app.domain.models.task import Task
+from app.repositories.description_codec import decompress
+from datetime import date
+from typing import Callable, Iterator, List, Optional
+import logging
+import mmap
+import os
+import struct
+
+SEGMENT_MAGIC = b"TSA3"
+# TSA2 segments have the same layout but never hold compressed descriptions.
+READABLE_MAGICS = (b"TSA2", SEGMENT_MAGIC)
+SEGMENT_HEADER = struct.Struct("<4sIQQ")
+ID_ENTRY = struct.Struct("<QQ")
+DATE_ENTRY = struct.Struct("<iQ")
+TOMBSTONE = struct.Struct("<IQ")
+TOMBSTONE_FILE = "tombstones.bin"
+DICTIONARY_FILE = "descriptions.dict"
+
+class ArchiveSegment:
+    """One immutable, memory-mapped archive file.
+
+    Layout: header (magic, record count, min id, max id), an id index of
+    (id, record offset) sorted by id, a date index of (due ordinal, id)
+    sorted by date, then task_binary records. Lookups binary search the
+    indexes directly in the mapping; nothing is loaded up front. Records may
+    hold compressed descriptions, which ``decompress`` turns back into text
+    as they are read.
+    """
+
+    def __init__(self, number: int, path: str, decompress: Optional[Callable[[bytes], str]] = None):
+        self.number = number
+        self.path = path
+        self._decompress = decompress
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._map)
+        magic, self.count, self.min_id, self.max_id = SEGMENT_HEADER.unpack_from(self._view, 0)
+        if magic not in READABLE_MAGICS:
+            raise ValueError(f"{path} is not a task archive segment")
+        self._ids_at = SEGMENT_HEADER.size
+        self._dates_at = self._ids_at + self.count * ID_ENTRY.size
+
+    @staticmethod
+    def write(path: str, tasks: List[Task]):
+        tasks = sorted(tasks, key=lambda task: task.id)
+        records = bytearray()
+        id_index = bytearray()
+        records_at = SEGMENT_HEADER.size + len(tasks) * (ID_ENTRY.size + DATE_ENTRY.size)
+        for task in tasks:
+            id_index += ID_ENTRY.pack(task.id, records_at + len(records))
+            task_binary.encode_task(records, task, task.id)
+        date_index = b"".join(
+            DATE_ENTRY.pack(task.due_date.toordinal(), task.id)
+            for task in sorted(tasks, key=lambda task: (task.due_date, task.id))
+        )
+        temporary = path + ".tmp"
+        with open(temporary, "wb") as f:
+            f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, len(tasks), tasks[0].id, tasks[-1].id))
+            f.write(id_index)
+            f.write(date_index)
+            f.write(records)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, path)
+
+    def _id_at(self, position: int) -> int:
+        return ID_ENTRY.unpack_from(self._view, self._ids_at + position * ID_ENTRY.size)[0]
+
+    def get(self, task_id: int) -> Optional[Task]:
+        if not self.min_id <= task_id <= self.max_id:
+            return None
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if self._id_at(middle) < task_id:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.count or self._id_at(low) != task_id:
+            return None
+        _, offset = ID_ENTRY.unpack_from(self._view, self._ids_at + low * ID_ENTRY.size)
+        return task_binary.decode_task(self._view, offset, self._decompress)[0]
+
+    def ids_due_between(self, start: date, end: date) -> List[int]:
+        first, last = start.toordinal(), end.toordinal()
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            if DATE_ENTRY.unpack_from(self._view, self._dates_at + middle * DATE_ENTRY.size)[0] < first:
+                low = middle + 1
+            else:
+                high = middle
+        ids = []
+        for position in range(low, self.count):
+            due, task_id = DATE_ENTRY.unpack_from(self._view, self._dates_at + position * DATE_ENTRY.size)
+            if due > last:
+                break
+            ids.append(task_id)
+        return ids
+
+    def __iter__(self) -> Iterator[Task]:
+        return self._tasks(True)
+
+    def without_descriptions(self) -> Iterator[Task]:
+        """Yield the tasks with their description left None, for indexing."""
+        return self._tasks(False)
+
+    def _tasks(self, with_description: bool) -> Iterator[Task]:
+        for position in range(self.count):
+            _, offset = ID_ENTRY.unpack_from(self._view, self._ids_at + position * ID_ENTRY.size)
+            yield task_binary.decode_task(self._view, offset, self._decompress, with_description)[0]
+
+class ArchiveView:
+    """Point-in-time view of the archive, used inside repository snapshots."""
+
+    __slots__ = ("segments", "deleted")
+
+    def __init__(self, segments: tuple, deleted: frozenset):
+        self.segments = segments
+        self.deleted = deleted
+
+    def __iter__(self) -> Iterator[Task]:
+        return self._live(iter)
+
+    def without_descriptions(self) -> Iterator[Task]:
+        """Yield the live tasks with their description left None, for indexing.
+
+        Skips decoding (and decompressing) every description.
+        """
+        return self._live(ArchiveSegment.without_descriptions)
+
+    def _live(self, tasks: Callable[[ArchiveSegment], Iterator[Task]]) -> Iterator[Task]:
+        for segment in self.segments:
+            for task in tasks(segment):
+                if (segment.number, task.id) not in self.deleted:
+                    yield task
+
+    def __len__(self) -> int:
+        return sum(segment.count for segment in self.segments) - len(self.deleted)
+
+class TaskArchive:
+    """Cold tier of a TaskRepository: a directory of archive segments.
+
+    Segments are never rewritten. Deleting an archived task, or moving it
+    back to the hot tier on update, records a (segment, id) tombstone that
+    is appended to a small file so it survives restarts. The repository
+    serializes all writes to the archive under its own lock.
+
+    Segments may keep descriptions compressed with the hot tier's
+    DescriptionCodec dictionary; that dictionary is saved next to them
+    (see ``use_dictionary``) and reads return plain text.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.dictionary = self._read_dictionary()
+        self.segments = tuple(
+            ArchiveSegment(int(name[len("segment-"):-len(".tsa")]), os.path.join(directory, name), self._decompress)
+            for name in sorted(os.listdir(directory))
+            if name.startswith("segment-") and name.endswith(".tsa")
+        )
+        self.deleted = frozenset(self._read_tombstones())
+        self.logger = logging.getLogger("TaskArchive")
+
+    def _read_dictionary(self) -> Optional[bytes]:
+        path = os.path.join(self.directory, DICTIONARY_FILE)
+        if not os.path.exists(path):
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def _decompress(self, description: bytes) -> str:
+        return decompress(description, self.dictionary)
+
+    def use_dictionary(self, dictionary: Optional[bytes]) -> bool:
+        """Return whether segments can keep descriptions compressed with ``dictionary``.
+
+        The first dictionary offered is saved with the archive and kept for
+        good, since existing segments depend on it; any other is refused.
+        """
+        if dictionary is None:
+            return False
+        if self.dictionary is None:
+            path = os.path.join(self.directory, DICTIONARY_FILE)
+            temporary = path + ".tmp"
+            with open(temporary, "wb") as f:
+                f.write(dictionary)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temporary, path)
+            self.dictionary = dictionary
+            self.logger.info(f"Saved the {len(dictionary)} byte description dictionary to {path}")
+        return dictionary == self.dictionary
+
+    def _read_tombstones(self):
+        path = os.path.join(self.directory, TOMBSTONE_FILE)
+        if not os.path.exists(path):
+            return []
+        with open(path, "rb") as f:
+            data = f.read()
+        usable = len(data) - len(data) % TOMBSTONE.size
+        return [TOMBSTONE.unpack_from(data, offset) for offset in range(0, usable, TOMBSTONE.size)]
+
+    @property
+    def max_id(self) -> int:
+        return max((segment.max_id for segment in self.segments), default=0)
+
+    def view(self) -> ArchiveView:
+        return ArchiveView(self.segments, self.deleted)
+
+    def _locate(self, task_id: int):
+        # Newer segments supersede older ones; an id is only ever live in
+        # the newest segment that holds it.
+        for segment in reversed(self.segments):
+            task = segment.get(task_id)
+            if task is not None:
+                if (segment.number, task_id) in self.deleted:
+                    return None, None
+                return segment, task
+        return None, None
+
+    def get(self, task_id: int) -> Optional[Task]:
+        return self._locate(task_id)[1]
+
+    def ids_due_between(self, start: date, end: date) -> List[int]:
+        return [
+            task_id
+            for segment in self.segments
+            for task_id in segment.ids_due_between(start, end)
+            if (segment.number, task_id) not in self.deleted
+        ]
+
+    def remove(self, task_id: int) -> Optional[Task]:
+        """Tombstone an archived task and return it, or None if not archived."""
+        segment, task = self._locate(task_id)
+        if segment is None:
+            return None
+        self._add_tombstones(segment, [task_id])
+        return task
+
+    def _add_tombstones(self, segment: ArchiveSegment, task_ids: List[int]):
+        with open(os.path.join(self.directory, TOMBSTONE_FILE), "ab") as f:
+            f.write(b"".join(TOMBSTONE.pack(segment.number, task_id) for task_id in task_ids))
+            f.flush()
+            os.fsync(f.fileno())
+        self.deleted = self.deleted | {(segment.number, task_id) for task_id in task_ids}
+
+    def write_segment(self, tasks: List[Task]) -> ArchiveSegment:
+        """Write tasks to a new segment file; it is not visible until added."""
+        number = max((segment.number for segment in self.segments), default=0) + 1
+        path = os.path.join(self.directory, f"segment-{number:06d}.tsa")
+        ArchiveSegment.write(path, tasks)
+        return ArchiveSegment(number, path, self._decompress)
+
+    def add_segment(self, segment: ArchiveSegment, stale_ids: List[int]):
+        """Publish a written segment, hiding ids that changed while it was written."""
+        if stale_ids:
+            self._add_tombstones(segment, stale_ids)
+        self.segments = self.segments + (segment,)
+        self.logger.info(f"Archived {segment.count} tasks to {segment.path}")
\ No newline at end of file
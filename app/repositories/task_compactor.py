@@ -0,0 +1,64 @@
+from app.repositories.task_repository import TaskRepository
+from datetime import date, timedelta
+from typing import Optional
+import logging
+import threading
+
+class TaskCompactor:
+    """Background maintenance thread for a repository.
+
+    Each round optionally moves tasks due more than ``archive_after_days``
+    ago to the archive, then compacts once enough of the hot store is
+    tombstones.
+    """
+
+    def __init__(
+        self,
+        repository: TaskRepository,
+        interval: float = 30.0,
+        min_tombstone_ratio: float = 0.2,
+        archive_after_days: Optional[int] = None,
+    ):
+        self.repository = repository
+        self.interval = interval
+        self.min_tombstone_ratio = min_tombstone_ratio
+        self.archive_after_days = archive_after_days
+        self._stop = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger("TaskCompactor")
+
+    def configure(self, interval: float, min_tombstone_ratio: float, archive_after_days: Optional[int]):
+        # A new interval applies from the next round.
+        self.interval = interval
+        self.min_tombstone_ratio = min_tombstone_ratio
+        self.archive_after_days = archive_after_days
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="task-compactor", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+
+    def run_once(self, force: bool = False) -> int:
+        """Run one round; ``force`` compacts whatever the tombstone ratio."""
+        archive_after_days = self.archive_after_days
+        if archive_after_days is not None:
+            self.repository.archive_aged_tasks(date.today() - timedelta(days=archive_after_days))
+        if not force and self.repository.tombstone_ratio() < self.min_tombstone_ratio:
+            return 0
+        return self.repository.compact()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.run_once()
+            except Exception as e:
+                self.logger.error(f"Compaction failed: {e}")
\ No newline at end of file
@@ -0,0 +1,163 @@
+from app.domain.codecs import task_binary
+from app.domain.models.task import Task
+from app.repositories.task_repository import TaskRepository
+from concurrent.futures import ProcessPoolExecutor
+from operator import itemgetter
+from typing import List, Optional, Tuple
+import json
+import logging
+import mmap
+import multiprocessing
+import os
+import threading
+
+logger = logging.getLogger("TaskDump")
+
+# A dump is one task_binary payload holding the hot tier with its ids. It is
+# written at shutdown and restored on the next start; archived tasks already
+# live on disk and are not included. Restores also accept NDJSON, one task
+# with its id per line (as written by export jobs).
+
+FIELDS = tuple(Task.__fields__)
+ID = FIELDS.index("id")
+# Parsing work per process-pool task: large enough to amortize the
+# round trip, small enough to spread a dump over every worker.
+CHUNK_BYTES = 8 * 1024 * 1024
+CHUNK_RECORDS = 50_000
+
+def write_dump(path: str, tasks: List[Task]):
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        for chunk in task_binary.iter_encoded_tasks(tasks, len(tasks)):
+            f.write(chunk)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+def dump_repository(repository: TaskRepository, path: str) -> int:
+    tasks = [repository.inflate(task) for task in repository.list_tasks().hot()]
+    write_dump(path, tasks)
+    logger.info(f"Dumped {len(tasks)} tasks to {path}")
+    return len(tasks)
+
+def _is_binary(path: str) -> bool:
+    with open(path, "rb") as f:
+        return f.read(len(task_binary.MAGIC)) == task_binary.MAGIC
+
+def _ndjson_chunks(path: str) -> List[Tuple[int, int]]:
+    # Cut roughly every CHUNK_BYTES, at the end of the line crossing the cut.
+    size = os.path.getsize(path)
+    chunks, start = [], 0
+    with open(path, "rb") as f:
+        while start < size:
+            f.seek(min(start + CHUNK_BYTES, size))
+            f.readline()
+            end = f.tell()
+            chunks.append((start, end))
+            start = end
+    return chunks
+
+def _binary_chunks(path: str) -> List[Tuple[int, int]]:
+    # Records vary in length, so walk their length fields to find the cuts.
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+        if len(view) < task_binary.HEADER.size:
+            raise ValueError(f"{path} is truncated")
+        _, count = task_binary.HEADER.unpack_from(view, 0)
+        chunks, start = [], task_binary.HEADER.size
+        offset = start
+        for index in range(count):
+            if offset + task_binary.RECORD.size > len(view):
+                raise ValueError(f"{path} is truncated")
+            offset = task_binary.record_end(view, offset)
+            if (index + 1) % CHUNK_RECORDS == 0 or index + 1 == count:
+                chunks.append((start, offset))
+                start = offset
+        if offset != len(view):
+            raise ValueError(f"{path} has trailing bytes or is truncated")
+    return chunks
+
+def _parse_chunk(path: str, binary: bool, start: int, end: int) -> List[tuple]:
+    """Parse and validate the tasks in bytes [start, end) of a dump, sorted by id.
+
+    Runs in a pool process; tasks come back as plain tuples in FIELDS
+    order, which pickle far faster than models.
+    """
+    rows = []
+    if binary:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            offset = start
+            while offset < end:
+                task_id, fields, offset = task_binary.decode_validated(view, offset, end)
+                if task_id < 1:
+                    raise ValueError("Dumped tasks must have ids")
+                fields["id"] = task_id
+                rows.append(tuple(fields[name] for name in FIELDS))
+    else:
+        with open(path, "rb") as f:
+            f.seek(start)
+            lines = f.read(end - start).splitlines()
+        for line in lines:
+            if line.strip():
+                task = Task(**json.loads(line))
+                rows.append(tuple(getattr(task, name) for name in FIELDS))
+    rows.sort(key=itemgetter(ID))
+    return rows
+
+def load_dump(path: str, workers: int = 0, stop: Optional[threading.Event] = None) -> Optional[List[Task]]:
+    """Parse a binary or NDJSON dump into validated tasks, in id order.
+
+    The file is cut into chunks that ``workers`` processes (default: one
+    per CPU) parse and validate in parallel; the sorted chunks are then
+    merged. Returns None if ``stop`` is set before parsing finishes.
+    Raises ValueError on malformed input or duplicate ids.
+    """
+    binary = _is_binary(path)
+    chunks = _binary_chunks(path) if binary else _ndjson_chunks(path)
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    logger.info(f"Loading {path} in {len(chunks)} chunks on {workers} processes")
+    rows = []
+    if workers <= 1:
+        for start, end in chunks:
+            if stop is not None and stop.is_set():
+                return None
+            rows.extend(_parse_chunk(path, binary, start, end))
+    else:
+        # spawn: forking would copy the server's threads and locks.
+        with ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+            futures = [executor.submit(_parse_chunk, path, binary, start, end) for start, end in chunks]
+            for parsed, future in enumerate(futures, 1):
+                if stop is not None and stop.is_set():
+                    executor.shutdown(cancel_futures=True)
+                    return None
+                rows.extend(future.result())
+                logger.info(f"Parsed {parsed}/{len(chunks)} chunks of {path}")
+    # Each chunk is sorted, so this is a merge of sorted runs.
+    rows.sort(key=itemgetter(ID))
+    for previous, row in zip(rows, rows[1:]):
+        if previous[ID] == row[ID]:
+            raise ValueError(f"{path} holds task {row[ID]} more than once")
+    # Fields were validated while parsing.
+    return [Task.construct(**dict(zip(FIELDS, row))) for row in rows]
+
+def restore_repository(
+    repository: TaskRepository,
+    path: str,
+    workers: int = 0,
+    stop: Optional[threading.Event] = None,
+    set_aside: bool = False,
+) -> int:
+    """Load the dump at ``path`` into an empty repository; return how many tasks were loaded.
+
+    With ``set_aside`` the file is then renamed to ``<path>.restored``: a
+    shutdown snapshot would no longer match the store after a crash, and
+    restoring it again would bring back deleted tasks and reuse ids.
+    """
+    tasks = load_dump(path, workers, stop)
+    if tasks is None:
+        logger.info(f"Stopped loading {path}")
+        return 0
+    restored = repository.restore(tasks)
+    if set_aside:
+        os.replace(path, path + ".restored")
+    logger.info(f"Restored {restored} tasks from {path}")
+    return restored
@@ -0,0 +1,188 @@
+from app.domain.models.task import Task, TaskCreate
+from app.repositories.task_listeners import TaskListener
+from bisect import bisect_left, bisect_right, insort
+from datetime import date
+from typing import Dict, List, Optional
+import hashlib
+import math
+import threading
+
+class UserOrderIndex:
+    """Per-user task ids kept sorted by (priority, due_date, id).
+
+    Each user's keys live in a sorted list: inserts and removals are a
+    binary search plus a memmove, and the first N entries of a user's list
+    are their top N tasks.
+    """
+
+    def __init__(self):
+        self._keys: Dict[str, list] = {}
+
+    @staticmethod
+    def _key(task: Task) -> tuple:
+        return (task.priority, task.due_date, task.id)
+
+    def add(self, task: Task):
+        insort(self._keys.setdefault(task.user_name, []), self._key(task))
+
+    def remove(self, task: Task):
+        keys = self._keys.get(task.user_name)
+        if not keys:
+            return
+        key = self._key(task)
+        position = bisect_left(keys, key)
+        if position < len(keys) and keys[position] == key:
+            del keys[position]
+        if not keys:
+            del self._keys[task.user_name]
+
+    def count(self, user_name: str) -> int:
+        return len(self._keys.get(user_name, ()))
+
+    def top(self, user_name: str, limit: int) -> List[int]:
+        return [key[2] for key in self._keys.get(user_name, [])[:limit]]
+
+class RecurringTaskIndex:
+    """Ids of each user's recurring tasks, which are expanded at query time."""
+
+    def __init__(self):
+        self._ids: Dict[str, set] = {}
+
+    def add(self, task: Task):
+        if task.recurrence is not None:
+            self._ids.setdefault(task.user_name, set()).add(task.id)
+
+    def remove(self, task: Task):
+        ids = self._ids.get(task.user_name)
+        if ids is not None:
+            ids.discard(task.id)
+            if not ids:
+                del self._ids[task.user_name]
+
+    def ids(self, user_name: str) -> List[int]:
+        return sorted(self._ids.get(user_name, ()))
+
+class DueDateIndex:
+    """Per-user buckets of one-off task ids keyed by due date.
+
+    Each user also has a sorted list of the dates that have a bucket, so a
+    date range is found by binary search and only its non-empty buckets
+    are visited. Recurring tasks are left to RecurringTaskIndex.
+    """
+
+    def __init__(self):
+        self._buckets: Dict[str, Dict[date, set]] = {}
+        self._dates: Dict[str, list] = {}
+
+    def add(self, task: Task):
+        if task.recurrence is not None:
+            return
+        buckets = self._buckets.setdefault(task.user_name, {})
+        ids = buckets.get(task.due_date)
+        if ids is None:
+            ids = buckets[task.due_date] = set()
+            insort(self._dates.setdefault(task.user_name, []), task.due_date)
+        ids.add(task.id)
+
+    def remove(self, task: Task):
+        if task.recurrence is not None:
+            return
+        buckets = self._buckets.get(task.user_name)
+        ids = buckets.get(task.due_date) if buckets is not None else None
+        if ids is None:
+            return
+        ids.discard(task.id)
+        if ids:
+            return
+        del buckets[task.due_date]
+        dates = self._dates[task.user_name]
+        del dates[bisect_left(dates, task.due_date)]
+        if not dates:
+            del self._buckets[task.user_name]
+            del self._dates[task.user_name]
+
+    def ids(self, user_name: str, start: date, end: date) -> List[int]:
+        """Ids of the user's tasks due within [start, end], by due date then id."""
+        dates = self._dates.get(user_name)
+        if not dates:
+            return []
+        buckets = self._buckets[user_name]
+        return [
+            task_id
+            for day in dates[bisect_left(dates, start):bisect_right(dates, end)]
+            for task_id in sorted(buckets[day])
+        ]
+
+def task_fingerprint(task: TaskCreate) -> tuple:
+    """Identity of a task for deduplication: user, normalized title, due date."""
+    return (task.user_name, " ".join(task.title.casefold().split()), task.due_date)
+
+class BloomFilter:
+    """Fixed-size Bloom filter sized for ``capacity`` items at ``error_rate``.
+
+    Items cannot be removed; a stale positive only costs a dict lookup.
+    """
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item) -> List[int]:
+        digest = hashlib.blake2b(repr(item).encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little")
+        return [(first + index * second) % self.size for index in range(self.hashes)]
+
+    def add(self, item):
+        for position in self._positions(item):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(item))
+
+class FingerprintIndex(TaskListener):
+    """Hash index of task fingerprints, optionally fronted by a Bloom filter.
+
+    Kept current through the repository listener callbacks. The Bloom
+    filter answers most "not seen before" lookups without touching the
+    (much larger) hash index.
+    """
+
+    def __init__(self, bloom_capacity: int = 0):
+        self._ids: Dict[tuple, set] = {}
+        self._bloom = BloomFilter(bloom_capacity) if bloom_capacity else None
+        self._lock = threading.Lock()
+
+    def _add(self, task: Task):
+        fingerprint = task_fingerprint(task)
+        self._ids.setdefault(fingerprint, set()).add(task.id)
+        if self._bloom is not None:
+            self._bloom.add(fingerprint)
+
+    def _remove(self, task: Task):
+        fingerprint = task_fingerprint(task)
+        ids = self._ids.get(fingerprint)
+        if ids is not None:
+            ids.discard(task.id)
+            if not ids:
+                del self._ids[fingerprint]
+
+    def on_add(self, task: Task):
+        with self._lock:
+            self._add(task)
+
+    def on_update(self, old_task: Task, task: Task):
+        with self._lock:
+            self._remove(old_task)
+            self._add(task)
+
+    def on_delete(self, task: Task):
+        with self._lock:
+            self._remove(task)
+
+    def find(self, fingerprint: tuple) -> Optional[int]:
+        if self._bloom is not None and fingerprint not in self._bloom:
+            return None
+        with self._lock:
+            ids = self._ids.get(fingerprint)
+            return min(ids) if ids else None
\ No newline at end of file
@@ -0,0 +1,33 @@
+from app.domain.models.task import Task
+
+class TaskListener:
+    """Receives repository mutations in commit order.
+
+    Callbacks run while the repository lock is held, so they must be cheap
+    and must not call back into the repository; the one exception is
+    ``after_commit``. When a listener is added, archived tasks are replayed
+    to ``on_add`` with their description left None.
+    """
+
+    def on_add(self, task: Task):
+        pass
+
+    def on_update(self, old_task: Task, task: Task):
+        pass
+
+    def on_delete(self, task: Task):
+        pass
+
+    def on_commit(self):
+        """Called once after each repository write call (a single task or a whole batch)."""
+        pass
+
+    def after_commit(self):
+        """Called after on_commit once the repository lock is released, before the write call returns.
+
+        Slow work for a commit (I/O) belongs here. Commits of concurrent
+        writers may already have followed, so handle everything committed
+        so far, in order. The write has already committed, so errors
+        should be handled here rather than raised to the writer.
+        """
+        pass
\ No newline at end of file
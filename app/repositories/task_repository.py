@@ -1,19 +1,424 @@
-from app.domain.models.task import Task, TaskCreate
-from typing import List
+from app.domain.models.task import Task, TaskCreate, TaskUpdate, check_recurrence_until
+from app.repositories.description_codec import DescriptionCodec
+from app.repositories.task_archive import TaskArchive
+from app.repositories.task_indexes import DueDateIndex, RecurringTaskIndex, UserOrderIndex
+from app.repositories.task_listeners import TaskListener
+from app.repositories.task_snapshot import TaskSnapshot
+from datetime import date
+from itertools import chain
+from typing import Iterable, Iterator, List, Optional
 import logging
+import threading
+
+CHUNK_SIZE = 1024
 
 class TaskRepository:
-    def __init__(self):
-        self._tasks = []
-        self._id_counter = 1
+    def __init__(
+        self,
+        archive: Optional[TaskArchive] = None,
+        id_start: int = 1,
+        id_step: int = 1,
+        description_codec: Optional[DescriptionCodec] = None,
+    ):
+        # Tasks live in fixed-size chunks of slots; a slot holds a Task, or
+        # None once the task is deleted (a tombstone). _slots maps task
+        # id -> slot for O(1) access. Chunks are shared with snapshots, so
+        # an existing slot is only ever changed in a private copy of its
+        # chunk (_owned tracks chunks copied since the last snapshot).
+        # Aged tasks can be moved to an optional on-disk archive, which get,
+        # update and delete fall back to when an id has no hot slot.
+        # Ids are id_start, id_start + id_step, ...; partitioned nodes use
+        # disjoint sequences so an id identifies the node that owns it.
+        # With a description codec, stored tasks may hold a compressed
+        # description: it is compressed before the lock is taken and only
+        # inflated by reads that return it. Listeners get inflated tasks,
+        # except for the previous version passed to on_update and archived
+        # tasks replayed by add_listener, which have no description.
+        self._chunks = []
+        self._owned = set()
+        self._length = 0
+        self._slots = {}
+        self._tombstones = 0
+        self._user_order = UserOrderIndex()
+        self._recurring = RecurringTaskIndex()
+        self._due_dates = DueDateIndex()
+        self._listeners = []
+        self._id_counter = id_start
+        self._id_start = id_start
+        self._id_step = id_step
+        self._compacting = False
+        self._dirty_ids = set()
+        self._archive = archive
+        self._archiving = False
+        self._codec = description_codec
+        self._lock = threading.Lock()
         self.logger = logging.getLogger("TaskRepository")
+        if archive is not None:
+            self._skip_ids_through(archive.max_id)
+            # The indexes don't need descriptions; skip decompressing them.
+            for task in archive.view().without_descriptions():
+                self._user_order.add(task)
+                self._recurring.add(task)
+                self._due_dates.add(task)
 
     def add_task(self, task_data: TaskCreate) -> Task:
-        task = Task(id=self._id_counter, **task_data.dict())
-        self._tasks.append(task)
-        self._id_counter += 1
+        description = self._compress(task_data.description)
+        with self._lock:
+            task = self._append(task_data, description)
+            self._commit()
+        self._after_commit()
         self.logger.info(f"Task created: {task}")
         return task
 
-    def list_tasks(self) -> List[Task]:
-        return self._tasks
\ No newline at end of file
+    def add_tasks(self, tasks_data: List[TaskCreate]) -> List[Task]:
+        # One commit for the whole batch: ids stay contiguous and a
+        # persistent backend only has to flush once.
+        descriptions = [self._compress(task_data.description) for task_data in tasks_data]
+        with self._lock:
+            tasks = [self._append(task_data, description) for task_data, description in zip(tasks_data, descriptions)]
+            self._commit()
+        self._after_commit()
+        self.logger.info(f"{len(tasks)} tasks created in one batch")
+        return tasks
+
+    def _append(self, task_data: TaskCreate, description) -> Task:
+        # task_data is already a validated TaskCreate; don't validate twice.
+        task = Task.construct(id=self._id_counter, **task_data.dict())
+        stored = task if description is task.description else task.copy(update={"description": description})
+        self._slots[task.id] = self._length
+        self._push(stored)
+        self._user_order.add(task)
+        self._recurring.add(task)
+        self._due_dates.add(task)
+        for listener in self._listeners:
+            listener.on_add(task)
+        self._id_counter += self._id_step
+        return task
+
+    def restore(self, tasks: Iterable[Task]) -> int:
+        """Load previously dumped tasks, keeping their ids; return how many were loaded.
+
+        Only valid on an empty hot tier with no listeners yet: restored
+        tasks are not reported to listeners. Tasks the archive already
+        holds (exports include them) are skipped. Raises ValueError, before
+        loading anything, if an id is outside this repository's sequence.
+        """
+        tasks = list(tasks)
+        for task in tasks:
+            if task.id < self._id_start or (task.id - self._id_start) % self._id_step:
+                raise ValueError(f"Task {task.id} is not in this node's id sequence")
+        if self._archive is not None:
+            archived = len(tasks)
+            tasks = [task for task in tasks if self._archive.get(task.id) is None]
+            if archived != len(tasks):
+                self.logger.info(f"Skipped {archived - len(tasks)} tasks that are already archived")
+        descriptions = [self._compress(task.description) for task in tasks]
+        with self._lock:
+            if self._length or self._listeners:
+                raise RuntimeError("restore() needs an empty repository without listeners")
+            for task, description in zip(tasks, descriptions):
+                stored = task if description is task.description else task.copy(update={"description": description})
+                self._slots[task.id] = self._length
+                self._push(stored)
+                self._user_order.add(task)
+                self._recurring.add(task)
+                self._due_dates.add(task)
+            self._skip_ids_through(max((task.id for task in tasks), default=0))
+        return len(tasks)
+
+    def _skip_ids_through(self, task_id: int):
+        # Move the next id past task_id, staying on this node's sequence.
+        if task_id >= self._id_counter:
+            self._id_counter = self._id_start + ((task_id - self._id_start) // self._id_step + 1) * self._id_step
+
+    def _compress(self, description: str):
+        return description if self._codec is None else self._codec.compress(description)
+
+    def inflate(self, task: Optional[Task]) -> Optional[Task]:
+        """Return ``task`` as read with inflate=False, with a plain-text description."""
+        if self._codec is None or task is None:
+            return task
+        return self._codec.inflate(task)
+
+    def _commit(self):
+        for listener in self._listeners:
+            listener.on_commit()
+
+    def _after_commit(self):
+        # Read without the lock: listeners are only ever appended.
+        for listener in self._listeners:
+            listener.after_commit()
+
+    def add_listener(self, listener: TaskListener, replay: bool = True):
+        """Subscribe to mutations, by default first replaying every stored task as an add.
+
+        Archived tasks are replayed with their description left None, so a
+        large cold tier isn't decompressed to build a listener's indexes.
+        """
+        with self._lock:
+            if replay:
+                for task in self._indexable(inflate=True):
+                    listener.on_add(task)
+            self._listeners.append(listener)
+
+    def _indexable(self, inflate: bool = False) -> Iterator[Task]:
+        # Archived tasks without descriptions, then the hot tier as stored
+        # or inflated.
+        archived = self._archive.view().without_descriptions() if self._archive is not None else ()
+        hot = self._snapshot().hot()
+        return chain(archived, map(self.inflate, hot) if inflate else hot)
+
+    def _push(self, task: Task):
+        # Appending in place is safe: snapshots never read past their length.
+        if not self._chunks or len(self._chunks[-1]) == CHUNK_SIZE:
+            self._chunks.append([])
+            self._owned.add(len(self._chunks) - 1)
+        self._chunks[-1].append(task)
+        self._length += 1
+
+    def _slot(self, slot: int) -> Optional[Task]:
+        return self._chunks[slot // CHUNK_SIZE][slot % CHUNK_SIZE]
+
+    def _set_slot(self, slot: int, task: Optional[Task]):
+        index, offset = divmod(slot, CHUNK_SIZE)
+        if index not in self._owned:
+            self._chunks[index] = list(self._chunks[index])
+            self._owned.add(index)
+        self._chunks[index][offset] = task
+
+    def _get(self, task_id: int) -> Optional[Task]:
+        slot = self._slots.get(task_id)
+        if slot is not None:
+            return self._slot(slot)
+        if self._archive is not None:
+            return self._archive.get(task_id)
+        return None
+
+    def get_task(self, task_id: int, inflate: bool = True) -> Optional[Task]:
+        with self._lock:
+            task = self._get(task_id)
+        return self.inflate(task) if inflate else task
+
+    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
+        """Apply the update and return the new version, or None if there is no such task.
+
+        Raises ValueError, leaving the task unchanged, if the updated task
+        would break the recurrence rules TaskCreate enforces.
+        """
+        changes = task_update.changes()
+        if "description" in changes:
+            changes["description"] = self._compress(changes["description"])
+        with self._lock:
+            slot = self._slots.get(task_id)
+            old_task = self._slot(slot) if slot is not None else self._get(task_id)
+            if old_task is None:
+                return None
+            stored = old_task.copy(update=changes)
+            check_recurrence_until(stored.due_date, stored.recurrence, stored.recurrence_until)
+            if slot is not None:
+                self._set_slot(slot, stored)
+            else:
+                # Archived tasks are immutable: move the new version back
+                # to the hot tier.
+                self._archive.remove(task_id)
+                self._slots[task_id] = self._length
+                self._push(stored)
+            task = self.inflate(stored)
+            self._user_order.remove(old_task)
+            self._user_order.add(task)
+            self._recurring.remove(old_task)
+            self._recurring.add(task)
+            self._due_dates.remove(old_task)
+            self._due_dates.add(task)
+            for listener in self._listeners:
+                listener.on_update(old_task, task)
+            self._commit()
+            if self._compacting:
+                self._dirty_ids.add(task_id)
+        self._after_commit()
+        self.logger.info(f"Task updated: {task}")
+        return task
+
+    def delete_task(self, task_id: int) -> bool:
+        with self._lock:
+            slot = self._slots.pop(task_id, None)
+            if slot is not None:
+                task = self._slot(slot)
+                self._set_slot(slot, None)
+                self._tombstones += 1
+            else:
+                task = self._archive.remove(task_id) if self._archive is not None else None
+                if task is None:
+                    return False
+            self._user_order.remove(task)
+            self._recurring.remove(task)
+            self._due_dates.remove(task)
+            for listener in self._listeners:
+                listener.on_delete(task)
+            self._commit()
+            if self._compacting:
+                self._dirty_ids.add(task_id)
+        self._after_commit()
+        self.logger.info(f"Task deleted: {task_id}")
+        return True
+
+    def top_tasks(self, user_name: str, limit: int, inflate: bool = True) -> List[Task]:
+        """Return the user's first ``limit`` tasks by (priority, due_date, id).
+
+        With ``inflate=False`` tasks are returned as stored, for callers that
+        don't need descriptions (see ``inflate``).
+        """
+        with self._lock:
+            tasks = [self._get(task_id) for task_id in self._user_order.top(user_name, limit)]
+        return [self.inflate(task) for task in tasks] if inflate else tasks
+
+    def recurring_tasks(self, user_name: str) -> List[Task]:
+        """Return the user's recurring tasks, unexpanded, in id order.
+
+        Descriptions are left as stored (possibly compressed): occurrences
+        don't carry them.
+        """
+        with self._lock:
+            return [self._get(task_id) for task_id in self._recurring.ids(user_name)]
+
+    def due_tasks(self, user_name: str, start: date, end: date) -> List[Task]:
+        """Return the user's one-off tasks due within [start, end], by due date then id.
+
+        Descriptions are left as stored, as in ``recurring_tasks``.
+        """
+        with self._lock:
+            return [self._get(task_id) for task_id in self._due_dates.ids(user_name, start, end)]
+
+    def reindex(self) -> int:
+        """Rebuild the per-user indexes from the stored tasks; return how many were indexed.
+
+        Runs under the lock, so writers wait until it is done.
+        """
+        with self._lock:
+            user_order, recurring, due_dates = UserOrderIndex(), RecurringTaskIndex(), DueDateIndex()
+            indexed = 0
+            for task in self._indexable():
+                user_order.add(task)
+                recurring.add(task)
+                due_dates.add(task)
+                indexed += 1
+            self._user_order, self._recurring, self._due_dates = user_order, recurring, due_dates
+        self.logger.info(f"Reindexed {indexed} tasks")
+        return indexed
+
+    def count_for_user(self, user_name: str) -> int:
+        with self._lock:
+            return self._user_order.count(user_name)
+
+    def list_tasks(self) -> TaskSnapshot:
+        with self._lock:
+            return self._snapshot()
+
+    def _snapshot(self) -> TaskSnapshot:
+        # Only the chunk directory is copied; every chunk is now shared.
+        self._owned = set()
+        archived = self._archive.view() if self._archive is not None else None
+        inflate = self._codec.inflate if self._codec is not None else None
+        return TaskSnapshot(tuple(self._chunks), self._length, len(self._slots), archived, inflate)
+
+    def tombstone_ratio(self) -> float:
+        with self._lock:
+            return self._tombstones / self._length if self._length else 0.0
+
+    def compact(self) -> int:
+        """Drop tombstoned slots and return how many were reclaimed.
+
+        The live tasks are copied from a snapshot without holding the lock,
+        so writers are only blocked for the final swap. Ids updated or
+        deleted during the copy are tracked in _dirty_ids and patched in
+        before swapping.
+        """
+        with self._lock:
+            if self._compacting or not self._tombstones:
+                return 0
+            self._compacting = True
+            snapshot = self._snapshot()
+            watermark = self._length
+
+        live = list(snapshot.hot())
+        slots = {task.id: slot for slot, task in enumerate(live)}
+        chunks = [live[start:start + CHUNK_SIZE] for start in range(0, len(live), CHUNK_SIZE)]
+
+        with self._lock:
+            tombstones = 0
+            for task_id in self._dirty_ids:
+                slot = slots.get(task_id)
+                if slot is None:
+                    continue
+                current = self._slots.get(task_id)
+                if current is None:
+                    del slots[task_id]
+                    tombstones += 1
+                chunks[slot // CHUNK_SIZE][slot % CHUNK_SIZE] = None if current is None else self._slot(current)
+            tail = [self._slot(slot) for slot in range(watermark, self._length)]
+            length = self._length
+            self._chunks = chunks
+            self._owned = set(range(len(chunks)))
+            self._length = len(live)
+            for task in tail:
+                if task is not None:
+                    slots[task.id] = self._length
+                    self._push(task)
+            reclaimed = length - self._length
+            self._slots = slots
+            self._tombstones = tombstones
+            self._dirty_ids = set()
+            self._compacting = False
+        self.logger.info(f"Compaction reclaimed {reclaimed} slots")
+        return reclaimed
+
+    @staticmethod
+    def _is_aged(task: Task, cutoff: date) -> bool:
+        # A recurring task stays hot while it still has occurrences to come.
+        if task.recurrence is not None:
+            return task.recurrence_until is not None and task.recurrence_until < cutoff
+        return task.due_date < cutoff
+
+    def archive_aged_tasks(self, cutoff: date) -> int:
+        """Move tasks due before ``cutoff`` to the archive; return how many moved.
+
+        Recurring tasks only age out once their series ended before ``cutoff``.
+
+        The segment is written from a snapshot without holding the lock.
+        Publishing it and tombstoning the hot slots happens in one locked
+        step; tasks changed in the meantime keep their hot version and
+        their archived copy is hidden.
+        """
+        if self._archive is None:
+            return 0
+        with self._lock:
+            if self._archiving:
+                return 0
+            self._archiving = True
+            snapshot = self._snapshot()
+        try:
+            aged = [task for task in snapshot.hot() if self._is_aged(task, cutoff)]
+            if not aged:
+                return 0
+            # Compressed descriptions go to the segment as they are, as
+            # long as the archive keeps the codec's dictionary.
+            archived = aged
+            if self._codec is not None and not self._archive.use_dictionary(self._codec.dictionary):
+                archived = [self.inflate(task) for task in aged]
+            segment = self._archive.write_segment(archived)
+            with self._lock:
+                stale_ids = []
+                for task in aged:
+                    slot = self._slots.get(task.id)
+                    if slot is None or self._slot(slot) is not task:
+                        stale_ids.append(task.id)
+                        continue
+                    del self._slots[task.id]
+                    self._set_slot(slot, None)
+                    self._tombstones += 1
+                    if self._compacting:
+                        self._dirty_ids.add(task.id)
+                self._archive.add_segment(segment, stale_ids)
+            return len(aged) - len(stale_ids)
+        finally:
+            self._archiving = False
\ No newline at end of file
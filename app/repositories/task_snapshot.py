@@ -0,0 +1,45 @@
+from app.domain.models.task import Task
+from itertools import chain, islice
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+class TaskSnapshot:
+    """Immutable point-in-time view of a TaskRepository.
+
+    Holds references to the repository's chunks plus a length watermark.
+    The repository copies a chunk before changing an existing slot and only
+    appends past the watermark, so nothing visible here ever changes.
+    Archived tasks, if any, come from an equally immutable archive view and
+    are yielded before the hot tasks. Iterating inflates compressed
+    descriptions; ``stored()`` and ``hot()`` yield tasks as stored.
+    """
+
+    __slots__ = ("_chunks", "_length", "_count", "_archived", "_inflate")
+
+    def __init__(
+        self,
+        chunks: Sequence[list],
+        length: int,
+        count: int,
+        archived: Optional[Iterable[Task]] = None,
+        inflate: Optional[Callable[[Task], Task]] = None,
+    ):
+        self._chunks = chunks
+        self._length = length
+        self._count = count
+        self._archived = archived if archived is not None else ()
+        self._inflate = inflate
+
+    def __iter__(self) -> Iterator[Task]:
+        hot = self.hot() if self._inflate is None else map(self._inflate, self.hot())
+        return chain(self._archived, hot)
+
+    def stored(self) -> Iterator[Task]:
+        return chain(self._archived, self.hot())
+
+    def hot(self) -> Iterator[Task]:
+        for task in islice(chain.from_iterable(self._chunks), self._length):
+            if task is not None:
+                yield task
+
+    def __len__(self) -> int:
+        return self._count + len(self._archived)
\ No newline at end of file
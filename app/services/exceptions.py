@@ -0,0 +1,11 @@
+class QuotaExceededError(Exception):
+    """Raised when creating tasks would take a user past their quota."""
+
+class DuplicateTaskError(Exception):
+    """Raised when a create matches an existing or in-flight task's fingerprint."""
+
+class JobQueueFullError(Exception):
+    """Raised when the job queue already holds as many waiting jobs as it allows."""
+
+class JobCancelledError(Exception):
+    """Raised inside a job by ``check_cancelled`` once the job has been cancelled."""
\ No newline at end of file
@@ -0,0 +1,33 @@
+from bisect import bisect
+from typing import List
+import hashlib
+
+class HashRing:
+    """Consistent-hash ring mapping keys (user names) to nodes.
+
+    Each node is placed on the ring at ``vnodes`` points so ranges stay
+    balanced, and adding or removing a node only moves the keys next to
+    its points.
+    """
+
+    def __init__(self, nodes: List[str], vnodes: int = 64):
+        self.nodes = list(nodes)
+        points = sorted(
+            (self._hash(f"{node}#{replica}"), node)
+            for node in self.nodes
+            for replica in range(vnodes)
+        )
+        self._hashes = [point for point, _ in points]
+        self._owners = [node for _, node in points]
+
+    @staticmethod
+    def _hash(key: str) -> int:
+        return int.from_bytes(hashlib.md5(key.encode()).digest()[:8], "big")
+
+    def owner(self, key: str) -> str:
+        position = bisect(self._hashes, self._hash(key)) % len(self._hashes)
+        return self._owners[position]
+
+    def owner_of_task(self, task_id: int) -> str:
+        # Node i of N allocates ids i+1, i+1+N, ... so an id names its node.
+        return self.nodes[(task_id - 1) % len(self.nodes)]
\ No newline at end of file
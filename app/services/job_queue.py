@@ -0,0 +1,200 @@
+from app.domain.models.job import JobState, JobStatus
+from app.services.exceptions import JobCancelledError, JobQueueFullError
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+import itertools
+import logging
+import os
+import queue
+import threading
+import time
+
+class Job:
+    """One unit of background work, shared by the worker running it and the clients polling it.
+
+    The job's function receives the Job itself: it reports progress
+    through ``progress`` and calls ``check_cancelled`` at safe points.
+    """
+
+    def __init__(self, job_id: int, kind: str, function: Callable[["Job"], Optional[Dict[str, Any]]]):
+        self.id = job_id
+        self.kind = kind
+        self.function = function
+        self.state = JobState.QUEUED
+        self.submitted_at = datetime.utcnow()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.done = 0
+        self.total: Optional[int] = None
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        # A file produced by the job (e.g. an export), removed once the job
+        # is no longer retained or newer artifacts push it out.
+        self.artifact: Optional[str] = None
+        # The job's input spooled to disk (e.g. an import payload), removed
+        # as soon as the job finishes.
+        self.spool: Optional[str] = None
+        self._cancelled = threading.Event()
+
+    def progress(self, done: int, total: Optional[int] = None):
+        self.done = done
+        if total is not None:
+            self.total = total
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check_cancelled(self):
+        if self._cancelled.is_set():
+            raise JobCancelledError(f"Job {self.id} was cancelled")
+
+    def status(self) -> JobStatus:
+        return JobStatus(
+            id=self.id,
+            kind=self.kind,
+            state=self.state,
+            submitted_at=self.submitted_at,
+            started_at=self.started_at,
+            finished_at=self.finished_at,
+            done=self.done,
+            total=self.total,
+            result=self.result,
+            error=self.error,
+        )
+
+class JobQueue:
+    """Runs background jobs on a fixed pool of worker threads.
+
+    At most ``workers`` jobs run at once and at most ``max_pending`` wait
+    for a worker; ``submit`` raises JobQueueFullError past that. Workers
+    are started on the first submit. Cancellation is cooperative: a queued
+    job is dropped at once, a running one stops at its next
+    ``check_cancelled``. The last ``retention`` finished jobs are kept for
+    polling, and the artifacts of the last ``artifact_retention`` of them
+    for download.
+    """
+
+    def __init__(self, workers: int = 2, max_pending: int = 100, retention: int = 1000, artifact_retention: int = 10):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retention = retention
+        self.artifact_retention = artifact_retention
+        self._queue = queue.Queue()
+        self._jobs: Dict[int, Job] = {}
+        self._finished = deque()
+        self._artifacts = deque()
+        self._ids = itertools.count(1)
+        self._pending = 0
+        self._threads = []
+        self._closed = False
+        self._lock = threading.Lock()
+        self.logger = logging.getLogger("JobQueue")
+
+    def submit(self, kind: str, function: Callable[[Job], Optional[Dict[str, Any]]], spool: Optional[str] = None) -> Job:
+        """Queue a job; ``spool`` names an input file the job owns once it is accepted."""
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Job queue is closed")
+            if self._pending >= self.max_pending:
+                raise JobQueueFullError(f"{self._pending} jobs are already waiting")
+            job = Job(next(self._ids), kind, function)
+            job.spool = spool
+            self._jobs[job.id] = job
+            self._pending += 1
+            if not self._threads:
+                for index in range(self.workers):
+                    thread = threading.Thread(target=self._run, name=f"job-worker-{index}", daemon=True)
+                    thread.start()
+                    self._threads.append(thread)
+        self._queue.put(job)
+        self.logger.info(f"Job {job.id} ({kind}) queued")
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def cancel(self, job_id: int) -> Optional[Job]:
+        """Cancel a job; finished jobs are returned unchanged."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._cancel(job)
+            return job
+
+    def _cancel(self, job: Job):
+        job._cancelled.set()
+        if job.state == JobState.QUEUED:
+            # Its worker will skip it.
+            self._pending -= 1
+            self._finish(job, JobState.CANCELLED)
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Cancel every unfinished job and stop the workers.
+
+        Returns False if a job is still running after ``timeout``.
+        """
+        with self._lock:
+            self._closed = True
+            for job in list(self._jobs.values()):
+                self._cancel(job)
+            threads = self._threads
+        for _ in threads:
+            self._queue.put(None)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for thread in threads:
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        return not any(thread.is_alive() for thread in threads)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            with self._lock:
+                if job.state != JobState.QUEUED:
+                    continue
+                self._pending -= 1
+                job.state = JobState.RUNNING
+                job.started_at = datetime.utcnow()
+            result, error = None, None
+            try:
+                result = job.function(job)
+                state = JobState.SUCCEEDED
+            except JobCancelledError:
+                state = JobState.CANCELLED
+            except Exception as e:
+                self.logger.error(f"Job {job.id} ({job.kind}) failed: {e}")
+                state, error = JobState.FAILED, str(e)
+            with self._lock:
+                self._finish(job, state, result, error)
+            self.logger.info(f"Job {job.id} ({job.kind}) {state.value}")
+
+    def _finish(self, job: Job, state: JobState, result: Optional[Dict[str, Any]] = None, error: Optional[str] = None):
+        job.result = result
+        job.error = error
+        job.finished_at = datetime.utcnow()
+        job.state = state
+        _remove(job.spool)
+        job.spool = None
+        self._finished.append(job.id)
+        if job.artifact is not None:
+            self._artifacts.append(job)
+        while len(self._artifacts) > self.artifact_retention:
+            expired = self._artifacts.popleft()
+            _remove(expired.artifact)
+            expired.artifact = None
+        while len(self._finished) > self.retention:
+            expired = self._jobs.pop(self._finished.popleft(), None)
+            if expired is not None and expired.artifact is not None:
+                self._artifacts.remove(expired)
+                _remove(expired.artifact)
+
+def _remove(path: Optional[str]):
+    if path is not None:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,90 @@
+from contextlib import contextmanager
+from datetime import datetime
+from fastapi import Request
+from typing import Optional
+import cProfile
+import logging
+import os
+import secrets
+import threading
+import uuid
+
+PROFILE_HEADER = "X-Profile"
+ADMIN_TOKEN_HEADER = "X-Admin-Token"
+ARTIFACT_HEADER = "X-Profile-Artifact"
+
+def is_admin(request: Request, admin_token: Optional[str]) -> bool:
+    supplied = request.headers.get(ADMIN_TOKEN_HEADER)
+    return bool(admin_token and supplied and secrets.compare_digest(supplied, admin_token))
+
+class RequestProfiler:
+    """Captures a cProfile trace of a single request on demand.
+
+    A request is profiled when profiling is switched on for every request
+    in Config, or when an admin sends ``X-Profile: 1``. The trace is written
+    to ``directory`` and its file name is exposed on ``request.state`` so it
+    can be returned in the ``X-Profile-Artifact`` response header.
+
+    cProfile only sees the calling thread, so the profiled block must run
+    on the thread doing the work (the endpoint's worker thread); ``profile``
+    yields whether it is profiling so the caller can keep the work there.
+    Only one request is profiled at a time (Python 3.12+ refuses to enable
+    a second profiler), others run unprofiled. Only the newest
+    ``retention`` traces are kept.
+    """
+
+    def __init__(self, directory: str, always: bool = False, admin_token: Optional[str] = None, retention: int = 100):
+        self.directory = directory
+        self.always = always
+        self.admin_token = admin_token
+        self.retention = retention
+        self._busy = threading.Lock()
+        self.logger = logging.getLogger("RequestProfiler")
+
+    def requested(self, request: Request) -> bool:
+        if self.always:
+            return True
+        return request.headers.get(PROFILE_HEADER) == "1" and is_admin(request, self.admin_token)
+
+    @contextmanager
+    def profile(self, request: Request):
+        if not self.requested(request):
+            yield False
+            return
+        if not self._busy.acquire(blocking=False):
+            self.logger.info(f"Not profiling {request.method} {request.url.path}: another request is being profiled")
+            yield False
+            return
+        try:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                yield True
+            finally:
+                profiler.disable()
+                os.makedirs(self.directory, exist_ok=True)
+                name = f"{datetime.utcnow():%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}.prof"
+                profiler.dump_stats(os.path.join(self.directory, name))
+                request.state.profile_artifact = name
+                self.logger.info(f"Profiled {request.method} {request.url.path} to {name}")
+                self._prune()
+        finally:
+            self._busy.release()
+
+    def _prune(self):
+        traces = [entry for entry in os.scandir(self.directory) if entry.name.endswith(".prof") and entry.is_file()]
+        if len(traces) <= self.retention:
+            return
+        traces.sort(key=lambda entry: entry.stat().st_mtime)
+        for entry in traces[:len(traces) - self.retention]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+    def artifact_path(self, name: str) -> Optional[str]:
+        # Only plain file names produced above; never a path from the client.
+        if os.path.basename(name) != name or not name.endswith(".prof"):
+            return None
+        path = os.path.join(self.directory, name)
+        return path if os.path.isfile(path) else None
\ No newline at end of file
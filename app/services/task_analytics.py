@@ -0,0 +1,137 @@
+from app.domain.models.analytics import PriorityBucket, TaskAnalytics, UserWorkload, WorkloadDistribution
+from app.domain.models.task import Task
+from app.repositories.task_listeners import TaskListener
+from datetime import date
+from typing import Optional
+import logging
+import threading
+import numpy as np
+
+PRIORITIES = 5
+
+class TaskColumns(TaskListener):
+    """NumPy column mirror of the repository, one row per task id.
+
+    Rows are addressed as ``id - 1`` and kept current through the repository
+    listener callbacks; deleted tasks just clear their ``live`` flag.
+    """
+
+    def __init__(self, capacity: int = 1024):
+        self.priority = np.zeros(capacity, dtype=np.int8)
+        self.due = np.zeros(capacity, dtype=np.int32)
+        self.user = np.zeros(capacity, dtype=np.int32)
+        self.live = np.zeros(capacity, dtype=bool)
+        self.rows = 0
+        self.user_names = []
+        self._user_codes = {}
+        self._lock = threading.Lock()
+
+    def _user_code(self, user_name: str) -> int:
+        code = self._user_codes.get(user_name)
+        if code is None:
+            code = self._user_codes[user_name] = len(self.user_names)
+            self.user_names.append(user_name)
+        return code
+
+    def _grow(self, rows: int):
+        capacity = len(self.live)
+        if rows <= capacity:
+            return
+        while capacity < rows:
+            capacity *= 2
+        for name in ("priority", "due", "user", "live"):
+            column = getattr(self, name)
+            grown = np.zeros(capacity, dtype=column.dtype)
+            grown[:len(column)] = column
+            setattr(self, name, grown)
+
+    def _write(self, task: Task):
+        row = task.id - 1
+        self._grow(row + 1)
+        self.priority[row] = task.priority
+        self.due[row] = task.due_date.toordinal()
+        self.user[row] = self._user_code(task.user_name)
+        self.live[row] = True
+        self.rows = max(self.rows, row + 1)
+
+    def on_add(self, task: Task):
+        with self._lock:
+            self._write(task)
+
+    def on_update(self, old_task: Task, task: Task):
+        with self._lock:
+            self._write(task)
+
+    def on_delete(self, task: Task):
+        with self._lock:
+            self.live[task.id - 1] = False
+
+    def copy_live(self):
+        """Return (priority, due, user) arrays of live rows and the user names."""
+        with self._lock:
+            live = self.live[:self.rows]
+            return (
+                self.priority[:self.rows][live],
+                self.due[:self.rows][live],
+                self.user[:self.rows][live],
+                list(self.user_names),
+            )
+
+class TaskAnalyticsService:
+    def __init__(self, columns: TaskColumns):
+        self.columns = columns
+        self.logger = logging.getLogger("TaskAnalyticsService")
+
+    def analyze(self, bucket_days: int = 7, start: Optional[date] = None, end: Optional[date] = None, top_users: int = 10) -> TaskAnalytics:
+        priority, due, user, user_names = self.columns.copy_live()
+        if start is not None or end is not None:
+            window = np.ones(len(due), dtype=bool)
+            if start is not None:
+                window &= due >= start.toordinal()
+            if end is not None:
+                window &= due <= end.toordinal()
+            priority, due, user = priority[window], due[window], user[window]
+        self.logger.info(f"Computing analytics over {len(due)} tasks")
+        return TaskAnalytics(
+            tasks=len(due),
+            bucket_days=bucket_days,
+            priority_by_due_date=self._priority_histogram(priority, due, bucket_days),
+            workload=self._workload(user, user_names, top_users),
+        )
+
+    @staticmethod
+    def _priority_histogram(priority, due, bucket_days: int):
+        if not len(due):
+            return []
+        first = int(due.min())
+        # Count over the occupied buckets only: due dates can span the
+        # whole calendar, with nearly every bucket in between empty.
+        occupied, bucket = np.unique((due - first) // bucket_days, return_inverse=True)
+        counts = np.bincount(bucket * PRIORITIES + (priority.astype(np.int64) - 1), minlength=len(occupied) * PRIORITIES)
+        counts = counts.reshape(len(occupied), PRIORITIES)
+        starts = first + occupied.astype(np.int64) * bucket_days
+        ends = np.minimum(starts + bucket_days - 1, date.max.toordinal())
+        return [
+            PriorityBucket(start=date.fromordinal(start), end=date.fromordinal(end), counts=row)
+            for start, end, row in zip(starts.tolist(), ends.tolist(), counts.tolist())
+        ]
+
+    @staticmethod
+    def _workload(user, user_names, top_users: int) -> WorkloadDistribution:
+        counts = np.bincount(user, minlength=len(user_names))
+        active = counts[counts > 0]
+        if not len(active):
+            return WorkloadDistribution(users=0, mean=0, p50=0, p90=0, p99=0, max=0, top=[])
+        p50, p90, p99 = np.percentile(active, [50, 90, 99])
+        top = min(top_users, len(active))
+        leaders = np.argpartition(counts, -top)[-top:]
+        leaders = leaders[np.argsort(counts[leaders])[::-1]]
+        return WorkloadDistribution(
+            users=len(active),
+            mean=float(active.mean()),
+            p50=float(p50),
+            p90=float(p90),
+            p99=float(p99),
+            max=int(active.max()),
+            top=[UserWorkload(user_name=user_names[code], tasks=int(counts[code])) for code in leaders],
+        )
\ No newline at end of file
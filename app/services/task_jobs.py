@@ -0,0 +1,64 @@
+"""Bodies of the background jobs offered by /jobs.
+
+Each takes the running Job first, reports progress through it and checks
+for cancellation between batches, and returns the job's result.
+"""
+from app.domain.codecs import task_binary, task_json
+from app.repositories.task_compactor import TaskCompactor
+from app.services.job_queue import Job
+from app.services.task_service import TaskService
+from typing import Iterable, Iterator
+import os
+
+BATCH_SIZE = 1000
+
+def import_tasks(job: Job, task_service: TaskService, path: str, binary: bool) -> dict:
+    """Create the tasks in the bulk payload stored at ``path``, one commit per batch.
+
+    Batches committed before a failure or cancellation stay; ``done``
+    says how many tasks that was.
+    """
+    with open(path, "rb") as f:
+        payload = f.read()
+    tasks_data = task_binary.decode_task_creates(payload) if binary else task_json.decode_task_creates(payload)
+    del payload
+    job.progress(0, len(tasks_data))
+    created = 0
+    for start in range(0, len(tasks_data), BATCH_SIZE):
+        job.check_cancelled()
+        created += len(task_service.create_tasks(tasks_data[start:start + BATCH_SIZE]))
+        job.progress(created)
+    return {"created": created}
+
+def export_tasks(job: Job, task_service: TaskService, path: str, binary: bool) -> dict:
+    """Write every task to ``path``, in the binary format or as NDJSON."""
+    snapshot = task_service.list_tasks()
+    job.progress(0, len(snapshot))
+    tasks = _tracked(job, snapshot)
+    chunks = task_binary.iter_encoded_tasks(tasks, len(snapshot)) if binary else task_json.iter_ndjson(tasks)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    temporary = path + ".tmp"
+    try:
+        with open(temporary, "wb") as f:
+            for chunk in chunks:
+                f.write(chunk)
+        os.replace(temporary, path)
+    finally:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+    job.artifact = path
+    return {"exported": len(snapshot)}
+
+def _tracked(job: Job, tasks: Iterable) -> Iterator:
+    for count, task in enumerate(tasks, 1):
+        yield task
+        if count % BATCH_SIZE == 0:
+            job.progress(count)
+            job.check_cancelled()
+    job.progress(job.total)
+
+def reindex(job: Job, task_service: TaskService) -> dict:
+    return {"indexed": task_service.repository.reindex()}
+
+def compact(job: Job, task_compactor: TaskCompactor) -> dict:
+    return {"reclaimed": task_compactor.run_once(force=True)}
@@ -1,12 +1,289 @@
-from app.domain.models.task import TaskCreate, Task
+from app.domain.models.task import CalendarDay, TaskCreate, TaskOccurrence, TaskUpdate, Task
+from app.domain.projection import encode_projection, projector
+from app.domain.recurrence import occurrence_dates
+from app.repositories.shared_task_cache import SharedTaskCache
+from app.repositories.task_indexes import FingerprintIndex, task_fingerprint
 from app.repositories.task_repository import TaskRepository
+from app.repositories.task_snapshot import TaskSnapshot
+from app.services.exceptions import DuplicateTaskError, QuotaExceededError
+from app.services.write_coalescer import WriteCoalescer
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date
+from itertools import groupby
+from typing import Dict, List, Optional, Sequence, Tuple
+import json
 import logging
+import threading
+
+QUOTA_LOCK_STRIPES = 64
 
 class TaskService:
-    def __init__(self, repository: TaskRepository):
+    def __init__(
+        self,
+        repository: TaskRepository,
+        coalescer: Optional[WriteCoalescer] = None,
+        quota_per_user: int = 0,
+        dedupe_mode: str = "off",
+        fingerprints: Optional[FingerprintIndex] = None,
+        cache: Optional[SharedTaskCache] = None,
+    ):
         self.repository = repository
+        self.coalescer = coalescer
+        self.quota_per_user = quota_per_user
+        # dedupe_mode is "off", "reject" (409 on a duplicate) or "merge"
+        # (fold the new description and priority into the existing task).
+        self.dedupe_mode = dedupe_mode
+        self.fingerprints = fingerprints
+        # Serialized tasks shared by all worker processes; every write
+        # below invalidates the id once it has committed.
+        self.cache = cache
+        self._claimed = set()
+        self._dedupe_lock = threading.Lock()
+        self._claims_released = threading.Condition(self._dedupe_lock)
+        # Creates admitted under the quota but not yet committed, per user.
+        # Guarded by a striped lock so unrelated users don't contend. This
+        # is per process: workers sharing a database only see each other's
+        # committed tasks, so concurrent creates for one user on different
+        # workers can overshoot the quota by up to one batch per worker.
+        self._quota_locks = [threading.Lock() for _ in range(QUOTA_LOCK_STRIPES)]
+        self._pending: Dict[str, int] = {}
         self.logger = logging.getLogger("TaskService")
 
-    def create_task(self, task_data: TaskCreate) -> Task:
+    def create_task(self, task_data: TaskCreate, coalesce: bool = True) -> Task:
+        return self.create_or_merge_task(task_data, coalesce)[0]
+
+    def create_or_merge_task(self, task_data: TaskCreate, coalesce: bool = True) -> Tuple[Task, bool]:
+        """Create a task, or merge it into its duplicate; return it and whether it was created."""
         self.logger.info(f"Creating task for user: {task_data.user_name}")
-        return self.repository.add_task(task_data)
\ No newline at end of file
+        with self._claim_fingerprints([task_data]) as existing:
+            if existing[0] is not None:
+                return self._merge(existing[0], task_data)
+            return self._add_task(task_data, coalesce), True
+
+    def _add_task(self, task_data: TaskCreate, coalesce: bool = True) -> Task:
+        with self._reserve_quota(Counter([task_data.user_name])):
+            if coalesce and self.coalescer is not None:
+                return self.coalescer.submit(task_data)
+            return self.repository.add_task(task_data)
+
+    def create_tasks(self, tasks_data: List[TaskCreate]) -> List[Task]:
+        self.logger.info(f"Creating {len(tasks_data)} tasks in bulk")
+        tasks_data, positions = self._fold_duplicates(tasks_data)
+        with self._claim_fingerprints(tasks_data) as existing:
+            new_tasks = [task_data for task_data, task_id in zip(tasks_data, existing) if task_id is None]
+            with self._reserve_quota(Counter(task_data.user_name for task_data in new_tasks)):
+                created = iter(self.repository.add_tasks(new_tasks) if new_tasks else [])
+            tasks = [
+                next(created) if task_id is None else self._merge(task_id, task_data)[0]
+                for task_data, task_id in zip(tasks_data, existing)
+            ]
+        return [tasks[position] for position in positions]
+
+    def _fold_duplicates(self, tasks_data: List[TaskCreate]) -> Tuple[List[TaskCreate], List[int]]:
+        """In merge mode, fold items of one batch that share a fingerprint into the first.
+
+        Returns the remaining items and, for each original item, the
+        position of the item it became. As with ``_merge``, the later
+        description and priority win.
+        """
+        if self.dedupe_mode != "merge":
+            return tasks_data, list(range(len(tasks_data)))
+        unique: List[TaskCreate] = []
+        positions = []
+        first: Dict[tuple, int] = {}
+        for task_data in tasks_data:
+            fingerprint = task_fingerprint(task_data)
+            position = first.get(fingerprint)
+            if position is None:
+                position = first[fingerprint] = len(unique)
+                unique.append(task_data)
+            else:
+                unique[position] = unique[position].copy(
+                    update={"description": task_data.description, "priority": task_data.priority}
+                )
+            positions.append(position)
+        return unique, positions
+
+    @contextmanager
+    def _claim_fingerprints(self, tasks_data: List[TaskCreate]):
+        """Look up duplicates and claim the fingerprints for the block.
+
+        Yields the id of an existing task with the same fingerprint, or
+        None, for each item. A claimed fingerprint can't be created again
+        until the claim is released, so two concurrent identical creates
+        can't both succeed. In reject mode the later one is rejected as a
+        duplicate; in merge mode it waits for the first to commit and is
+        merged into it. All fingerprints are claimed at once, so waiting
+        requests never hold claims another one waits for.
+        """
+        if self.dedupe_mode == "off":
+            yield [None] * len(tasks_data)
+            return
+        fingerprints = [task_fingerprint(task_data) for task_data in tasks_data]
+        claimed = set()
+        with self._dedupe_lock:
+            while True:
+                in_flight = next((fingerprint for fingerprint in fingerprints if fingerprint in self._claimed), None)
+                if in_flight is None:
+                    break
+                if self.dedupe_mode != "merge":
+                    raise DuplicateTaskError(f"A task titled '{in_flight[1]}' is already being created")
+                self._claims_released.wait()
+            existing = []
+            for fingerprint in fingerprints:
+                if fingerprint in claimed:
+                    raise DuplicateTaskError(f"A task titled '{fingerprint[1]}' is already being created")
+                task_id = self.fingerprints.find(fingerprint)
+                if task_id is not None and self.dedupe_mode == "reject":
+                    raise DuplicateTaskError(f"Duplicate of task {task_id}")
+                claimed.add(fingerprint)
+                existing.append(task_id)
+            self._claimed |= claimed
+        try:
+            yield existing
+        finally:
+            with self._dedupe_lock:
+                self._claimed -= claimed
+                self._claims_released.notify_all()
+
+    def _merge(self, task_id: int, task_data: TaskCreate) -> Tuple[Task, bool]:
+        self.logger.info(f"Merging duplicate into task: {task_id}")
+        task = self.repository.update_task(
+            task_id, TaskUpdate(description=task_data.description, priority=task_data.priority)
+        )
+        self._invalidate(task_id)
+        if task is None:
+            # Deleted since the lookup; the claim still holds, so create it
+            # like any other new task.
+            return self._add_task(task_data), True
+        return task, False
+
+    @contextmanager
+    def _reserve_quota(self, counts: Counter):
+        """Admit creates within each user's quota for the duration of the block.
+
+        The repository keeps a per-user count, so the check is O(1) per
+        user. A reservation is held until the create has committed (and is
+        reflected in that count), which keeps concurrent creates for the
+        same user from overshooting.
+        """
+        quota = self.quota_per_user
+        if not quota:
+            yield
+            return
+        reserved = []
+        try:
+            for user_name, count in counts.items():
+                with self._quota_lock(user_name):
+                    pending = self._pending.get(user_name, 0)
+                    used = self.repository.count_for_user(user_name) + pending
+                    if used + count > quota:
+                        raise QuotaExceededError(f"User {user_name} would exceed the quota of {quota} tasks")
+                    self._pending[user_name] = pending + count
+                reserved.append((user_name, count))
+            yield
+        finally:
+            for user_name, count in reserved:
+                with self._quota_lock(user_name):
+                    remaining = self._pending[user_name] - count
+                    if remaining:
+                        self._pending[user_name] = remaining
+                    else:
+                        del self._pending[user_name]
+
+    def _quota_lock(self, user_name: str) -> threading.Lock:
+        return self._quota_locks[hash(user_name) % QUOTA_LOCK_STRIPES]
+
+    def list_tasks(self) -> TaskSnapshot:
+        return self.repository.list_tasks()
+
+    def top_tasks(self, user_name: str, limit: int) -> List[Task]:
+        return self.repository.top_tasks(user_name, limit)
+
+    # Projections serialize only the requested fields of the stored tasks
+    # to JSON, skipping Task validation and, unless asked for, descriptions.
+
+    def project_tasks(self, fields: Sequence[str]) -> bytes:
+        return encode_projection(self.repository.list_tasks().stored(), fields, self.repository.inflate)
+
+    def project_top_tasks(self, user_name: str, limit: int, fields: Sequence[str]) -> bytes:
+        tasks = self.repository.top_tasks(user_name, limit, inflate=False)
+        return encode_projection(tasks, fields, self.repository.inflate)
+
+    def project_task(self, task_id: int, fields: Sequence[str]) -> Optional[bytes]:
+        task = self.repository.get_task(task_id, inflate=False)
+        if task is None:
+            return None
+        return json.dumps(projector(fields, self.repository.inflate)(task), separators=(",", ":")).encode()
+
+    def occurrences(self, user_name: str, start: date, end: date) -> List[TaskOccurrence]:
+        """Expand the user's recurring tasks into their occurrences within [start, end]."""
+        occurrences = [
+            _occurrence(task, day)
+            for task in self.repository.recurring_tasks(user_name)
+            for day in occurrence_dates(task, start, end)
+        ]
+        occurrences.sort(key=_occurrence_order)
+        return occurrences
+
+    def calendar(self, user_name: str, start: date, end: date) -> List[CalendarDay]:
+        """Group the user's tasks within [start, end] by day, recurring occurrences included.
+
+        One-off tasks come from the repository's due-date buckets; days
+        without tasks are left out.
+        """
+        entries = [_occurrence(task, task.due_date) for task in self.repository.due_tasks(user_name, start, end)]
+        entries.extend(self.occurrences(user_name, start, end))
+        entries.sort(key=_occurrence_order)
+        return [CalendarDay(date=day, tasks=list(tasks)) for day, tasks in groupby(entries, key=lambda entry: entry.date)]
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        return self.repository.get_task(task_id)
+
+    def get_task_json(self, task_id: int) -> Optional[bytes]:
+        """Return the task serialized as JSON, from the shared cache when possible."""
+        if self.cache is None:
+            task = self.repository.get_task(task_id)
+            return None if task is None else task.json().encode()
+        body = self.cache.get(task_id)
+        if body is not None:
+            return body
+        # Read the version first: a write committing after it invalidates
+        # this fill.
+        version = self.cache.version(task_id)
+        task = self.repository.get_task(task_id)
+        if task is None:
+            return None
+        body = task.json().encode()
+        self.cache.put(task_id, body, version)
+        return body
+
+    def _invalidate(self, task_id: int):
+        if self.cache is not None:
+            self.cache.invalidate(task_id)
+
+    def update_task(self, task_id: int, task_update: TaskUpdate) -> Optional[Task]:
+        self.logger.info(f"Updating task: {task_id}")
+        counts = Counter()
+        if self.quota_per_user and task_update.user_name is not None:
+            # Moving a task to another user counts against that user's quota.
+            current = self.repository.get_task(task_id)
+            if current is not None and current.user_name != task_update.user_name:
+                counts[task_update.user_name] = 1
+        with self._reserve_quota(counts):
+            task = self.repository.update_task(task_id, task_update)
+        self._invalidate(task_id)
+        return task
+
+    def delete_task(self, task_id: int) -> bool:
+        self.logger.info(f"Deleting task: {task_id}")
+        deleted = self.repository.delete_task(task_id)
+        self._invalidate(task_id)
+        return deleted
+
+def _occurrence(task: Task, day: date) -> TaskOccurrence:
+    return TaskOccurrence(task_id=task.id, date=day, title=task.title, priority=task.priority, user_name=task.user_name)
+
+def _occurrence_order(occurrence: TaskOccurrence) -> tuple:
+    return (occurrence.date, occurrence.priority, occurrence.task_id)
\ No newline at end of file
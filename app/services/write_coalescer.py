@@ -0,0 +1,107 @@
+from app.domain.models.task import TaskCreate, Task
+from app.repositories.task_repository import TaskRepository
+from concurrent.futures import Future
+from typing import Optional
+import logging
+import queue
+import threading
+import time
+
+class WriteCoalescer:
+    """Groups concurrent single creates into batched repository commits.
+
+    Callers block on their own future; a single worker thread collects
+    requests for up to ``max_delay`` seconds or ``max_batch`` items and
+    commits them with one ``add_tasks`` call.
+    """
+
+    def __init__(self, repository: TaskRepository, max_batch: int = 64, max_delay: float = 0.001):
+        self.repository = repository
+        self.limits = (max_batch, max_delay)
+        self._queue = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+        self._closed = False
+        self.logger = logging.getLogger("WriteCoalescer")
+
+    def configure(self, max_batch: int, max_delay: float):
+        # Read once per batch by the worker, so a batch never mixes settings.
+        self.limits = (max_batch, max_delay)
+
+    def submit(self, task_data: TaskCreate) -> Task:
+        future = Future()
+        # Checking and enqueueing under one lock orders every accepted
+        # request before close()'s sentinel, so the worker always sees it.
+        with self._worker_lock:
+            if self._closed:
+                raise RuntimeError("Write coalescer is closed")
+            if self._worker is None:
+                self._worker = threading.Thread(target=self._run, name="write-coalescer", daemon=True)
+                self._worker.start()
+            self._queue.put((task_data, future))
+        return future.result()
+
+    def close(self, timeout: Optional[float] = None) -> bool:
+        """Commit everything already submitted and stop the worker.
+
+        Returns False if the worker is still committing after ``timeout``.
+        """
+        with self._worker_lock:
+            self._closed = True
+            worker = self._worker
+            if worker is None:
+                return True
+            self._queue.put(None)
+        worker.join(timeout)
+        return not worker.is_alive()
+
+    def _run(self):
+        try:
+            self._drain()
+        finally:
+            # Nothing is committed past this point: refuse new requests and
+            # fail whatever is left rather than leave its callers waiting.
+            with self._worker_lock:
+                self._closed = True
+            while True:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is not None:
+                    item[1].set_exception(RuntimeError("Write coalescer is closed"))
+
+    def _drain(self):
+        closing = False
+        while not closing:
+            item = self._queue.get()
+            if item is None:
+                break
+            batch = [item]
+            max_batch, max_delay = self.limits
+            deadline = time.monotonic() + max_delay
+            while len(batch) < max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    # close(): commit this last batch, then stop.
+                    closing = True
+                    break
+                batch.append(item)
+            self._commit(batch)
+
+    def _commit(self, batch):
+        try:
+            tasks = self.repository.add_tasks([task_data for task_data, _ in batch])
+        except Exception as e:
+            self.logger.error(f"Batched commit of {len(batch)} tasks failed: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+        for (_, future), task in zip(batch, tasks):
+            future.set_result(task)
\ No newline at end of file
@@ -0,0 +1,290 @@
+"""Load generator for the task API.
+
+Drives a weighted mix of create, read, bulk and search traffic at rising
+concurrency and reports throughput against latency percentiles, to find the
+saturation point of a backend. By default the app is driven in process
+through its ASGI interface; pass ``--url`` to load a running server instead::
+
+    python benchmarks/load_generator.py --concurrency 1,4,16,64 --duration 10
+    uvicorn app.main:app --workers 4 &
+    python benchmarks/load_generator.py --url http://127.0.0.1:8000 --mix create=20,read=60,search=20
+
+Only the standard library is needed (plus the app's own dependencies when
+running in process).
+"""
+import argparse
+import asyncio
+import csv
+import http.client
+import json
+import os
+import random
+import sys
+import threading
+import time
+from datetime import date, timedelta
+from urllib.parse import urlsplit
+
+WORDS = (
+    "review update plan fix call email draft report deploy test write read book "
+    "order pay schedule clean prepare check send meeting invoice budget design"
+).split()
+PRIORITY_WEIGHTS = (10, 20, 40, 20, 10)
+
+class LatencyHistogram:
+    """Log-linear latency histogram in microseconds (HDR-style, ~1% precision).
+
+    Values below 128us get exact buckets; above that each power of two is
+    split into 64 buckets, so memory stays small at any range.
+    """
+
+    def __init__(self):
+        self.counts = {}
+        self.total = 0
+        self.max = 0
+
+    def record(self, micros: float):
+        value = max(int(micros), 1)
+        exponent = max(value.bit_length() - 7, 0)
+        index = (exponent, value >> exponent)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.total += 1
+        self.max = max(self.max, value)
+
+    def merge(self, other: "LatencyHistogram"):
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    def percentile(self, percent: float) -> float:
+        if not self.total:
+            return 0.0
+        threshold = self.total * percent / 100
+        seen = 0
+        for exponent, mantissa in sorted(self.counts):
+            seen += self.counts[(exponent, mantissa)]
+            if seen >= threshold:
+                return float(mantissa << exponent)
+        return float(self.max)
+
+class Workload:
+    """Realistic TaskCreate payloads and a weighted operation mix."""
+
+    def __init__(self, mix: dict, users: int, bulk_size: int, seed: int):
+        self.operations = list(mix)
+        self.weights = [mix[operation] for operation in self.operations]
+        self.users = [f"user{index}" for index in range(users)]
+        # Zipf-like: a few users own most of the tasks.
+        self.user_weights = [1 / (rank + 1) for rank in range(users)]
+        self.bulk_size = bulk_size
+        self.random = random.Random(seed)
+        self.max_id = 0
+
+    def payload(self) -> dict:
+        rnd = self.random
+        title = " ".join(rnd.choice(WORDS) for _ in range(rnd.randint(1, 8)))[:100]
+        length = min(1000, max(1, int(rnd.lognormvariate(4.5, 0.8))))
+        description = " ".join(rnd.choice(WORDS) for _ in range(length // 5 + 1))[:length]
+        return {
+            "title": title,
+            "description": description,
+            "priority": rnd.choices(range(1, 6), PRIORITY_WEIGHTS)[0],
+            "due_date": (date.today() + timedelta(days=rnd.randint(-30, 120))).isoformat(),
+            "user_name": rnd.choices(self.users, self.user_weights)[0],
+        }
+
+    def next_request(self):
+        """Return (operation, method, path, body)."""
+        operation = self.random.choices(self.operations, self.weights)[0]
+        if operation == "read" and self.max_id:
+            return operation, "GET", f"/tasks/{self.random.randint(1, self.max_id)}", None
+        if operation == "search":
+            user = self.random.choices(self.users, self.user_weights)[0]
+            return operation, "GET", f"/users/{user}/tasks?limit=20", None
+        if operation == "bulk":
+            body = [self.payload() for _ in range(self.bulk_size)]
+            return operation, "POST", "/tasks/bulk", json.dumps(body).encode()
+        return "create", "POST", "/tasks", json.dumps(self.payload()).encode()
+
+    def observe(self, operation: str, status: int, body: bytes):
+        if operation == "create" and status == 201:
+            self.max_id = max(self.max_id, json.loads(body)["id"])
+        elif operation == "bulk" and status == 201:
+            self.max_id = max([self.max_id] + [task["id"] for task in json.loads(body)])
+
+class LevelResult:
+    def __init__(self, concurrency: int):
+        self.concurrency = concurrency
+        self.histogram = LatencyHistogram()
+        self.errors = 0
+        self.elapsed = 0.0
+
+    def row(self) -> dict:
+        histogram = self.histogram
+        return {
+            "concurrency": self.concurrency,
+            "requests": histogram.total,
+            "errors": self.errors,
+            "throughput_rps": round(histogram.total / self.elapsed, 1) if self.elapsed else 0.0,
+            "p50_ms": histogram.percentile(50) / 1000,
+            "p90_ms": histogram.percentile(90) / 1000,
+            "p99_ms": histogram.percentile(99) / 1000,
+            "max_ms": histogram.max / 1000,
+        }
+
+async def asgi_request(app, method: str, path: str, body):
+    path, _, query = path.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"loadgen"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("loadgen", 80),
+    }
+    pending = [{"type": "http.request", "body": body or b"", "more_body": False}]
+    response = {"status": 0, "body": bytearray()}
+
+    async def receive():
+        if pending:
+            return pending.pop()
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], bytes(response["body"])
+
+async def run_in_process(levels, duration: float, workload: Workload):
+    os.environ.setdefault("DB_URL", "loadgen://in-process")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.main import app
+
+    results = []
+    async with app.router.lifespan_context(app):
+        for concurrency in levels:
+            result = LevelResult(concurrency)
+            deadline = time.perf_counter() + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    operation, method, path, body = workload.next_request()
+                    started = time.perf_counter()
+                    status, payload = await asgi_request(app, method, path, body)
+                    result.histogram.record((time.perf_counter() - started) * 1e6)
+                    if status >= 400 and not (operation == "read" and status == 404):
+                        result.errors += 1
+                    workload.observe(operation, status, payload)
+
+            started = time.perf_counter()
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+            result.elapsed = time.perf_counter() - started
+            results.append(result)
+            report(result)
+    return results
+
+def run_over_http(url: str, levels, duration: float, workload: Workload):
+    target = urlsplit(url)
+    lock = threading.Lock()
+    results = []
+    for concurrency in levels:
+        result = LevelResult(concurrency)
+        deadline = time.perf_counter() + duration
+
+        def worker():
+            histogram = LatencyHistogram()
+            errors = 0
+            connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+            while time.perf_counter() < deadline:
+                with lock:
+                    operation, method, path, body = workload.next_request()
+                started = time.perf_counter()
+                try:
+                    connection.request(method, path, body=body, headers={"Content-Type": "application/json"})
+                    reply = connection.getresponse()
+                    status, payload = reply.status, reply.read()
+                except (OSError, http.client.HTTPException):
+                    connection.close()
+                    connection = http.client.HTTPConnection(target.hostname, target.port or 80, timeout=30)
+                    status, payload = 599, b""
+                histogram.record((time.perf_counter() - started) * 1e6)
+                if status >= 400 and not (operation == "read" and status == 404):
+                    errors += 1
+                with lock:
+                    workload.observe(operation, status, payload)
+            connection.close()
+            with lock:
+                result.histogram.merge(histogram)
+                result.errors += errors
+
+        threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        result.elapsed = time.perf_counter() - started
+        results.append(result)
+        report(result)
+    return results
+
+def report(result: LevelResult):
+    row = result.row()
+    print(
+        f"{row['concurrency']:>6} {row['requests']:>9} {row['errors']:>7} {row['throughput_rps']:>11.1f} "
+        f"{row['p50_ms']:>9.2f} {row['p90_ms']:>9.2f} {row['p99_ms']:>9.2f} {row['max_ms']:>9.2f}",
+        flush=True,
+    )
+
+def parse_mix(text: str) -> dict:
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("create", "read", "bulk", "search"):
+            raise argparse.ArgumentTypeError(f"unknown operation {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--url", help="load a running server instead of the in-process app")
+    parser.add_argument("--mix", type=parse_mix, default=parse_mix("create=30,read=50,bulk=5,search=15"))
+    parser.add_argument("--concurrency", default="1,2,4,8,16,32,64", help="comma-separated levels")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per concurrency level")
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bulk-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--csv", help="also write the curve to this CSV file")
+    args = parser.parse_args()
+
+    levels = [int(level) for level in args.concurrency.split(",")]
+    workload = Workload(args.mix, args.users, args.bulk_size, args.seed)
+    print(f"{'conc':>6} {'requests':>9} {'errors':>7} {'req/s':>11} {'p50 ms':>9} {'p90 ms':>9} {'p99 ms':>9} {'max ms':>9}")
+    if args.url:
+        results = run_over_http(args.url, levels, args.duration, workload)
+    else:
+        sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        results = asyncio.run(run_in_process(levels, args.duration, workload))
+
+    if args.csv:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0].row()))
+            writer.writeheader()
+            writer.writerows(result.row() for result in results)
+    best = max(results, key=lambda result: result.row()["throughput_rps"])
+    print(f"peak throughput {best.row()['throughput_rps']} req/s at concurrency {best.concurrency}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
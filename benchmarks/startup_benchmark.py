@@ -0,0 +1,51 @@
+"""Cold-start benchmark for the API.
+
+Each run starts a fresh interpreter, imports ``app.main`` and runs the
+application's lifespan startup, then reports the time taken. The median over
+all runs is checked against a budget and the script exits non-zero when it is
+exceeded, so it can gate CI::
+
+    python benchmarks/startup_benchmark.py --runs 7 --budget-ms 1500
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+PROBE = """
+import asyncio, time
+start = time.perf_counter()
+from app.main import app
+async def startup():
+    async with app.router.lifespan_context(app):
+        print(time.perf_counter() - start)
+asyncio.run(startup())
+"""
+
+def measure_once(root: str) -> float:
+    env = dict(os.environ, PYTHONPATH=root)
+    env.setdefault("DB_URL", "sqlite:///startup-benchmark")
+    env.setdefault("LOG_LEVEL", "WARNING")
+    result = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=root, env=env, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1]) * 1000
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=float(os.getenv("STARTUP_BUDGET_MS", "1500")))
+    args = parser.parse_args()
+
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    timings = [measure_once(root) for _ in range(args.runs)]
+    median = statistics.median(timings)
+    print(f"startup ms: median={median:.1f} min={min(timings):.1f} max={max(timings):.1f} budget={args.budget_ms:.0f}")
+    if median > args.budget_ms:
+        print("startup budget exceeded", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())